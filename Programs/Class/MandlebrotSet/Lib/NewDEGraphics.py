@@ -2273,6 +2273,26 @@ class Line(GraphicsObject):
         self.x2 = x2
         self.y2 = y2
 
+# Line through a list of points (x1, y1, x2, y2, ...)
+class PolyLine(GraphicsObject):
+    def __init__(self, canvas, points, color, width = 1, outline = None):
+        super().__init__(canvas, 0, 0, color, outline)
+        self.points = points
+        self.width = width
+
+    def _draw(self):
+        self.id = self.canvas.create_line(*self.points, fill = self.color, width = self.width)
+
+    def getPoints(self):
+        return self.points
+
+    def setPoints(self, points):
+        self.points = points
+
+        # Move the line that's already drawn instead of drawing a new one
+        if self.isDrawn:
+            self.canvas.coords(self.id, *self.points)
+
 # Text
 class Text(GraphicsObject):
     def __init__(self, canvas, x, y, text, color, outline = None):
@@ -0,0 +1,101 @@
+import math
+
+# Picking the iteration limit automatically, from how many points are still escaping.
+#
+# Too few iterations lose the detail near the boundary, too many waste time on points that are inside of the set and
+# never escape. While a render is iterating, the engine records how many points escaped in every window of iterations
+# (its telemetry, see escapeTime). Once the escapes have died down (fewer than quietRate of the pixels per iteration) for
+# a long enough span, the points that are left are almost all inside, so auto mode stops there and uses that iteration
+# as the limit.
+#
+# How many iterations that takes isn't known up front, so the progress is reported against a target that starts at the
+# first iteration auto mode could stop at and doubles every time it's reached.
+#
+# Deeper zooms need more iterations, roughly in proportion to how many times the view has been halved. The limit for the
+# next zoom level is suggested by scaling the iteration the current view settled at by that growth.
+
+quietRate = 1e-5 # A window is quiet when fewer than this fraction of the pixels escaped per iteration in it
+quietSpan = 200 # Stop once the escapes have been quiet for this many iterations...
+quietFraction = 0.5 # ... or for this fraction of the iterations done so far (whichever is longer)
+minimumIterations = 100 # Never stop before this many iterations
+autoLimit = 100000 # The most iterations auto mode will ever do
+chunkIterations = 50 # The number of iterations between checking if the escapes have died down
+
+homeWidth = 3.0 # The width of the home view (zoom depth 0)
+levelZoom = 2.0 # How much the next zoom level zooms in
+suggestBase = 100 # The suggested iterations at the home view
+suggestGrowth = 1.0 # How fast the suggested iterations grow with the zoom depth ((1 + depth) ^ suggestGrowth)
+
+# Whether the escapes in the telemetry (see escapeTime.EscapeTimeEngine) have been quiet for long enough
+def isSettled(telemetry, pixels, iteration):
+    span = max(quietSpan, quietFraction * iteration)
+
+    if iteration < max(minimumIterations, span):
+        return False
+
+    escaped = sum(window[1] for window in telemetry if window[0] > iteration - span)
+
+    return escaped < quietRate * pixels * span
+
+# Iterate an engine until its escapes have died down (or everything is done, or limit is reached). Returns the
+# iteration it stopped at, which is the iteration limit the render ended up with. progressCallback gets called with
+# (iteration, the iteration it could stop at next)
+def iterateUntilSettled(engine, limit = None, progressCallback = None, shouldStop = None):
+    limit = autoLimit if limit == None else limit
+    target = min(limit, max(minimumIterations, quietSpan))
+
+    while not engine.isFinished(limit):
+        engine.iterate(min(limit, engine.iteration + chunkIterations), None, shouldStop)
+
+        # Not settled by the target, so aim for twice as far
+        while engine.iteration >= target and target < limit:
+            target = min(limit, target * 2)
+
+        if progressCallback != None:
+            progressCallback(engine.iteration, target)
+
+        if isSettled(engine.telemetry, engine.size, engine.iteration):
+            break
+
+    return engine.iteration
+
+# How many times a view has been zoomed in by levelZoom from the home view
+def zoomDepth(customCoords):
+    width = abs(float(customCoords[2]) - float(customCoords[0]))
+
+    return max(0.0, math.log(homeWidth / width, levelZoom)) if width > 0 else 0.0
+
+# The suggested iterations at a zoom depth (without telemetry)
+def depthIterations(depth):
+    return suggestBase * (1 + depth) ** suggestGrowth
+
+# Suggest an iteration limit for the next zoom level of a view. With settledAt (the iteration the view's escapes died
+# down at), the suggestion grows from there instead of from suggestBase
+def suggestIterations(customCoords, settledAt = None):
+    depth = zoomDepth(customCoords)
+
+    if settledAt == None:
+        return int(math.ceil(depthIterations(depth + 1)))
+
+    return int(math.ceil(max(minimumIterations, settledAt) * depthIterations(depth + 1) / depthIterations(depth)))
+
+# A short summary of an engine's telemetry (for profiling): how many points escaped or were retired, and the iterations
+# it took for half / 99% of the escapes to happen
+def summarize(telemetry):
+    escaped = sum(window[1] for window in telemetry)
+    retired = sum(window[2] for window in telemetry)
+
+    if len(telemetry) == 0 or escaped == 0:
+        return "no escapes, " + str(retired) + " points retired as periodic"
+
+    marks = []
+    total = 0
+
+    for iteration, windowEscaped, windowRetired, active in telemetry:
+        total += windowEscaped
+
+        while len(marks) < 2 and total >= (0.5, 0.99)[len(marks)] * escaped:
+            marks.append(iteration)
+
+    return (str(escaped) + " escaped (half by iteration " + str(marks[0]) + ", 99% by " + str(marks[1]) + "), "
+            + str(retired) + " retired as periodic, " + str(telemetry[-1][3]) + " still active at iteration " + str(telemetry[-1][0]))
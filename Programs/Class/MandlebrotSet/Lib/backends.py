@@ -0,0 +1,224 @@
+import multiprocessing
+import numpy as np
+import Lib.escapeTime as escapeTime
+import Lib.inverseIteration as inverseIteration
+
+try:
+    import numba
+except ImportError:
+    numba = None
+
+# Pluggable compute backends for the escape time (mandlebrot and julia) and inverse iteration kernels.
+#
+# The numpy backend is the escape time engine (vectorized over every point, see escapeTime) and runs anywhere. The numba
+# backend (only there if numba is installed) compiles a per-point loop instead: every point stops the moment it escapes
+# or its orbit repeats, and the points are spread over every core with prange. It does exactly the same float math in
+# the same order as the engine (in the same float type, with the same periodicity checks), so both backends give
+# identical escape counts, which compareBackends checks.
+#
+# Both backends can also hand back the points that were still iterating when maxIterations was hit (computeResumable),
+# so renders made with either one can be resumed with more iterations (see escapeTime.ResumeState).
+#
+# Inverse iteration has no per-point early exit to gain (every walker takes every step, and the random root choices
+# already run vectorized), so the numba backend uses the numpy one for it.
+#
+# More backends can be added with register. getBackend picks the first available one in preferred order, unless a
+# backend is asked for by name.
+
+preferred = ["numba", "numpy"] # The order backends are picked in automatically
+chunkPoints = 1 << 16 # The numba backend checks shouldStop and reports progress after every this many points
+
+class NumpyBackend():
+    name = "numpy"
+
+    # Compute the divergence times of points (z0 and c are broadcast together), in floatType. interior marks points that
+    # are already known to never escape (or None). progressCallback gets called with (done, total)
+    def computePoints(self, z0, c, maxIterations, floatType = np.float64, interior = None, progressCallback = None, shouldStop = None):
+        engine = escapeTime.EscapeTimeEngine(z0, c, interior = interior, floatType = floatType)
+        engine.iterate(maxIterations, progressCallback, shouldStop)
+
+        return engine.getDivergenceTimes(maxIterations)
+
+    # computePoints, but also returns the points that were still iterating at maxIterations, as (positions in the
+    # flattened points, z, c) like EscapeTimeEngine.getActive
+    def computeResumable(self, z0, c, maxIterations, floatType = np.float64, interior = None, progressCallback = None, shouldStop = None):
+        engine = escapeTime.EscapeTimeEngine(z0, c, interior = interior, floatType = floatType)
+        engine.iterate(maxIterations, progressCallback, shouldStop)
+
+        return (engine.getDivergenceTimes(maxIterations),) + engine.getActive()
+
+    # Compute how often every pixel of a julia set was visited by inverse iteration (see inverseIteration)
+    def computeInverseJulia(self, size, customCoords, juliaC, walkers, modified = False, progressCallback = None, shouldStop = None, seed = None):
+        return inverseIteration.computeInverseJulia(size, customCoords, juliaC, walkers, modified, progressCallback, shouldStop, seed)
+
+if numba != None:
+    # The escape time of one point (the same steps as EscapeTimeEngine.iterate), its last z and whether it's still
+    # iterating (it neither escaped nor got stuck in a cycle)
+    @numba.njit(cache = True)
+    def escapePoint(zr, zi, cr, ci, maxIterations, bailoutSquared, toleranceSquared, firstCheckpoint, checkPeriodicity):
+        zr2 = zr * zr
+        zi2 = zi * zi
+        sr = zr
+        si = zi
+        checkpoint = firstCheckpoint
+
+        for iteration in range(maxIterations):
+            # z = z^2 + c
+            zi = zr * zi
+            zi = zi + zi
+            zi = zi + ci
+            zr = zr2 - zi2
+            zr = zr + cr
+
+            # |z|^2 > bailout^2
+            zr2 = zr * zr
+            zi2 = zi * zi
+
+            if zr2 + zi2 > bailoutSquared:
+                return iteration, zr, zi, False
+
+            if checkPeriodicity:
+                # Stuck in a cycle, so it's inside
+                dr = zr - sr
+                di = zi - si
+
+                if dr * dr + di * di < toleranceSquared:
+                    return maxIterations, zr, zi, False
+
+                # Refresh the saved z at doubling intervals
+                if iteration + 1 == checkpoint:
+                    sr = zr
+                    si = zi
+                    checkpoint *= 2
+
+        return maxIterations, zr, zi, True
+
+    # The escape time of every point, on every core, and the last z and whether it's still iterating. Every thread takes
+    # every n-th point (instead of one block of points), so the slow points inside of the set get spread evenly over the
+    # threads
+    @numba.njit(parallel = True, cache = True)
+    def escapeKernel(zr0, zi0, cr, ci, interior, maxIterations, bailoutSquared, toleranceSquared, firstCheckpoint, checkPeriodicity, threads, divergenceTimes, zr, zi, active):
+        for thread in numba.prange(threads):
+            for p in range(thread, zr0.size, threads):
+                if interior[p]:
+                    divergenceTimes[p] = maxIterations
+                    active[p] = False
+                else:
+                    divergenceTimes[p], zr[p], zi[p], active[p] = escapePoint(zr0[p], zi0[p], cr[p], ci[p], maxIterations, bailoutSquared, toleranceSquared, firstCheckpoint, checkPeriodicity)
+
+class NumbaBackend(NumpyBackend):
+    name = "numba"
+
+    def computePoints(self, z0, c, maxIterations, floatType = np.float64, interior = None, progressCallback = None, shouldStop = None):
+        return self.computeResumable(z0, c, maxIterations, floatType, interior, progressCallback, shouldStop)[0]
+
+    def computeResumable(self, z0, c, maxIterations, floatType = np.float64, interior = None, progressCallback = None, shouldStop = None):
+        z0 = np.asarray(z0)
+        c = np.asarray(c)
+        shape = np.broadcast_shapes(z0.shape, c.shape)
+        floatType = np.dtype(floatType)
+
+        # Flat arrays in the float type (exactly what the engine iterates)
+        zr0 = np.ascontiguousarray(np.broadcast_to(z0.real, shape), dtype = floatType).ravel()
+        zi0 = np.ascontiguousarray(np.broadcast_to(z0.imag, shape), dtype = floatType).ravel()
+        cr = np.ascontiguousarray(np.broadcast_to(c.real, shape), dtype = floatType).ravel()
+        ci = np.ascontiguousarray(np.broadcast_to(c.imag, shape), dtype = floatType).ravel()
+        interior = np.zeros(zr0.size, dtype = bool) if interior is None else np.ascontiguousarray(np.broadcast_to(interior, shape)).ravel()
+
+        # The same constants the engine compares against (in the float type)
+        engine = escapeTime.EscapeTimeEngine
+        toleranceSquared = floatType.type((engine.periodicityTolerance * np.finfo(floatType).eps / np.finfo(np.float64).eps) ** 2)
+        bailoutSquared = floatType.type(4.0)
+
+        divergenceTimes = np.empty(zr0.size, dtype = escapeTime.countType(maxIterations))
+        zr = np.empty_like(zr0)
+        zi = np.empty_like(zi0)
+        active = np.empty(zr0.size, dtype = bool)
+
+        for start in range(0, zr0.size, chunkPoints):
+            if shouldStop != None and shouldStop():
+                raise escapeTime.RenderCancelled()
+
+            end = min(start + chunkPoints, zr0.size)
+            escapeKernel(zr0[start:end], zi0[start:end], cr[start:end], ci[start:end], interior[start:end], int(maxIterations), bailoutSquared, toleranceSquared, engine.firstCheckpoint, engine.checkPeriodicity, numba.get_num_threads(), divergenceTimes[start:end], zr[start:end], zi[start:end], active[start:end])
+
+            if progressCallback != None:
+                progressCallback(end, zr0.size)
+
+        positions = np.flatnonzero(active)
+
+        return divergenceTimes.reshape(shape), positions, zr[positions] + zi[positions] * 1j, cr[positions] + ci[positions] * 1j
+
+backends = {"numpy": NumpyBackend()} # name -> backend
+
+# Add a backend (anything with computePoints and computeInverseJulia, like NumpyBackend)
+def register(backend):
+    backends[backend.name] = backend
+
+if numba != None:
+    register(NumbaBackend())
+
+# Get a backend by name (or the backend itself). None or "auto" picks the first available one in preferred order
+def getBackend(name = None):
+    if name != None and not isinstance(name, str):
+        return name
+
+    if name == None or name == "auto":
+        for backendName in preferred:
+            if backendName in backends:
+                return backends[backendName]
+
+    return backends[name]
+
+# The multiprocessing context worker pools should be started with (None for the default). numba's threads don't
+# survive a fork (a forked process hangs once numba has run in its parent), so with numba the workers are spawned
+def poolContext():
+    return multiprocessing.get_context("spawn") if "numba" in backends else None
+
+# Compute the iteration every point in a region of the mandlebrot set diverged at. floatType overrides the float type
+# picked for the region
+def computeMandlebrotSet(size, customCoords, maxIterations, progressCallback = None, window = None, shouldStop = None, backend = None, floatType = None):
+    if floatType == None:
+        floatType = escapeTime.chooseFloatType(size, customCoords)
+
+    c = escapeTime.complexGrid(size, customCoords, window, floatType)
+
+    return getBackend(backend).computePoints(0j, c, maxIterations, floatType, escapeTime.mandlebrotInteriorMask(c), progressCallback, shouldStop)
+
+# Compute the iteration every point in a region of a julia set diverged at. floatType overrides the float type picked
+# for the region
+def computeJuliaSet(size, customCoords, maxIterations, juliaC, progressCallback = None, window = None, shouldStop = None, backend = None, floatType = None):
+    if floatType == None:
+        floatType = escapeTime.chooseFloatType(size, customCoords)
+
+    return getBackend(backend).computePoints(escapeTime.complexGrid(size, customCoords, window, floatType), complex(juliaC), maxIterations, floatType, None, progressCallback, shouldStop)
+
+# Compute a region of a set and the state to resume it from (see escapeTime.ResumeState). Leave juliaC as None for the
+# mandlebrot set
+def computeResumable(size, customCoords, maxIterations, juliaC = None, progressCallback = None, shouldStop = None, backend = None):
+    floatType = escapeTime.chooseFloatType(size, customCoords)
+    points = escapeTime.complexGrid(size, customCoords, None, floatType)
+
+    if juliaC == None:
+        divergenceTimes, positions, z, c = getBackend(backend).computeResumable(0j, points, maxIterations, floatType, escapeTime.mandlebrotInteriorMask(points), progressCallback, shouldStop)
+    else:
+        divergenceTimes, positions, z, c = getBackend(backend).computeResumable(points, complex(juliaC), maxIterations, floatType, None, progressCallback, shouldStop)
+
+    return divergenceTimes, escapeTime.ResumeState(divergenceTimes, maxIterations, positions, z, c)
+
+# Compute how often every pixel of a julia set was visited by inverse iteration
+def computeInverseJulia(size, customCoords, juliaC, walkers, modified = False, progressCallback = None, shouldStop = None, seed = None, backend = None):
+    return getBackend(backend).computeInverseJulia(size, customCoords, juliaC, walkers, modified, progressCallback, shouldStop, seed)
+
+# Check that every backend gives the same escape counts as the numpy backend. Returns name -> the number of points that
+# differ. Leave juliaC as None for the mandlebrot set
+def compareBackends(size, customCoords, maxIterations, juliaC = None):
+    results = {}
+
+    for name in backends:
+        if juliaC == None:
+            results[name] = computeMandlebrotSet(size, customCoords, maxIterations, backend = name)
+        else:
+            results[name] = computeJuliaSet(size, customCoords, maxIterations, juliaC, backend = name)
+
+    return {name: int(np.count_nonzero(times != results["numpy"])) for name, times in results.items()}
@@ -0,0 +1,189 @@
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import numpy as np
+import Lib.backends as backends
+import Lib.escapeTime as escapeTime
+
+# The buddhabrot and anti-buddhabrot: instead of coloring every c by how fast it escapes, pick a lot of random c values
+# and draw where their orbits (z1, z2, ... of z = z^2 + c) go. The buddhabrot draws the orbits of the points that
+# escape, the anti-buddhabrot the orbits of the points that never do. Every pixel counts how many orbit points landed in
+# it (its density).
+#
+# The c values are sampled in batches of batchSamples. A batch is first run through a compute backend (see backends) to
+# find which of its points escape, then only the orbits that get drawn are traced again, all at once with numpy, and
+# the pixels their points land in are collected and added up with np.bincount every flushEntries points.
+#
+# Most random c values are useless: outside of the set they escape in a few iterations, and inside of it (for the
+# buddhabrot) they never escape. So c values are picked with importance sampling: a coarse grid of cells over the whole
+# set is computed once, and the cells on the boundary of the set (and inside of it for the anti-buddhabrot) get most of
+# the samples. Every orbit is weighted by how much less likely its cell was to be picked than with even sampling, so
+# the density comes out the same as with even sampling, only with a lot less noise. uniformShare of the samples are
+# still spread evenly, so no cell is left out.
+#
+# Big renders are split into jobs of jobSamples that are computed on separate processes, and their densities are added
+# together.
+
+sampleRegion = [-2.0, -2.0, 2.0, 2.0] # The c values are sampled in here (the whole mandlebrot set is inside of it)
+batchSamples = 1 << 17 # The number of c values sampled and iterated at once
+flushEntries = 1 << 22 # Orbit points are added to the density once this many have been collected
+jobSamples = 1 << 21 # The most samples a single job (on one process) takes
+importanceSize = 256 # The width and height of the grid of cells used for importance sampling
+uniformShare = 0.2 # The share of the samples spread evenly over every cell
+
+# The chance of every cell of the importance grid ([x][y], flattened) to be sampled. Leave anti off for the buddhabrot
+def importanceMap(maxIterations, anti = False, backend = None):
+    # Whether the corners of every cell are in the set
+    corners = backends.computeMandlebrotSet((importanceSize + 1, importanceSize + 1), sampleRegion, maxIterations, backend = backend) == maxIterations
+    inside = corners[:-1, :-1] & corners[1:, :-1] & corners[:-1, 1:] & corners[1:, 1:]
+    outside = ~(corners[:-1, :-1] | corners[1:, :-1] | corners[:-1, 1:] | corners[1:, 1:])
+
+    # The boundary cells (and their neighbors, the corners can miss thin filaments)
+    boundary = ~(inside | outside)
+    boundary[1:] |= boundary[:-1].copy()
+    boundary[:-1] |= boundary[1:].copy()
+    boundary[:, 1:] |= boundary[:, :-1].copy()
+    boundary[:, :-1] |= boundary[:, 1:].copy()
+
+    important = (boundary | inside) if anti else boundary
+    probabilities = np.full(important.size, uniformShare / important.size)
+
+    if np.any(important):
+        probabilities += (1 - uniformShare) * important.ravel() / np.count_nonzero(important)
+    else:
+        probabilities += (1 - uniformShare) / important.size
+
+    return probabilities / probabilities.sum()
+
+# Sample count c values, picking the cells by probabilities (None samples evenly). Returns the c values and the weight
+# of every sample
+def sampleBatch(rng, count, probabilities = None):
+    cellWidth = (sampleRegion[2] - sampleRegion[0]) / importanceSize
+    cellHeight = (sampleRegion[3] - sampleRegion[1]) / importanceSize
+
+    if probabilities is None:
+        cells = rng.integers(0, importanceSize * importanceSize, count)
+        weights = np.ones(count)
+    else:
+        cells = rng.choice(len(probabilities), count, p = probabilities)
+        weights = 1 / (len(probabilities) * probabilities[cells])
+
+    x = sampleRegion[0] + (cells // importanceSize + rng.random(count)) * cellWidth
+    y = sampleRegion[1] + (cells % importanceSize + rng.random(count)) * cellHeight
+
+    return x + y * 1j, weights
+
+# Compute the orbit density of one job. Returns the density ([x][y]). minIterations leaves out the orbits that escape
+# sooner than that (they only make a blurry glow). progressCallback gets called with (samples done, samples)
+def computeDensity(size, customCoords, maxIterations, samples, anti = False, minIterations = 0, probabilities = None, seed = None, backend = None, progressCallback = None, shouldStop = None):
+    rng = np.random.default_rng(seed)
+    density = np.zeros(size[0] * size[1])
+
+    # Where the pixels are
+    x0, y0, x1, y1 = [float(value) for value in customCoords]
+    xScale = (size[0] - 1) / (x1 - x0)
+    yScale = (size[1] - 1) / (y1 - y0)
+
+    pixels = []
+    pixelWeights = []
+    collected = 0
+
+    # Add the collected orbit points to the density
+    def flush():
+        nonlocal pixels, pixelWeights, collected
+
+        if collected > 0:
+            density[:] += np.bincount(np.concatenate(pixels), np.concatenate(pixelWeights), minlength = density.size)
+
+        pixels = []
+        pixelWeights = []
+        collected = 0
+
+    done = 0
+
+    while done < samples:
+        if shouldStop != None and shouldStop():
+            raise escapeTime.RenderCancelled()
+
+        count = min(batchSamples, samples - done)
+        c, weights = sampleBatch(rng, count, probabilities)
+
+        # Find the orbits that get drawn
+        times = backends.getBackend(backend).computePoints(0j, c, maxIterations, np.float64, escapeTime.mandlebrotInteriorMask(c))
+
+        if anti:
+            drawn = times == maxIterations
+        else:
+            # A point that escaped at iteration 0 has no orbit points before it escaped (z1 is already out)
+            drawn = (times < maxIterations) & (times >= max(minIterations, 1))
+
+        # The number of orbit points to draw (the ones before it escaped, or all of them)
+        c = c[drawn]
+        weights = weights[drawn]
+        steps = times[drawn]
+
+        # Trace them again, drawing every orbit point until it has done its steps
+        z = np.zeros_like(c)
+
+        for step in range(int(np.amax(steps, initial = 0))):
+            z = z * z + c
+
+            x = np.rint((z.real - x0) * xScale)
+            y = np.rint((z.imag - y0) * yScale)
+            inView = (x >= 0) & (x < size[0]) & (y >= 0) & (y < size[1])
+
+            pixels.append((x[inView] * size[1] + y[inView]).astype(np.intp))
+            pixelWeights.append(weights[inView])
+            collected += len(pixels[-1])
+
+            if collected >= flushEntries:
+                flush()
+
+            # Drop the orbits that are done (or escaped already, chaotic orbits can drift off of the backend's)
+            active = (steps > step + 1) & (z.real * z.real + z.imag * z.imag <= 4)
+
+            if not np.all(active):
+                z = z[active]
+                c = c[active]
+                weights = weights[active]
+                steps = steps[active]
+
+        flush()
+        done += count
+
+        if progressCallback != None:
+            progressCallback(done, samples)
+
+    return density.reshape(size)
+
+# Render the orbit density of the buddhabrot (or with anti on, the anti-buddhabrot) with samples random c values, on
+# workers processes. importance turns importance sampling on (see importanceMap). progressCallback gets called with
+# (samples done, samples)
+def renderDensity(size, customCoords, maxIterations, samples, anti = False, minIterations = 0, importance = True, workers = 1, seed = None, backend = None, progressCallback = None):
+    probabilities = importanceMap(maxIterations, anti, backend) if importance else None
+
+    # Split the samples into jobs, each with its own random numbers
+    jobs = [min(jobSamples, samples - start) for start in range(0, samples, jobSamples)]
+    seeds = np.random.SeedSequence(seed).spawn(len(jobs))
+
+    density = np.zeros(size)
+    done = 0
+
+    if workers <= 1:
+        for jobCount, jobSeed in zip(jobs, seeds):
+            density += computeDensity(size, customCoords, maxIterations, jobCount, anti, minIterations, probabilities, jobSeed, backend)
+            done += jobCount
+
+            if progressCallback != None:
+                progressCallback(done, samples)
+    else:
+        with ProcessPoolExecutor(max_workers = workers, mp_context = backends.poolContext()) as pool:
+            futures = {pool.submit(computeDensity, size, customCoords, maxIterations, jobCount, anti, minIterations, probabilities, jobSeed, backend): jobCount for jobCount, jobSeed in zip(jobs, seeds)}
+
+            # Merge the densities of the jobs as they finish
+            for future in as_completed(futures):
+                density += future.result()
+                done += futures[future]
+
+                if progressCallback != None:
+                    progressCallback(done, samples)
+
+    return density
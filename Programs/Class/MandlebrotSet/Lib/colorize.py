@@ -0,0 +1,120 @@
+import struct
+import zlib
+import numpy as np
+
+# Turning computed escape counts into pixels, all at once with numpy instead of one pixel at a time.
+#
+# The color map gets turned into a lookup table of uint8 colors once, then every pixel's color is found with a single
+# gather into that table. The result is an (height, width, 3) uint8 image that can be handed to tk (or a file) as one
+# binary PPM or PNG blob.
+
+# Draw methods (the same numbers the mandlebrot and julia draw methods use)
+ESCAPE_COLORS = 1 # Gradient coloring using the escape time
+TWO_TONE = 2 # Threshold coloring, white if the point never escaped
+
+# Turn a color map ((r, g, b) with values from 0 to 1) into a lookup table of uint8 colors
+def buildPalette(colorMap):
+    return (np.asarray(colorMap, dtype = np.float64) * 255).astype(np.uint8)
+
+# Color ALL the escape counts at once. divergenceTimes is indexed [x][y] and the image is returned as [y][x][rgb]
+def colorize(divergenceTimes, maxIterations, highestIters, method, palette):
+    times = divergenceTimes.T
+    interior = times == maxIterations
+
+    if method == ESCAPE_COLORS:
+        # Gradient coloring (the same as getGradientColor(val / highestIters, colorMap) for every pixel)
+        amount = np.clip(times / max(highestIters, 1), 0, 1)
+
+        image = palette[(amount * (len(palette) - 1)).astype(np.intp)]
+        image[interior] = 0
+    elif method == TWO_TONE:
+        # Threshold coloring
+        image = np.zeros(times.shape + (3,), dtype = np.uint8)
+        image[interior] = 255
+    else:
+        image = np.zeros(times.shape + (3,), dtype = np.uint8)
+
+    return image
+
+# Color a grid of visit counts ([x][y], like the ones inverse iteration makes). Visited pixels are white
+def colorizeVisits(visits):
+    image = np.zeros(visits.T.shape + (3,), dtype = np.uint8)
+    image[visits.T > 0] = 255
+
+    return image
+
+# Color a grid of coverages ([x][y], from 0 to 1, like the ones distance estimation makes). The set is white
+def colorizeCoverage(coverage):
+    shade = (np.clip(coverage.T, 0, 1) * 255).astype(np.uint8)
+
+    return np.repeat(shade[:, :, np.newaxis], 3, axis = 2)
+
+# Color a grid of densities ([x][y], like the orbit densities of the buddhabrot) with the palette. The densities are
+# scaled to the highest one and bent by gamma (below 1 brings out the faint orbits). Empty pixels are black
+def colorizeDensity(density, palette, gamma = 0.5):
+    amount = (density.T / max(np.amax(density), 1e-300)) ** gamma
+
+    image = palette[(np.clip(amount, 0, 1) * (len(palette) - 1)).astype(np.intp)]
+    image[density.T <= 0] = 0
+
+    return image
+
+# Encode an image as a binary PPM (what tk's PhotoImage reads the fastest)
+def encodePPM(image):
+    header = b"P6 %d %d 255\n" % (image.shape[1], image.shape[0])
+
+    return header + np.ascontiguousarray(image, dtype = np.uint8).tobytes()
+
+# A PNG chunk (length, kind, data and checksum)
+def pngChunk(kind, data):
+    return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data) & 0xffffffff)
+
+# The rows of an image the way PNG stores them: every row starts with a filter byte (0 = no filter)
+def pngRows(image):
+    height, width = image.shape[:2]
+
+    rows = np.zeros((height, width * 3 + 1), dtype = np.uint8)
+    rows[:, 1:] = np.ascontiguousarray(image, dtype = np.uint8).reshape(height, width * 3)
+
+    return rows.tobytes()
+
+# Encode an image as a PNG
+def encodePNG(image, compression = 6):
+    height, width = image.shape[:2]
+
+    return (b"\x89PNG\r\n\x1a\n"
+            + pngChunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0))
+            + pngChunk(b"IDAT", zlib.compress(pngRows(image), compression))
+            + pngChunk(b"IEND", b""))
+
+# Write a PNG to a file a band of rows at a time, so the whole image never has to be in memory
+class PNGWriter():
+    def __init__(self, file, width, height, compression = 6):
+        self.file = file
+        self.compressor = zlib.compressobj(compression)
+
+        file.write(b"\x89PNG\r\n\x1a\n" + pngChunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)))
+
+    # Write the next rows of the image ([y][x][rgb])
+    def writeRows(self, image):
+        data = self.compressor.compress(pngRows(image))
+
+        if len(data) > 0:
+            self.file.write(pngChunk(b"IDAT", data))
+
+    def close(self):
+        self.file.write(pngChunk(b"IDAT", self.compressor.flush()) + pngChunk(b"IEND", b""))
+
+# Write a binary PPM to a file a band of rows at a time
+class PPMWriter():
+    def __init__(self, file, width, height):
+        self.file = file
+
+        file.write(b"P6 %d %d 255\n" % (width, height))
+
+    # Write the next rows of the image ([y][x][rgb])
+    def writeRows(self, image):
+        self.file.write(np.ascontiguousarray(image, dtype = np.uint8).tobytes())
+
+    def close(self):
+        pass
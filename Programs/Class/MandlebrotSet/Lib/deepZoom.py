@@ -0,0 +1,237 @@
+from decimal import Decimal, localcontext
+import numpy as np
+import Lib.escapeTime as escapeTime
+
+# Deep zooming into the mandlebrot set using perturbation theory.
+#
+# Regular floats run out of precision at around a 1e13 zoom, where neighbouring pixels end up with the same c and the
+# image turns into blocks. Instead, one reference orbit Z is computed at the center of the view with arbitrary
+# precision (decimal), and every pixel only tracks its (tiny) difference dz from that orbit with regular floats:
+#
+#     dz -> 2 * Z * dz + dz^2 + dc        (z = Z + dz, c = C + dc)
+#
+# When a pixel's z gets closer to 0 than its dz, the float dz can't represent it precisely anymore (a "glitch"), so
+# that pixel is rebased onto the start of the reference orbit (dz = z, start over at Z_0 = 0). The same happens when a
+# pixel runs past the end of the reference orbit because the reference escaped first.
+#
+# Coordinates are kept as strings so they never lose precision. The deltas themselves are regular floats, which is
+# fine down to about 1e-300.
+
+# Zoom levels where the pixel spacing is smaller than this fraction of the coordinates need perturbation theory
+deepZoomThreshold = 2.0 ** -40
+
+# Convert coordinates (floats, decimals or strings) to arbitrary-precision strings
+def toPreciseCoords(coords):
+    return [value if isinstance(value, str) else repr(float(value)) if isinstance(value, float) else str(value) for value in coords]
+
+# The number of decimal digits needed to tell apart the pixels of a region
+def precisionFor(preciseCoords, size):
+    width = abs(Decimal(preciseCoords[2]) - Decimal(preciseCoords[0])) / max(size[0] - 1, 1)
+
+    if width == 0:
+        return 30
+
+    return max(30, -width.adjusted() + 20)
+
+# Whether a region is too small to be computed with regular floats
+def needsDeepZoom(size, preciseCoords):
+    x1, y1, x2, y2 = [float(value) for value in preciseCoords]
+
+    spacing = min(abs(x2 - x1) / max(size[0] - 1, 1), abs(y2 - y1) / max(size[1] - 1, 1))
+    magnitude = max(abs(x1), abs(y1), abs(x2), abs(y2))
+
+    return spacing < magnitude * deepZoomThreshold
+
+# Get the precise coordinates of a part of a region. The fractions go from 0 to 1 across the region
+def subRegion(preciseCoords, x1Fraction, y1Fraction, x2Fraction, y2Fraction, size = (1000, 1000)):
+    with localcontext() as context:
+        context.prec = precisionFor(preciseCoords, size)
+
+        x1, y1, x2, y2 = [Decimal(value) for value in preciseCoords]
+        width = x2 - x1
+        height = y2 - y1
+
+        return [str(x1 + width * Decimal(repr(x1Fraction))), str(y1 + height * Decimal(repr(y1Fraction))), str(x1 + width * Decimal(repr(x2Fraction))), str(y1 + height * Decimal(repr(y2Fraction)))]
+
+# Get the precise coordinates of a point in a region. The fractions go from 0 to 1 across the region
+def pointInRegion(preciseCoords, xFraction, yFraction, size = (1000, 1000)):
+    region = subRegion(preciseCoords, xFraction, yFraction, xFraction, yFraction, size)
+
+    return (region[0], region[1])
+
+# Get a region of the given half-width and half-height around a precise point
+def regionAround(precisePoint, halfWidth, halfHeight):
+    with localcontext() as context:
+        context.prec = max(30, len(precisePoint[0]), len(precisePoint[1]))
+
+        x = Decimal(precisePoint[0])
+        y = Decimal(precisePoint[1])
+
+        return [str(x - Decimal(repr(halfWidth))), str(y - Decimal(repr(halfHeight))), str(x + Decimal(repr(halfWidth))), str(y + Decimal(repr(halfHeight)))]
+
+homeCoords = ["-2.25", "-1.5", "0.75", "1.5"] # The region of the mandlebrot set zoom factors are measured from
+
+# How many times smaller a region is than outerCoords along x and y. Worked out precisely (only the ratio becomes a
+# float), so it keeps working once floats can't tell the edges of the region apart anymore
+def zoomFactor(preciseCoords, outerCoords = homeCoords):
+    with localcontext() as context:
+        context.prec = precisionFor(preciseCoords, (2, 2))
+
+        x1, y1, x2, y2 = [Decimal(value) for value in preciseCoords]
+        outerX1, outerY1, outerX2, outerY2 = [Decimal(value) for value in toPreciseCoords(outerCoords)]
+
+        xMult = float(abs(outerX2 - outerX1) / abs(x2 - x1)) if x2 != x1 else float("inf")
+        yMult = float(abs(outerY2 - outerY1) / abs(y2 - y1)) if y2 != y1 else float("inf")
+
+        return xMult, yMult
+
+# How far across a region a precise point is, as fractions from 0 to 1 along x and y (the inverse of pointInRegion)
+def regionFraction(preciseCoords, precisePoint):
+    with localcontext() as context:
+        context.prec = precisionFor(preciseCoords, (2, 2))
+
+        x1, y1, x2, y2 = [Decimal(value) for value in preciseCoords]
+        x, y = [Decimal(value) for value in toPreciseCoords(precisePoint)]
+
+        xFraction = float((x - x1) / (x2 - x1)) if x2 != x1 else 0.5
+        yFraction = float((y - y1) / (y2 - y1)) if y2 != y1 else 0.5
+
+        return xFraction, yFraction
+
+# Iterate the center point with arbitrary precision. Returns Z_0 = 0, Z_1 = C, ... up to (and including) the iteration
+# it escaped at, as complex128
+def referenceOrbit(centerReal, centerImag, maxIterations, digits, shouldStop = None):
+    orbit = np.zeros(maxIterations + 1, dtype = np.complex128)
+
+    with localcontext() as context:
+        context.prec = digits
+
+        cr = Decimal(centerReal)
+        ci = Decimal(centerImag)
+        zr = Decimal(0)
+        zi = Decimal(0)
+
+        for i in range(maxIterations):
+            zr, zi = zr * zr - zi * zi + cr, 2 * zr * zi + ci
+
+            z = complex(float(zr), float(zi))
+            orbit[i + 1] = z
+
+            if z.real * z.real + z.imag * z.imag > 4:
+                return orbit[:i + 2]
+
+            if shouldStop != None and i % 1000 == 0 and shouldStop():
+                raise escapeTime.RenderCancelled()
+
+    return orbit
+
+# Iterates the per-pixel deltas against a reference orbit. Uses the same escape numbering as EscapeTimeEngine
+class PerturbationEngine():
+    progressInterval = 10 # How many iterations between progress callbacks
+
+    def __init__(self, orbit, dc):
+        dc = np.asarray(dc, dtype = np.complex128)
+
+        self.orbit = orbit
+        self.shape = dc.shape
+        self.size = dc.size
+
+        # The number of iterations that have been done so far
+        self.iteration = 0
+
+        # The number of times pixels have been rebased onto the start of the reference orbit
+        self.rebases = 0
+
+        # The iteration each point escaped at (-1 means it hasn't escaped yet)
+        self.escapeTimes = np.full(self.size, -1, dtype = np.int64)
+
+        # The state of the active points. index = position in the flattened image, m = position in the reference orbit
+        self.index = np.arange(self.size)
+        self.dc = dc.ravel().copy()
+        self.dz = np.zeros(self.size, dtype = np.complex128)
+        self.m = np.zeros(self.size, dtype = np.intp)
+
+    # Keep iterating the active points until maxIterations is reached (or until nothing is left to iterate).
+    # shouldStop is checked every progressInterval iterations, and RenderCancelled is raised once it returns True
+    def iterate(self, maxIterations, progressCallback = None, shouldStop = None):
+        last = len(self.orbit) - 1
+
+        with np.errstate(over = 'ignore', invalid = 'ignore'):
+            while self.iteration < maxIterations and len(self.index) > 0:
+                # dz = (2 * Z + dz) * dz + dc
+                step = self.orbit[self.m]
+                np.add(step, step, out = step)
+                np.add(step, self.dz, out = step)
+                np.multiply(step, self.dz, out = step)
+                np.add(step, self.dc, out = step)
+                self.dz = step
+                self.m += 1
+
+                # The full z = Z + dz
+                z = self.orbit[self.m]
+                np.add(z, self.dz, out = z)
+                magnitude = z.real * z.real + z.imag * z.imag
+
+                # Remember when points escaped, then drop them
+                escaped = magnitude > 4
+
+                if escaped.any():
+                    self.escapeTimes[self.index[escaped]] = self.iteration
+
+                    keep = ~escaped
+                    self.index = self.index[keep]
+                    self.dc = self.dc[keep]
+                    self.dz = self.dz[keep]
+                    self.m = self.m[keep]
+                    z = z[keep]
+                    magnitude = magnitude[keep]
+
+                # Rebase glitched points (|z| < |dz|) and points at the end of the reference orbit
+                rebase = magnitude < self.dz.real * self.dz.real + self.dz.imag * self.dz.imag
+                rebase |= self.m >= last
+
+                if rebase.any():
+                    self.dz[rebase] = z[rebase]
+                    self.m[rebase] = 0
+                    self.rebases += int(np.count_nonzero(rebase))
+
+                self.iteration += 1
+
+                if self.iteration % self.progressInterval == 0:
+                    if shouldStop != None and shouldStop():
+                        raise escapeTime.RenderCancelled()
+
+                    # Change the progress
+                    if progressCallback != None:
+                        progressCallback(self.iteration, maxIterations)
+
+    # The iteration each point diverged at, in the shape of the image. Points that never diverged get maxIterations
+    def getDivergenceTimes(self, maxIterations):
+        divergenceTimes = np.where((self.escapeTimes >= 0) & (self.escapeTimes < maxIterations), self.escapeTimes, maxIterations)
+
+        return divergenceTimes.reshape(self.shape)
+
+# Compute the iteration every point in a (precise) region of the mandlebrot set diverged at, using perturbation theory
+def computeMandlebrotSet(size, preciseCoords, maxIterations, progressCallback = None, shouldStop = None):
+    digits = precisionFor(preciseCoords, size)
+
+    with localcontext() as context:
+        context.prec = digits
+
+        x1, y1, x2, y2 = [Decimal(value) for value in preciseCoords]
+
+        # The reference is the center of the view, every pixel is an offset from it
+        centerReal = (x1 + x2) / 2
+        centerImag = (y1 + y2) / 2
+        spacingX = float((x2 - x1) / max(size[0] - 1, 1))
+        spacingY = float((y2 - y1) / max(size[1] - 1, 1))
+
+    orbit = referenceOrbit(centerReal, centerImag, maxIterations, digits, shouldStop)
+
+    dx = (np.arange(size[0]) - (size[0] - 1) / 2) * spacingX
+    dy = (np.arange(size[1]) - (size[1] - 1) / 2) * spacingY
+
+    engine = PerturbationEngine(orbit, dx[:, np.newaxis] + (dy[np.newaxis, :] * 1j))
+    engine.iterate(maxIterations, progressCallback, shouldStop)
+
+    return engine.getDivergenceTimes(maxIterations)
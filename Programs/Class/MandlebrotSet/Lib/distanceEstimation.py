@@ -0,0 +1,127 @@
+import numpy as np
+import Lib.escapeTime as escapeTime
+
+# Distance estimation (DEM) rendering of the mandlebrot and julia sets.
+#
+# Alongside z, every point also tracks the derivative of z: dz/dc for the mandlebrot set (dz = 2 * z * dz + 1, starting
+# at 0) and dz/dz0 for julia sets (dz = 2 * z * dz, starting at 1). Once a point escapes, 2 * |z| * log|z| / |dz| is an
+# estimate of how far it is from the boundary of the set (close to the boundary, the real distance is between a quarter
+# of it and all of it).
+#
+# Escape counts only see the filaments of the set that happen to go through a pixel's center, so at low resolutions
+# most of them vanish. With the distance, every pixel that's closer to the boundary than filamentWidth pixels gets drawn
+# (fading out with the distance), so filaments thinner than a pixel still show up as connected lines.
+#
+# The distance is also used to cull supersampling: only pixels within cullWidths pixels of the boundary get
+# supersampled, every other pixel is flat (far outside or inside of the set) and keeps the color of its center.
+
+bailout = 1000.0 # A big bailout makes the distance estimate a lot more accurate than the usual 2
+filamentWidth = 0.5 # Pixels closer than this many pixel widths to the boundary are drawn as part of the set
+cullWidths = 4 # Only pixels closer than this many pixel widths to the boundary are supersampled
+samples = 3 # Pixels near the boundary are supersampled with samples x samples points
+
+# Estimate the distance to the boundary of the set for every point (any shape). Points that never escape get 0.
+# Leave juliaC as None for the mandlebrot set. progressCallback gets called with (iteration, maxIterations).
+# Raises escapeTime.RenderCancelled once shouldStop returns True
+def estimateDistances(points, maxIterations, juliaC = None, progressCallback = None, shouldStop = None):
+    points = np.asarray(points, dtype = np.complex128)
+    distances = np.zeros(points.size, dtype = np.float64)
+
+    if juliaC == None:
+        # Points that are known to be inside never need to be iterated
+        active = np.flatnonzero(~escapeTime.mandlebrotInteriorMask(points.ravel()))
+        c = points.ravel()[active]
+        z = np.zeros(len(active), dtype = np.complex128)
+        dz = np.zeros(len(active), dtype = np.complex128)
+    else:
+        active = np.arange(points.size)
+        c = np.full(points.size, complex(juliaC))
+        z = points.ravel().copy()
+        dz = np.ones(points.size, dtype = np.complex128)
+
+    bailoutSquared = bailout * bailout
+
+    # Derivatives of points right next to the boundary can overflow, which just means they are (very) close to it
+    with np.errstate(over = 'ignore', invalid = 'ignore'):
+        for iteration in range(int(maxIterations)):
+            # The derivative uses the z from before this iteration
+            if juliaC == None:
+                dz = 2 * z * dz + 1
+            else:
+                dz = 2 * z * dz
+
+            z = z * z + c
+
+            magnitude = z.real * z.real + z.imag * z.imag
+            escaped = magnitude > bailoutSquared
+
+            if escaped.any():
+                # d = 2 * |z| * log|z| / |dz|, then take the escaped points out of the active set
+                size = np.sqrt(magnitude[escaped])
+                distances[active[escaped]] = np.nan_to_num(2 * size * np.log(size) / np.abs(dz[escaped]))
+
+                keep = ~escaped
+                active, z, dz, c = active[keep], z[keep], dz[keep], c[keep]
+
+                if len(active) == 0:
+                    break
+
+            if (iteration + 1) % escapeTime.EscapeTimeEngine.progressInterval == 0:
+                if shouldStop != None and shouldStop():
+                    raise escapeTime.RenderCancelled()
+
+                if progressCallback != None:
+                    progressCallback(iteration + 1, maxIterations)
+
+    return distances.reshape(points.shape)
+
+# How much of the set a point at a distance (in pixel widths) covers: all of it inside (distance 0) and close to the
+# boundary, fading out to nothing at filamentWidth
+def coverage(distances, pixelWidth):
+    return np.where(distances <= 0, 1.0, np.clip(1 - distances / (filamentWidth * pixelWidth), 0, 1))
+
+# Render a region with distance estimation. Returns how much of every pixel is covered by the set (0 to 1, indexed
+# [x][y] like the rendered images) and the number of pixels that were supersampled.
+# progressCallback gets called with (done, total), where the first half is the pixel centers and the second half the
+# supersampling. Leave juliaC as None for the mandlebrot set
+def computeDistanceCoverage(size, customCoords, maxIterations, juliaC = None, progressCallback = None, shouldStop = None):
+    def centerProgress(i, maxIterations):
+        if progressCallback != None:
+            progressCallback(i, 2 * maxIterations)
+
+    # The pixel centers first (the same points a normal render uses)
+    distances = estimateDistances(escapeTime.complexGrid(size, customCoords), maxIterations, juliaC, centerProgress, shouldStop)
+
+    xSpacing = (customCoords[2] - customCoords[0]) / max(size[0] - 1, 1)
+    ySpacing = (customCoords[3] - customCoords[1]) / max(size[1] - 1, 1)
+    pixelWidth = min(abs(xSpacing), abs(ySpacing))
+
+    pixelCoverage = coverage(distances, pixelWidth)
+
+    # Only pixels near the boundary are worth supersampling: escaped pixels that are close to it, and inside pixels next
+    # to an escaped one (there's no distance estimate from the inside)
+    inside = distances <= 0
+    padded = np.pad(~inside, 1, mode = 'edge')
+    nextToOutside = np.zeros(size, dtype = bool)
+
+    for dx in (0, 1, 2):
+        for dy in (0, 1, 2):
+            nextToOutside |= padded[dx:dx + size[0], dy:dy + size[1]]
+
+    near = np.where(inside, nextToOutside, distances < cullWidths * pixelWidth)
+    xs, ys = np.nonzero(near)
+
+    if samples > 1 and len(xs) > 0:
+        def sampleProgress(i, maxIterations):
+            if progressCallback != None:
+                progressCallback(maxIterations + i, 2 * maxIterations)
+
+        # samples x samples points evenly spread over every near pixel
+        offsets = (np.arange(samples) + 0.5) / samples - 0.5
+        subX = customCoords[0] + (xs[:, np.newaxis, np.newaxis] + offsets[np.newaxis, :, np.newaxis]) * xSpacing
+        subY = customCoords[1] + (ys[:, np.newaxis, np.newaxis] + offsets[np.newaxis, np.newaxis, :]) * ySpacing
+
+        subDistances = estimateDistances(subX + subY * 1j, maxIterations, juliaC, sampleProgress, shouldStop)
+        pixelCoverage[xs, ys] = coverage(subDistances, pixelWidth).mean(axis = (1, 2))
+
+    return pixelCoverage, len(xs)
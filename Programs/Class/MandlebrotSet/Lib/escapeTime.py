@@ -0,0 +1,383 @@
+import numpy as np
+
+# The escape-time iteration engine used by both the mandlebrot and the julia set.
+#
+# Instead of running every iteration over the whole image with boolean masks, the engine keeps only the points that
+# are still iterating, compacted into 1-D arrays along with an index map back into the (flattened) image. Escapes are
+# found by comparing |z|^2 against the squared bailout (no sqrt), and all of the per-iteration math is done in
+# preallocated scratch buffers, so once most of the points have escaped an iteration only costs as much as the points
+# that are left.
+#
+# Compacting every iteration would cost more than the iteration itself when only a handful of points escape, so escaped
+# points are "parked" instead (z = c = NaN stays NaN forever, so they can never escape or look periodic again) and the
+# arrays are only compacted once enough of them have piled up.
+#
+# Points that will never escape are the worst case since they run for every iteration. Those can be retired early:
+# the caller can pass in points that are already known to be inside (see mandlebrotInteriorMask), and with
+# checkPeriodicity on, every point's z is compared against a saved z that gets refreshed at doubling intervals (Brent's
+# method). Once an orbit comes back to the saved z (within periodicityTolerance) it is stuck in a cycle and is retired.
+#
+# Zoomed out, float32 is plenty to tell the pixels apart, and it halves the memory every iteration has to go through.
+# chooseFloatType picks float32 until the pixel spacing gets close to float32's precision, then switches to float64. The
+# divergence times use the smallest unsigned integer type that fits the iterations (see countType).
+#
+# Every progressInterval iterations the engine also records how many points escaped and how many were retired as
+# periodic in that window (its telemetry), which is what auto iterations decides when to stop with, and what to look at
+# when profiling where the iterations of a render go.
+
+ACTIVE = -1 # escapeTimes value of a point that is still iterating
+INTERIOR = -2 # escapeTimes value of a point that is known to never escape
+
+useFloat32 = True # Allow computing zoomed out regions with float32
+float32Margin = 1024 # float32 is used while the pixel spacing is more than this many float32 steps
+
+# Raised by the compute loops when their shouldStop function says the render isn't wanted anymore
+class RenderCancelled(Exception):
+    pass
+
+class EscapeTimeEngine():
+    progressInterval = 10 # How many iterations between progress callbacks
+    compactionRatio = 8 # Compact once more than 1 / compactionRatio of the active points are parked
+    checkPeriodicity = True # Retire points once their orbits repeat
+    periodicityTolerance = 1e-13 # How close z has to come back to the saved z to count as a cycle
+    firstCheckpoint = 8 # The iteration the saved z is first refreshed at (after that the interval doubles)
+
+    # iteration is the number of iterations z0 has already been through (for picking up points from another engine).
+    # floatType is the type the math is done in (np.float32 or np.float64)
+    def __init__(self, z0, c, bailout = 2.0, interior = None, iteration = 0, floatType = np.float64):
+        z0 = np.asarray(z0)
+        c = np.asarray(c)
+
+        self.shape = np.broadcast_shapes(z0.shape, c.shape)
+        self.size = int(np.prod(self.shape))
+        self.bailoutSquared = bailout * bailout
+        self.floatType = np.dtype(floatType)
+
+        # Orbits in float32 only come back to within float32's precision
+        self.toleranceSquared = (self.periodicityTolerance * np.finfo(self.floatType).eps / np.finfo(np.float64).eps) ** 2
+
+        # The number of iterations that have been done so far
+        self.iteration = iteration
+        self.nextCheckpoint = self.firstCheckpoint
+
+        while self.nextCheckpoint <= iteration:
+            self.nextCheckpoint *= 2
+
+        # The iteration each point escaped at (or ACTIVE / INTERIOR)
+        self.escapeTimes = np.full(self.size, ACTIVE, dtype = np.int32)
+
+        z0 = np.broadcast_to(z0, self.shape).ravel()
+        c = np.broadcast_to(c, self.shape).ravel()
+
+        # Points that are already known to be inside never need to be iterated
+        if interior is None:
+            active = np.arange(self.size)
+        else:
+            interior = np.broadcast_to(interior, self.shape).ravel()
+            self.escapeTimes[interior] = INTERIOR
+            active = np.flatnonzero(~interior)
+
+        # The compacted state of the active points, double buffered so compaction never has to allocate.
+        # index = position in the flattened image, zr/zi = z, cr/ci = c, sr/si = the saved z for periodicity checking
+        self.state = self.createBuffers(self.size)
+        self.spare = self.createBuffers(self.size)
+        self.count = len(active)
+        self.parked = 0
+
+        # (iteration, escaped, retired, still active) for every window of progressInterval iterations
+        self.telemetry = []
+        self.windowEscaped = 0
+        self.windowRetired = 0
+
+        n = self.count
+        self.state["index"][:n] = active
+        self.state["zr"][:n] = z0.real[active]
+        self.state["zi"][:n] = z0.imag[active]
+        self.state["cr"][:n] = c.real[active]
+        self.state["ci"][:n] = c.imag[active]
+        self.state["sr"][:n] = self.state["zr"][:n]
+        self.state["si"][:n] = self.state["zi"][:n]
+
+        # Scratch buffers. zr2/zi2 hold the squares of zr/zi between iterations
+        self.zr2 = np.empty(self.size, dtype = self.floatType)
+        self.zi2 = np.empty(self.size, dtype = self.floatType)
+        self.magnitude = np.empty(self.size, dtype = self.floatType)
+        self.scratch = np.empty(self.size, dtype = self.floatType)
+        self.escaped = np.empty(self.size, dtype = bool)
+        self.squareActive()
+
+    def createBuffers(self, size):
+        buffers = {"index": np.empty(size, dtype = np.intp)}
+
+        for name in ("zr", "zi", "cr", "ci", "sr", "si"):
+            buffers[name] = np.empty(size, dtype = self.floatType)
+
+        return buffers
+
+    # Recompute the squares of the active z values
+    def squareActive(self):
+        n = self.count
+        np.multiply(self.state["zr"][:n], self.state["zr"][:n], out = self.zr2[:n])
+        np.multiply(self.state["zi"][:n], self.state["zi"][:n], out = self.zi2[:n])
+
+    # Keep iterating the active points until maxIterations is reached (or until nothing is left to iterate).
+    # shouldStop is checked every progressInterval iterations, and RenderCancelled is raised once it returns True
+    def iterate(self, maxIterations, progressCallback = None, shouldStop = None):
+        toleranceSquared = self.toleranceSquared
+
+        with np.errstate(over = 'ignore', invalid = 'ignore'):
+            while not self.isFinished(maxIterations):
+                n = self.count
+                zr = self.state["zr"][:n]
+                zi = self.state["zi"][:n]
+                zr2 = self.zr2[:n]
+                zi2 = self.zi2[:n]
+
+                # z = z^2 + c, reusing the squares from the last escape test
+                np.multiply(zr, zi, out = zi)
+                np.multiply(zi, 2, out = zi)
+                np.add(zi, self.state["ci"][:n], out = zi)
+                np.subtract(zr2, zi2, out = zr)
+                np.add(zr, self.state["cr"][:n], out = zr)
+
+                # |z|^2 > bailout^2
+                np.multiply(zr, zr, out = zr2)
+                np.multiply(zi, zi, out = zi2)
+                magnitude = np.add(zr2, zi2, out = self.magnitude[:n])
+                escaped = np.greater(magnitude, self.bailoutSquared, out = self.escaped[:n])
+
+                if escaped.any():
+                    # Remember when they escaped, then take them out of the active set
+                    self.park(np.flatnonzero(escaped), self.iteration)
+
+                if self.checkPeriodicity:
+                    # Parking might have compacted the buffers
+                    n = self.count
+                    zr = self.state["zr"][:n]
+                    zi = self.state["zi"][:n]
+                    sr = self.state["sr"][:n]
+                    si = self.state["si"][:n]
+
+                    # |z - saved z|^2 < tolerance^2
+                    distance = np.subtract(zr, sr, out = self.magnitude[:n])
+                    np.multiply(distance, distance, out = distance)
+                    np.subtract(zi, si, out = self.scratch[:n])
+                    np.multiply(self.scratch[:n], self.scratch[:n], out = self.scratch[:n])
+                    np.add(distance, self.scratch[:n], out = distance)
+                    periodic = np.less(distance, toleranceSquared, out = self.escaped[:n])
+
+                    if periodic.any():
+                        self.park(np.flatnonzero(periodic), INTERIOR)
+
+                    # Refresh the saved z at doubling intervals
+                    if self.iteration + 1 == self.nextCheckpoint:
+                        n = self.count
+                        self.state["sr"][:n] = self.state["zr"][:n]
+                        self.state["si"][:n] = self.state["zi"][:n]
+                        self.nextCheckpoint *= 2
+
+                self.iteration += 1
+
+                if self.iteration % self.progressInterval == 0:
+                    self.recordWindow()
+
+                    if shouldStop != None and shouldStop():
+                        raise RenderCancelled()
+
+                    # Change the progress
+                    if progressCallback != None:
+                        progressCallback(self.iteration, maxIterations)
+
+        # The last window might not be a whole one
+        if self.windowEscaped + self.windowRetired > 0:
+            self.recordWindow()
+
+    # Add the escapes of the last window to the telemetry
+    def recordWindow(self):
+        self.telemetry.append((self.iteration, self.windowEscaped, self.windowRetired, self.count - self.parked))
+        self.windowEscaped = 0
+        self.windowRetired = 0
+
+    # Whether there is nothing left to iterate (every point is done or maxIterations has been reached)
+    def isFinished(self, maxIterations):
+        return self.iteration >= maxIterations or self.count == self.parked
+
+    # The points that are still iterating as (positions in the flattened image, z, c)
+    def getActive(self):
+        n = self.count
+        index = self.state["index"][:n]
+        active = self.escapeTimes[index] == ACTIVE
+
+        z = self.state["zr"][:n][active] + (self.state["zi"][:n][active] * 1j)
+        c = self.state["cr"][:n][active] + (self.state["ci"][:n][active] * 1j)
+
+        return index[active], z, c
+
+    # Record escapeTime for points (at positions in the active arrays) and turn them into NaNs so they stop iterating.
+    # Compacts once enough have been parked
+    def park(self, indices, escapeTime):
+        self.escapeTimes[self.state["index"][indices]] = escapeTime
+
+        if escapeTime == INTERIOR:
+            self.windowRetired += len(indices)
+        else:
+            self.windowEscaped += len(indices)
+
+        for array in (self.state["zr"], self.state["zi"], self.state["cr"], self.state["ci"], self.zr2, self.zi2):
+            array[indices] = np.nan
+
+        self.parked += len(indices)
+
+        if self.parked * self.compactionRatio >= self.count:
+            self.compact()
+
+    # Squeeze the points that are still active into the spare buffers, then swap the buffers
+    def compact(self):
+        n = self.count
+        keep = np.flatnonzero(self.escapeTimes[self.state["index"][:n]] == ACTIVE)
+        newCount = len(keep)
+
+        for name in self.state:
+            np.take(self.state[name][:n], keep, out = self.spare[name][:newCount])
+
+        self.state, self.spare = self.spare, self.state
+        self.count = newCount
+        self.parked = 0
+        self.squareActive()
+
+    # The iteration each point diverged at, in the shape of the image. Points that never diverged get maxIterations
+    def getDivergenceTimes(self, maxIterations):
+        divergenceTimes = np.where((self.escapeTimes >= 0) & (self.escapeTimes < maxIterations), self.escapeTimes, maxIterations)
+
+        return divergenceTimes.astype(countType(maxIterations), copy = False).reshape(self.shape)
+
+    # Everything needed to continue this render with a higher iteration limit later
+    def getResumeState(self, maxIterations):
+        positions, z, c = self.getActive()
+
+        return ResumeState(self.getDivergenceTimes(maxIterations), maxIterations, positions, z, c)
+
+# A finished render that can be continued with a different iteration limit. Only the points that were still iterating
+# when the limit was hit are kept (positions in the flattened image, z, c), so raising the limit only costs the extra
+# iterations of those points, and lowering it doesn't cost any iterations at all
+class ResumeState():
+    def __init__(self, divergenceTimes, maxIterations, positions, z, c):
+        self.divergenceTimes = divergenceTimes
+        self.maxIterations = maxIterations
+        self.positions = positions
+        self.z = z
+        self.c = c
+
+    # The divergence times for a new iteration limit. Raising the limit updates the state to the new limit
+    def resume(self, maxIterations, progressCallback = None, shouldStop = None):
+        # Points that escaped after the new limit count as not escaping
+        if maxIterations <= self.maxIterations:
+            return np.minimum(self.divergenceTimes, maxIterations)
+
+        engine = EscapeTimeEngine(self.z, self.c, iteration = self.maxIterations, floatType = self.z.real.dtype)
+        engine.iterate(maxIterations, progressCallback, shouldStop)
+
+        # Points that were known to be inside stay inside, the rest get their new divergence times
+        divergenceTimes = self.divergenceTimes.astype(countType(maxIterations))
+        divergenceTimes[divergenceTimes == self.maxIterations] = maxIterations
+        divergenceTimes.reshape(-1)[self.positions] = engine.getDivergenceTimes(maxIterations)
+
+        active, self.z, self.c = engine.getActive()
+        self.positions = self.positions[active]
+        self.divergenceTimes = divergenceTimes
+        self.maxIterations = maxIterations
+
+        return divergenceTimes
+
+# The smallest integer type that holds divergence times up to maxIterations. Divergence times are never negative (the
+# ACTIVE / INTERIOR values only live in the engine's escapeTimes, and getDivergenceTimes turns them into maxIterations),
+# so the types are unsigned
+def countType(maxIterations):
+    for dtype in (np.uint16, np.uint32):
+        if maxIterations <= np.iinfo(dtype).max:
+            return np.dtype(dtype)
+
+    return np.dtype(np.uint64)
+
+# The float type a region can be computed in: float32 while the pixels are far apart compared to its precision
+def chooseFloatType(size, customCoords):
+    spacing = min(abs(customCoords[2] - customCoords[0]) / max(size[0] - 1, 1), abs(customCoords[3] - customCoords[1]) / max(size[1] - 1, 1))
+
+    # Orbits go as far out as the bailout
+    magnitude = max(2.0, *[abs(value) for value in customCoords])
+
+    if useFloat32 and spacing > magnitude * np.finfo(np.float32).eps * float32Margin:
+        return np.dtype(np.float32)
+
+    return np.dtype(np.float64)
+
+# The values along one axis of a region, exactly like np.ogrid[start:stop:num * 1j][first:last]
+def gridAxis(start, stop, num, first = 0, last = None):
+    if last == None:
+        last = num
+
+    step = (stop - start) / float(num - 1) if num != 1 else 1
+
+    return np.arange(first, last, dtype = np.float64) * step + start
+
+# Create ALL the complex numbers in a region. Indexed [x][y] like the rendered images.
+# window = (x0, x1, y0, y1) only creates that part (in pixels) of the full image
+def complexGrid(size, customCoords, window = None, floatType = np.float64):
+    rMin = customCoords[0]
+    rMax = customCoords[2]
+    iMin = customCoords[1]
+    iMax = customCoords[3]
+
+    if window == None:
+        window = (0, size[0], 0, size[1])
+
+    # Create ALL the x and y values
+    x = gridAxis(rMin, rMax, size[0], window[0], window[1]).astype(floatType)[:, np.newaxis]
+    y = gridAxis(iMin, iMax, size[1], window[2], window[3]).astype(floatType)[np.newaxis, :]
+
+    return x + (y * 1j)
+
+# Find the points inside the main cardioid or the period-2 bulb of the mandlebrot set. Those never escape, so they
+# don't have to be iterated at all
+def mandlebrotInteriorMask(c):
+    x = c.real
+    y = c.imag
+
+    # Main cardioid
+    q = (x - 0.25) ** 2 + y * y
+    cardioid = q * (q + (x - 0.25)) <= 0.25 * y * y
+
+    # Period-2 bulb
+    bulb = (x + 1) ** 2 + y * y <= 0.0625
+
+    return cardioid | bulb
+
+# Create an engine for every point in a region of the mandlebrot set. floatType is picked automatically if it's None
+def createMandlebrotEngine(size, customCoords, window = None, floatType = None):
+    if floatType == None:
+        floatType = chooseFloatType(size, customCoords)
+
+    c = complexGrid(size, customCoords, window, floatType)
+
+    return EscapeTimeEngine(0j, c, interior = mandlebrotInteriorMask(c), floatType = floatType)
+
+# Create an engine for every point in a region of a julia set. floatType is picked automatically if it's None
+def createJuliaEngine(size, customCoords, juliaC, window = None, floatType = None):
+    if floatType == None:
+        floatType = chooseFloatType(size, customCoords)
+
+    return EscapeTimeEngine(complexGrid(size, customCoords, window, floatType), complex(juliaC), floatType = floatType)
+
+# Compute the iteration every point in a region of the mandlebrot set diverged at
+def computeMandlebrotSet(size, customCoords, maxIterations, progressCallback = None, window = None, floatType = None, shouldStop = None):
+    engine = createMandlebrotEngine(size, customCoords, window, floatType)
+    engine.iterate(maxIterations, progressCallback, shouldStop)
+
+    return engine.getDivergenceTimes(maxIterations)
+
+# Compute the iteration every point in a region of a julia set diverged at
+def computeJuliaSet(size, customCoords, maxIterations, juliaC, progressCallback = None, window = None, floatType = None, shouldStop = None):
+    engine = createJuliaEngine(size, customCoords, juliaC, window, floatType)
+    engine.iterate(maxIterations, progressCallback, shouldStop)
+
+    return engine.getDivergenceTimes(maxIterations)
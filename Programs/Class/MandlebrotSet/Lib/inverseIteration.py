@@ -0,0 +1,67 @@
+import numpy as np
+import Lib.escapeTime as escapeTime
+
+# Drawing julia sets with the inverse iteration method (IIM), for thousands of walkers at once.
+#
+# Running z -> z^2 + c backwards (z -> +-sqrt(z - c)) pulls every point towards the julia set, so after a few steps a
+# walker is on the set, and every step after that lands on another point of it. Every step, all of the walkers take
+# the square root together and pick one of the two roots at random.
+#
+# Plain IIM visits some parts of the set far more often than others (the thin, hard to reach parts barely show up). The
+# modified method (MIIM) keeps a count of the visits of every pixel, and walkers that land on a pixel that has already
+# been visited `saturation` times are moved to where another walker is instead. That way the walkers keep spreading
+# out to the parts of the set that haven't been drawn yet.
+
+burnIn = 25 # The number of steps every walker takes before it's close enough to the set to be drawn
+steps = 200 # The number of steps every walker takes (and draws) after the burn in
+saturation = 4 # The number of visits after which a pixel counts as drawn in the modified method
+
+# Compute how often every pixel in a region of a julia set was visited. Indexed [x][y] like the rendered images.
+# modified = True uses MIIM (see above). progressCallback gets called with (step, total steps) every 10 steps
+def computeInverseJulia(size, customCoords, juliaC, walkers, modified = False, progressCallback = None, shouldStop = None, seed = None):
+    rng = np.random.default_rng(seed)
+    c = complex(juliaC)
+
+    rMin, iMin, rMax, iMax = customCoords
+    width, height = size
+
+    visits = np.zeros(width * height, dtype = np.int32)
+
+    # Start every walker at a random point in the region
+    z = rMin + (rMax - rMin) * rng.random(walkers) + 1j * (iMin + (iMax - iMin) * rng.random(walkers))
+
+    for step in range(burnIn + steps):
+        # z = +-sqrt(z - c), picking one of the roots at random
+        z = np.sqrt(z - c)
+        z[rng.random(walkers) < 0.5] *= -1
+
+        if step % 10 == 0:
+            if shouldStop != None and shouldStop():
+                raise escapeTime.RenderCancelled()
+
+            if progressCallback != None:
+                progressCallback(step, burnIn + steps)
+
+        if step < burnIn:
+            continue
+
+        # The pixel every walker is on (walkers outside of the region keep walking but aren't drawn)
+        x = np.floor((z.real - rMin) / (rMax - rMin) * width).astype(np.intp)
+        y = np.floor((z.imag - iMin) / (iMax - iMin) * height).astype(np.intp)
+        inside = (x >= 0) & (x < width) & (y >= 0) & (y < height)
+        pixels = x * height + y
+
+        if modified:
+            # Walkers on saturated pixels get moved to the position of a random walker that isn't
+            saturated = np.zeros(walkers, dtype = bool)
+            saturated[inside] = visits[pixels[inside]] >= saturation
+            drawing = inside & ~saturated
+
+            if saturated.any() and drawing.any():
+                z[saturated] = z[rng.choice(np.flatnonzero(drawing), np.count_nonzero(saturated))]
+        else:
+            drawing = inside
+
+        visits += np.bincount(pixels[drawing], minlength = width * height).astype(np.int32)
+
+    return visits.reshape(size)
@@ -0,0 +1,36 @@
+import math
+import numpy as np
+
+# Live, low resolution previews of the julia set while the mouse is dragged across the mandlebrot set.
+#
+# A full resolution julia set can't keep up with the mouse, so previews are computed at a fraction of the resolution
+# and blown up to the full size. The fraction adapts to how long the last frames took: if a frame takes longer than the
+# target frame time the resolution goes down, and if there's time left over it goes back up. Cost grows with the number
+# of pixels (the square of the fraction), so the fraction is scaled by the square root of the time ratio.
+
+class AdaptiveResolution():
+    smoothing = 0.5 # How much of the correction is applied every frame (lower = steadier, higher = faster to adapt)
+
+    def __init__(self, targetFps = 30, scale = 0.25, minimumScale = 0.05, maximumScale = 0.5):
+        self.targetFrameTime = 1 / targetFps
+        self.scale = scale
+        self.minimumScale = minimumScale
+        self.maximumScale = maximumScale
+
+    # The size to compute a preview of an image of fullSize at
+    def getSize(self, fullSize):
+        return (max(8, int(fullSize[0] * self.scale)), max(8, int(fullSize[1] * self.scale)))
+
+    # Adapt the resolution to how long the last frame took (in seconds)
+    def update(self, frameTime):
+        ratio = math.sqrt(self.targetFrameTime / max(frameTime, 1e-4))
+        scale = self.scale * (1 + self.smoothing * (ratio - 1))
+
+        self.scale = min(max(scale, self.minimumScale), self.maximumScale)
+
+# Blow up an image ([y][x][rgb]) to a new width and height by repeating its pixels
+def upscaleImage(image, width, height):
+    rows = np.arange(height) * image.shape[0] // height
+    columns = np.arange(width) * image.shape[1] // width
+
+    return image[rows][:, columns]
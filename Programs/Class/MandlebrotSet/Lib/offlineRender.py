@@ -0,0 +1,50 @@
+import numpy as np
+import Lib.escapeTime as escapeTime
+import Lib.backends as backends
+import Lib.colorize as colorize
+import Lib.deepZoom as deepZoom
+import Lib.symmetry as symmetry
+
+# Rendering the sets without a window (for batch jobs, animations and benchmarks).
+#
+# This is the same pipeline the explorer uses, minus everything that draws while computing: deep zooms go through
+# perturbation, views that contain the axis of symmetry only get one side computed, every window is computed with a
+# compute backend (the fastest one that is available, see backends), and the escape counts are colored with the same palette lookup.
+
+# Compute the divergence times of a view ([x][y]). customCoords can be floats or precise strings (see deepZoom).
+# Leave juliaC as None for the mandlebrot set. backend is a backend name (None picks one automatically)
+def computeSet(size, customCoords, maxIterations, juliaC = None, useSymmetry = True, deepZooming = True, progressCallback = None, shouldStop = None, backend = None):
+    if juliaC == None and deepZooming and deepZoom.needsDeepZoom(size, customCoords):
+        # Too deep for floats, compute the pixels as offsets from a precise reference orbit
+        return deepZoom.computeMandlebrotSet(size, deepZoom.toPreciseCoords(customCoords), maxIterations, progressCallback, shouldStop)
+
+    customCoords = [float(value) for value in customCoords]
+    view = symmetry.findSymmetry(size, customCoords, juliaC != None) if useSymmetry else None
+    windows = [(0, size[0], 0, size[1])] if view == None else view.windows
+
+    divergenceTimes = np.full(size, maxIterations, dtype = escapeTime.countType(maxIterations))
+
+    for x0, x1, y0, y1 in windows:
+        windowSize, windowCoords = symmetry.windowView(size, customCoords, (x0, x1, y0, y1))
+
+        if juliaC == None:
+            divergenceTimes[x0:x1, y0:y1] = backends.computeMandlebrotSet(windowSize, windowCoords, maxIterations, progressCallback, shouldStop = shouldStop, backend = backend)
+        else:
+            divergenceTimes[x0:x1, y0:y1] = backends.computeJuliaSet(windowSize, windowCoords, maxIterations, juliaC, progressCallback, shouldStop = shouldStop, backend = backend)
+
+    return divergenceTimes if view == None else view.mirror(divergenceTimes)
+
+# Compute a view and color it ([y][x][rgb], the same way the explorer draws it). method is a colorize draw method
+def renderImage(size, customCoords, maxIterations, juliaC, method, palette, useSymmetry = True, deepZooming = True, shouldStop = None, backend = None):
+    divergenceTimes = computeSet(size, customCoords, maxIterations, juliaC, useSymmetry, deepZooming, shouldStop = shouldStop, backend = backend)
+
+    return colorize.colorize(divergenceTimes, maxIterations, np.amax(divergenceTimes), method, palette)
+
+# Render a view straight to a PNG file
+def renderPNG(path, size, customCoords, maxIterations, juliaC, method, palette, useSymmetry = True, deepZooming = True):
+    image = renderImage(size, customCoords, maxIterations, juliaC, method, palette, useSymmetry, deepZooming)
+
+    with open(path, "wb") as file:
+        file.write(colorize.encodePNG(image))
+
+    return path
@@ -0,0 +1,86 @@
+import numpy as np
+
+# Analyzing the orbit of a single point: the whole orbit is computed once, and then everything about it (whether it
+# diverged, the cycle it falls into, the cycle's multiplier) is worked out from that, so showing a clicked point doesn't
+# have to iterate anything again.
+#
+# Cycles are found with Brent's method: a saved z is refreshed at doubling intervals, and once the orbit comes back to
+# within tolerance of it, the distance since the last refresh is the period (or a multiple of it, for orbits that are
+# still closing in on their cycle, so the smallest period that also matches is used). That only costs one comparison
+# per iteration, instead of searching every point that was visited before. The preperiod (the number of points before
+# the orbit is in the cycle) is then found on the orbit array all at once.
+#
+# The multiplier of a cycle is the derivative of the orbit around it, the product of 2 * z over the points of the cycle.
+# Its size tells what kind of cycle it is: below 1 it's attracting (the point is inside of a bulb of that period), and
+# the closer it is to 0 the closer the point is to the center of the bulb.
+
+tolerance = 1e-9 # How close the orbit has to come back to a point to count as a cycle
+bailout = 2.0
+
+# Everything about the orbit of a point
+class OrbitInfo():
+    def __init__(self, orbit, iterations, diverged, period = 0, preperiod = 0, multiplier = None):
+        self.orbit = orbit # Every z of the orbit (starting with the first iteration), as a complex numpy array
+        self.iterations = iterations # The iteration the orbit diverged at (or the maximum iterations)
+        self.diverged = diverged
+        self.period = period # The period of the cycle the orbit falls into (0 if none was found)
+        self.preperiod = preperiod # The number of points of the orbit before the cycle
+        self.multiplier = multiplier # The multiplier of the cycle (None if none was found)
+
+    # The points of the cycle (empty if there is none)
+    def getCycle(self):
+        return self.orbit[self.preperiod:self.preperiod + self.period]
+
+# Iterate z = z^2 + c from z0 until it diverges, falls into a cycle or maxIterations is reached
+def analyzeOrbit(c, maxIterations, z0 = 0j):
+    c = complex(c)
+    z = complex(z0)
+    maxIterations = int(maxIterations)
+    orbit = np.empty(maxIterations, dtype = np.complex128)
+
+    # Brent's method: the saved z and the number of iterations since it was saved
+    saved = None
+    power = 1
+    distance = 0
+    toleranceSquared = tolerance * tolerance
+
+    for i in range(maxIterations):
+        z = z * z + c
+        orbit[i] = z
+
+        if z.real * z.real + z.imag * z.imag >= bailout * bailout:
+            return OrbitInfo(orbit[:i + 1], i, True)
+
+        if saved != None:
+            distance += 1
+            difference = z - saved
+
+            if difference.real * difference.real + difference.imag * difference.imag < toleranceSquared:
+                return findCycle(orbit[:i + 1], distance, maxIterations)
+
+        # Refresh the saved z at doubling intervals
+        if saved == None or distance == power:
+            saved = z
+            power *= 2
+            distance = 0
+
+    return OrbitInfo(orbit, maxIterations, False)
+
+# Work out the cycle of an orbit whose last point came back to within tolerance of the point period points before it
+def findCycle(orbit, period, maxIterations):
+    last = orbit[-1]
+
+    # Orbits that are still closing in on their cycle can be caught a few laps in, so use the smallest period that fits
+    for divisor in range(1, period):
+        if period % divisor == 0 and abs(last - orbit[-1 - divisor]) < tolerance:
+            period = divisor
+            break
+
+    # The first point that is already (within tolerance) on the cycle
+    matches = np.abs(orbit[period:] - orbit[:-period]) < tolerance
+    preperiod = int(np.argmax(matches))
+
+    cycle = orbit[preperiod:preperiod + period]
+    multiplier = complex(np.prod(2 * cycle))
+
+    return OrbitInfo(orbit, maxIterations, False, period, preperiod, multiplier)
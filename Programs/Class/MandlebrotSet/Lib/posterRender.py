@@ -0,0 +1,138 @@
+import json
+import os
+import numpy as np
+import Lib.colorize as colorize
+import Lib.deepZoom as deepZoom
+import Lib.escapeTime as escapeTime
+import Lib.offlineRender as offlineRender
+
+# Rendering images far bigger than memory (posters).
+#
+# A 30000x20000 image needs tens of GB for the complex grid, the masks and the escape counts if it's computed all at
+# once. Instead, the image is computed in bands of rows that are small enough to compute in memory (bandPixels pixels),
+# and every band's escape counts go straight into a memory mapped file on disk. The coloring needs the highest escape
+# count of the whole image, so the image is written in a second pass: band by band, the counts are read back, colored
+# and appended to a PNG (or PPM) that is written as a stream. Peak memory only depends on the band size.
+#
+# Every finished band is recorded in a state file next to the counts, so a render that crashed (or was stopped) picks up
+# at the first band that wasn't done when it's started again with the same settings.
+
+bandPixels = 2000000 # The most pixels computed at once (this is what bounds the memory use)
+
+# The files a poster keeps its progress in
+def countsPath(path):
+    return path + ".counts"
+
+def statePath(path):
+    return path + ".state.json"
+
+# The number of rows in a band
+def bandRows(size):
+    return max(1, bandPixels // size[0])
+
+# The rows of every band as (first row, last row + 1)
+def splitBands(size):
+    rows = bandRows(size)
+
+    return [(y0, min(y0 + rows, size[1])) for y0 in range(0, size[1], rows)]
+
+# Everything that has to match for a render to be resumed (finished bands are recorded by their index, so the band
+# layout has to match too)
+def makeSettings(size, customCoords, maxIterations, juliaC):
+    return {
+        "size": list(size),
+        "coords": deepZoom.toPreciseCoords(customCoords),
+        "iterations": int(maxIterations),
+        "juliaC": None if juliaC == None else [complex(juliaC).real, complex(juliaC).imag],
+        "bandRows": bandRows(size),
+    }
+
+# Load the state of an earlier render with the same settings (None if there isn't one)
+def loadState(path, settings):
+    if not os.path.exists(statePath(path)) or not os.path.exists(countsPath(path)):
+        return None
+
+    with open(statePath(path)) as file:
+        state = json.load(file)
+
+    if state["settings"] != settings:
+        print("The earlier render of the poster used different settings, starting over")
+        return None
+
+    return state
+
+# Save the state (to a temporary file first, so a crash while saving can't leave a broken state behind)
+def saveState(path, state):
+    temporary = statePath(path) + ".tmp"
+
+    with open(temporary, "w") as file:
+        json.dump(state, file)
+
+    os.replace(temporary, statePath(path))
+
+# Compute every band that isn't done yet into the memory mapped counts. Returns the counts ([y][x]) and the highest
+# escape count. progressCallback gets called with (bands done, total bands)
+def computeBands(path, size, customCoords, maxIterations, juliaC = None, restart = False, progressCallback = None, shouldStop = None):
+    settings = makeSettings(size, customCoords, maxIterations, juliaC)
+    dtype = escapeTime.countType(maxIterations)
+    bands = splitBands(size)
+
+    state = None if restart else loadState(path, settings)
+
+    if state == None:
+        state = {"settings": settings, "highest": {}}
+        counts = np.memmap(countsPath(path), dtype = dtype, mode = "w+", shape = (size[1], size[0]))
+    else:
+        print("Resuming the poster from band " + str(len(state["highest"]) + 1) + " of " + str(len(bands)))
+        counts = np.memmap(countsPath(path), dtype = dtype, mode = "r+", shape = (size[1], size[0]))
+
+    for i, (y0, y1) in enumerate(bands):
+        if str(i) in state["highest"]:
+            continue
+
+        # The band as a view of its own (precisely, so posters of deep zooms work too)
+        bandCoords = deepZoom.subRegion(settings["coords"], 0, y0 / max(size[1] - 1, 1), 1, (y1 - 1) / max(size[1] - 1, 1), size)
+        bandTimes = offlineRender.computeSet((size[0], y1 - y0), bandCoords, maxIterations, juliaC, shouldStop = shouldStop)
+
+        counts[y0:y1] = bandTimes.T
+        counts.flush()
+
+        # Only record the band once its counts are on disk
+        state["highest"][str(i)] = int(np.amax(bandTimes))
+        saveState(path, state)
+
+        if progressCallback != None:
+            progressCallback(len(state["highest"]), len(bands))
+
+    return counts, max(state["highest"].values())
+
+# Color the counts band by band into a streamed image file (PNG, or PPM if the path ends with .ppm)
+def writeImage(path, counts, maxIterations, highestIters, method, palette):
+    height, width = counts.shape
+
+    with open(path, "wb") as file:
+        if path.lower().endswith(".ppm"):
+            writer = colorize.PPMWriter(file, width, height)
+        else:
+            writer = colorize.PNGWriter(file, width, height)
+
+        for y0, y1 in splitBands((width, height)):
+            # colorize takes [x][y] and gives back [y][x][rgb]
+            writer.writeRows(colorize.colorize(np.asarray(counts[y0:y1]).T, maxIterations, highestIters, method, palette))
+
+        writer.close()
+
+# Render a poster. Leave juliaC as None for the mandlebrot set. Unless keepCounts is on, the counts and the state are
+# deleted once the image is written
+def renderPoster(path, size, customCoords, maxIterations, juliaC, method, palette, restart = False, keepCounts = False, progressCallback = None, shouldStop = None):
+    counts, highestIters = computeBands(path, size, customCoords, maxIterations, juliaC, restart, progressCallback, shouldStop)
+
+    writeImage(path, counts, maxIterations, highestIters, method, palette)
+
+    del counts
+
+    if not keepCounts:
+        os.remove(countsPath(path))
+        os.remove(statePath(path))
+
+    return path
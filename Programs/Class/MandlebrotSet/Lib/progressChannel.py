@@ -0,0 +1,71 @@
+import threading
+
+# Getting progress and status from the render threads to the window.
+#
+# Tk isn't thread safe, and redrawing a progress bar every few iterations also costs more than the iterations
+# themselves. So renders never touch the widgets: they post the newest progress and status into a channel, which only
+# stores them (a couple of assignments under a lock), and the tk main loop polls the channel every pollInterval and
+# only updates the widgets if something changed. The widgets get redrawn at most ~30 times a second, no matter how
+# often (or from how many threads) the render reports.
+#
+# Drawing works the same way: renders hand the widget updates they want (drawing a frame, enabling buttons, setting
+# labels) to call, and the poll runs them on the main loop in the order they were posted. Calls from a render that has
+# been cancelled by the time they'd run are dropped, so a stale frame never gets drawn over a newer (or cleared) one.
+#
+# post has the same (done, total) signature as the progressCallback of the compute functions, so it can be handed to
+# any of them directly. Multi-process backends report through the thread that collects their results (like tiledRender
+# does for every finished tile), so they never need to know about the window either.
+
+pollInterval = 33 # The number of milliseconds between polls (~30 updates per second)
+
+class ProgressChannel():
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.progress = 0.0 # The newest progress, from 0 to 1
+        self.status = None # The newest status text (None if it hasn't changed since the last poll)
+        self.changed = False
+        self.calls = [] # (shouldStop, function, args) of the calls waiting to be run on the main loop
+
+    # Post the progress as (done, total). Safe to call from any thread
+    def post(self, done, total):
+        with self.lock:
+            self.progress = done / total if total > 0 else 0.0
+            self.changed = True
+
+    # Set the status text, and optionally the progress (from 0 to 1) with it. Safe to call from any thread
+    def setStatus(self, text, progress = None):
+        with self.lock:
+            self.status = text
+
+            if progress != None:
+                self.progress = progress
+
+            self.changed = True
+
+    # Get what was posted since the last call as (progress, status text or None), or None if nothing was posted.
+    # Only called by the poll on the tk main loop
+    def take(self):
+        with self.lock:
+            if not self.changed:
+                return None
+
+            update = (self.progress, self.status)
+            self.status = None
+            self.changed = False
+
+            return update
+
+    # Run function(*args) on the main loop with the next poll, unless shouldStop returns True by then. Safe to call from
+    # any thread
+    def call(self, function, *args, shouldStop = None):
+        with self.lock:
+            self.calls.append((shouldStop, function, args))
+
+    # Get the calls that were posted since the last call, leaving out the cancelled ones. Only called by the poll on the
+    # tk main loop
+    def takeCalls(self):
+        with self.lock:
+            calls = self.calls
+            self.calls = []
+
+        return [(function, args) for shouldStop, function, args in calls if shouldStop == None or not shouldStop()]
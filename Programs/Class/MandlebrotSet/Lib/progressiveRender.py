@@ -0,0 +1,155 @@
+import time
+import numpy as np
+import Lib.escapeTime as escapeTime
+import Lib.backends as backends
+
+# Progressive (coarse to fine) rendering of the mandlebrot and julia sets.
+#
+# Instead of making the user wait for every pixel, the set is first computed on a grid of every 8th pixel and shown
+# upscaled, then refined on grids of every 4th, 2nd and finally every pixel. Every pass only computes the pixels the
+# coarser passes haven't already computed (3/4 of the grid), so the whole thing costs about as much as a normal render.
+#
+# A pass is shown as soon as almost all of its points are done (or it has used up a slice of the iterations). The points
+# that are still iterating are drawn as inside for now and get carried over into the next pass: once the next pass has
+# caught up to the same iteration they are iterated together, so the slow points never cost more iterations than they
+# would in a normal render.
+#
+# Even the coarsest pass can take a while at high iteration counts, so passes are iterated in blocks, and once
+# firstFrameTime has passed a provisional frame is shown.
+#
+# Compiled backends (see backends) stop every point the moment it escapes, so there are no slow points to carry over:
+# every pass is simply computed in one go.
+
+passSteps = (8, 4, 2, 1) # The pixel spacing of every pass, coarsest first
+firstFrameTime = 0.05 # Seconds until the first (provisional) frame is shown
+blockIterations = 16 # The number of iterations between checking the time and whether the pass is done
+settledFraction = 0.01 # A pass is shown once this fraction (or less) of its points is still iterating
+settledIterations = 1 / 16 # ... or once it has done this fraction of the iterations
+
+# Blow up a pass (every step-th pixel) to the full size by repeating every sample
+def upscale(divergenceTimes, step):
+    if step == 1:
+        return divergenceTimes.copy()
+
+    samples = divergenceTimes[::step, ::step]
+    upscaled = np.repeat(np.repeat(samples, step, axis = 0), step, axis = 1)
+
+    return upscaled[:divergenceTimes.shape[0], :divergenceTimes.shape[1]]
+
+# The pixels of a pass that weren't computed by the coarser pass, as a mask over the pass's grid
+def newSamples(size, step, first):
+    xs = np.arange(0, size[0], step)
+    ys = np.arange(0, size[1], step)
+
+    if first:
+        return np.ones((len(xs), len(ys)), dtype = bool)
+
+    return ~((xs % (step * 2) == 0)[:, np.newaxis] & (ys % (step * 2) == 0)[np.newaxis, :])
+
+# Compute a set progressively. Leave juliaC as None for the mandlebrot set.
+# Yields (step, divergenceTimes, resumeState) for every frame, with divergenceTimes already upscaled to the full size.
+# The last frame has a step of 1, is the full resolution render and is the only one with a resumeState (see
+# escapeTime.ResumeState). A provisional first frame (shown if the first pass is slow) has the step of the first pass too.
+# Raises escapeTime.RenderCancelled once shouldStop returns True. backend is a backend name (see backends)
+def renderProgressive(size, customCoords, maxIterations, juliaC = None, shouldStop = None, backend = None):
+    if backends.getBackend(backend).name != "numpy":
+        yield from renderPasses(size, customCoords, maxIterations, juliaC, shouldStop, backends.getBackend(backend))
+        return
+
+    startTime = time.time()
+    floatType = escapeTime.chooseFloatType(size, customCoords)
+    divergenceTimes = np.full(size, maxIterations, dtype = escapeTime.countType(maxIterations))
+    flatTimes = divergenceTimes.reshape(-1)
+
+    # Every pixel's coordinates (the same values a normal render uses) and position in the flattened image
+    x = escapeTime.gridAxis(customCoords[0], customCoords[2], size[0]).astype(floatType)
+    y = escapeTime.gridAxis(customCoords[1], customCoords[3], size[1]).astype(floatType)
+    pixels = np.arange(size[0] * size[1]).reshape(size)
+
+    settledIteration = max(int(maxIterations * settledIterations), blockIterations)
+
+    # The points the coarser passes haven't finished yet, as (pixel positions, z, c, iteration)
+    pending = None
+    shownFrame = False
+
+    for i, step in enumerate(passSteps):
+        lastPass = i == len(passSteps) - 1
+
+        mask = newSamples(size, step, i == 0)
+        positions = pixels[::step, ::step][mask]
+        points = (x[::step][:, np.newaxis] + (y[::step][np.newaxis, :] * 1j))[mask]
+        settled = len(points) * settledFraction
+
+        if juliaC == None:
+            engine = escapeTime.EscapeTimeEngine(0j, points, interior = escapeTime.mandlebrotInteriorMask(points), floatType = floatType)
+        else:
+            engine = escapeTime.EscapeTimeEngine(points, complex(juliaC), floatType = floatType)
+
+        if pending != None:
+            # Catch up with the leftover points, then iterate them along with the points of this pass
+            engine.iterate(pending[3], shouldStop = shouldStop)
+            flatTimes[positions] = engine.getDivergenceTimes(maxIterations)
+
+            active, z, c = engine.getActive()
+            positions = np.concatenate((positions[active], pending[0]))
+            engine = escapeTime.EscapeTimeEngine(np.concatenate((z, pending[1])), np.concatenate((c, pending[2])), iteration = engine.iteration, floatType = floatType)
+
+        while not engine.isFinished(maxIterations) and (lastPass or (engine.count - engine.parked > settled and engine.iteration < settledIteration)):
+            engine.iterate(min(engine.iteration + blockIterations, maxIterations), shouldStop = shouldStop)
+
+            if not shownFrame and time.time() - startTime >= firstFrameTime and not engine.isFinished(maxIterations):
+                flatTimes[positions] = engine.getDivergenceTimes(maxIterations)
+                shownFrame = True
+
+                yield step, upscale(divergenceTimes, step), None
+
+        # Points that are still iterating show up as inside until they are done
+        flatTimes[positions] = engine.getDivergenceTimes(maxIterations)
+
+        if engine.isFinished(maxIterations):
+            pending = None
+        else:
+            active, z, c = engine.getActive()
+            pending = (positions[active], z, c, engine.iteration)
+
+        shownFrame = True
+
+        if lastPass:
+            active, z, c = engine.getActive()
+            yield step, divergenceTimes.copy(), escapeTime.ResumeState(divergenceTimes, maxIterations, positions[active], z, c)
+        else:
+            yield step, upscale(divergenceTimes, step), None
+
+# Compute a set progressively with a compiled backend, every pass in one go (the same frames as renderProgressive, minus
+# the provisional one)
+def renderPasses(size, customCoords, maxIterations, juliaC, shouldStop, backend):
+    floatType = escapeTime.chooseFloatType(size, customCoords)
+    divergenceTimes = np.full(size, maxIterations, dtype = escapeTime.countType(maxIterations))
+    flatTimes = divergenceTimes.reshape(-1)
+
+    x = escapeTime.gridAxis(customCoords[0], customCoords[2], size[0]).astype(floatType)
+    y = escapeTime.gridAxis(customCoords[1], customCoords[3], size[1]).astype(floatType)
+    pixels = np.arange(size[0] * size[1]).reshape(size)
+
+    # The points that were still iterating at maxIterations in every pass, as (pixel positions, z, c)
+    leftover = ([], [], [])
+
+    for i, step in enumerate(passSteps):
+        mask = newSamples(size, step, i == 0)
+        positions = pixels[::step, ::step][mask]
+        points = (x[::step][:, np.newaxis] + (y[::step][np.newaxis, :] * 1j))[mask]
+
+        if juliaC == None:
+            times, active, z, c = backend.computeResumable(0j, points, maxIterations, floatType, escapeTime.mandlebrotInteriorMask(points), shouldStop = shouldStop)
+        else:
+            times, active, z, c = backend.computeResumable(points, complex(juliaC), maxIterations, floatType, None, shouldStop = shouldStop)
+
+        flatTimes[positions] = times
+
+        for values, new in zip(leftover, (positions[active], z, c)):
+            values.append(new)
+
+        if step == 1:
+            yield step, divergenceTimes.copy(), escapeTime.ResumeState(divergenceTimes, maxIterations, *[np.concatenate(values) for values in leftover])
+        else:
+            yield step, upscale(divergenceTimes, step), None
@@ -0,0 +1,130 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+import numpy as np
+import Lib.deepZoom as deepZoom
+
+# A cache of computed escape counts, so going back to a view that was already rendered (zooming out, bookmarks) doesn't
+# have to compute anything.
+#
+# Renders are keyed by everything that changes the escape counts: the set, the (precise) coordinates, the iterations,
+# the julia c and the render size. The cache has a byte budget and throws out the least recently used renders once it
+# goes over. If a directory is given, thrown out renders get written there as .npy files first (a second, bigger
+# LRU tier). Renders found on disk are memory mapped read only instead of being read back into memory, so going back to
+# them doesn't take any RAM (only the pages that get read).
+
+# Create the key of a view (everything but the iterations). Leave juliaC as None for the mandlebrot set
+def makeViewKey(setName, customCoords, juliaC, size):
+    if juliaC != None:
+        juliaC = (repr(complex(juliaC).real), repr(complex(juliaC).imag))
+
+    return (setName, tuple(deepZoom.toPreciseCoords(customCoords)), juliaC, tuple(size))
+
+# Create the key of a render. Leave juliaC as None for the mandlebrot set
+def makeKey(setName, customCoords, maxIterations, juliaC, size):
+    return makeViewKey(setName, customCoords, juliaC, size) + (int(maxIterations),)
+
+class RenderCache():
+    def __init__(self, maxBytes = 256 * 1024 * 1024, directory = None, maxDiskBytes = 2 * 1024 * 1024 * 1024):
+        self.maxBytes = maxBytes
+        self.directory = directory
+        self.maxDiskBytes = maxDiskBytes
+
+        # key -> escape counts (in memory) and key -> (path, bytes) (on disk), least recently used first
+        self.entries = OrderedDict()
+        self.diskEntries = OrderedDict()
+        self.bytes = 0
+        self.diskBytes = 0
+
+        # Hit statistics
+        self.hits = 0
+        self.diskHits = 0
+        self.misses = 0
+
+        # The mandlebrot and julia sets render on different threads
+        self.lock = threading.Lock()
+
+        if directory != None:
+            os.makedirs(directory, exist_ok = True)
+
+    # Get a cached render (or None). Renders found on disk stay there and are returned as a read only memory map
+    def get(self, key):
+        with self.lock:
+            if key in self.entries:
+                self.entries.move_to_end(key)
+                self.hits += 1
+
+                return self.entries[key]
+
+            if key in self.diskEntries:
+                self.diskEntries.move_to_end(key)
+                self.diskHits += 1
+
+                return np.load(self.diskEntries[key][0], mmap_mode = "r")
+
+            self.misses += 1
+
+            return None
+
+    # Cache a render
+    def put(self, key, divergenceTimes):
+        with self.lock:
+            if key in self.entries:
+                self.bytes -= self.entries.pop(key).nbytes
+
+            # The new render replaces the one on disk
+            if key in self.diskEntries:
+                path, size = self.diskEntries.pop(key)
+                self.diskBytes -= size
+
+                if os.path.exists(path):
+                    os.remove(path)
+
+            self.store(key, divergenceTimes)
+
+    # Forget every cached render (and delete the ones on disk)
+    def clear(self):
+        with self.lock:
+            for path, size in self.diskEntries.values():
+                if os.path.exists(path):
+                    os.remove(path)
+
+            self.entries.clear()
+            self.diskEntries.clear()
+            self.bytes = 0
+            self.diskBytes = 0
+
+    # Add a render to memory, then throw out the least recently used renders until the cache fits its budget again
+    def store(self, key, divergenceTimes):
+        # Too big to ever fit
+        if divergenceTimes.nbytes > self.maxBytes:
+            return
+
+        self.entries[key] = divergenceTimes
+        self.bytes += divergenceTimes.nbytes
+
+        while self.bytes > self.maxBytes:
+            oldKey, oldTimes = self.entries.popitem(last = False)
+            self.bytes -= oldTimes.nbytes
+
+            if self.directory != None:
+                self.spill(oldKey, oldTimes)
+
+    # Write a render that got thrown out of memory to disk
+    def spill(self, key, divergenceTimes):
+        if divergenceTimes.nbytes > self.maxDiskBytes:
+            return
+
+        path = os.path.join(self.directory, hashlib.sha1(repr(key).encode()).hexdigest() + ".npy")
+        np.save(path, divergenceTimes)
+
+        self.diskEntries[key] = (path, divergenceTimes.nbytes)
+        self.diskBytes += divergenceTimes.nbytes
+
+        while self.diskBytes > self.maxDiskBytes:
+            oldPath, oldSize = self.diskEntries.popitem(last = False)[1]
+            self.diskBytes -= oldSize
+
+            if os.path.exists(oldPath):
+                os.remove(oldPath)
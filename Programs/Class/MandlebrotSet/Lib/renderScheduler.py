@@ -0,0 +1,63 @@
+import threading
+import traceback
+import Lib.escapeTime as escapeTime
+
+# Runs renders on a background thread, always only the most recently requested one.
+#
+# Every request gets a new generation number. The running render is handed a shouldStop function that turns true as
+# soon as a newer request comes in, and the compute loops check it between iteration blocks and tiles (raising
+# RenderCancelled). Requests that come in while another render is running replace each other, so no matter how many
+# requests pile up, only the latest one is ever started.
+
+class RenderScheduler():
+    def __init__(self, name):
+        self.condition = threading.Condition()
+        self.generation = 0
+        self.pending = None # (generation, function, args) of the request waiting to be run
+        self.running = True
+
+        self.thread = threading.Thread(name = name, target = self.run, daemon = True)
+        self.thread.start()
+
+    # Ask for function(shouldStop, *args) to be run, cancelling the render that is running now
+    def request(self, function, *args):
+        with self.condition:
+            self.generation += 1
+            self.pending = (self.generation, function, args)
+            self.condition.notify()
+
+    # Cancel the running render (and anything that is waiting) without starting a new one
+    def cancel(self):
+        with self.condition:
+            self.generation += 1
+            self.pending = None
+
+    # Cancel everything and let the thread finish
+    def stop(self):
+        with self.condition:
+            self.running = False
+            self.generation += 1
+            self.pending = None
+            self.condition.notify()
+
+    def run(self):
+        while True:
+            with self.condition:
+                while self.running and self.pending == None:
+                    self.condition.wait()
+
+                if not self.running:
+                    return
+
+                generation, function, args = self.pending
+                self.pending = None
+
+            def shouldStop():
+                return self.generation != generation
+
+            try:
+                function(shouldStop, *args)
+            except escapeTime.RenderCancelled:
+                print("Cancelled a render that was replaced by a newer one")
+            except Exception:
+                traceback.print_exc()
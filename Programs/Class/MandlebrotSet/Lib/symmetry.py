@@ -0,0 +1,144 @@
+import numpy as np
+import Lib.escapeTime as escapeTime
+
+# Using the symmetry of the sets to skip computing pixels that are mirror images of other pixels.
+#
+# The mandlebrot set is symmetric about the real axis (c and its conjugate escape at the same iteration), and every julia
+# set is symmetric under a 180 degree rotation about the origin (z and -z land on the same z^2). When the view contains
+# the axis (or the origin), part of it is a mirror image of another part, and only the rest has to be computed.
+#
+# Pixel j along an axis is at start + j * step, so its mirror image (-start - j * step) is pixel K - j with
+# K = -2 * start / step. The mirror image only lands on pixels if K is a whole number, which it is for views centered on
+# the axis (like the home view) but not for most views that are off-center, so those are left alone.
+#
+# The part that still has to be computed is split into rectangular windows that are computed like views of their own.
+# For the mandlebrot set that's always one window (the rows on the bigger side of the axis), but for julia sets that
+# aren't centered horizontally the columns whose mirror image is outside of the view need windows of their own.
+
+tolerance = 1e-6 # How close (in pixels) a mirror image has to land on a pixel
+minimumMirrored = 0.1 # Symmetry is only used if at least this fraction of the pixels is mirrored
+
+# The number K that mirrors pixel j of an axis onto pixel K - j (or None if mirror images don't land on pixels)
+def mirrorOffset(start, stop, num):
+    if num < 2 or stop == start:
+        return None
+
+    offset = -2 * start / ((stop - start) / (num - 1))
+
+    if abs(offset - round(offset)) > tolerance:
+        return None
+
+    return int(round(offset))
+
+# The pixels along an axis that get mirrored as range(first, last), and the pixels that have to be computed as
+# range(computeFirst, computeLast). Mirrors the smaller side of the axis. None if nothing can be mirrored
+def splitAxis(offset, num):
+    if offset == None or offset < 1 or offset > 2 * num - 3:
+        return None
+
+    if offset <= num - 1:
+        # The axis is in the first half, so the pixels before it are mirror images of the pixels after it
+        middle = (offset + 1) // 2
+
+        return (0, middle), (middle, num)
+
+    # The axis is in the second half
+    middle = offset // 2 + 1
+
+    return (middle, num), (0, middle)
+
+# The size and coordinates of a window ((x0, x1, y0, y1) in pixels) of a view, as a view of its own
+def windowView(size, customCoords, window):
+    x0, x1, y0, y1 = window
+
+    if window == (0, size[0], 0, size[1]):
+        return size, customCoords
+
+    xStep = (customCoords[2] - customCoords[0]) / (size[0] - 1) if size[0] != 1 else 1
+    yStep = (customCoords[3] - customCoords[1]) / (size[1] - 1) if size[1] != 1 else 1
+
+    return (x1 - x0, y1 - y0), [customCoords[0] + x0 * xStep, customCoords[1] + y0 * yStep, customCoords[0] + (x1 - 1) * xStep, customCoords[1] + (y1 - 1) * yStep]
+
+# A view with a mirrored part. windows are the (x0, x1, y0, y1) pixel windows that still have to be computed
+class SymmetricView():
+    def __init__(self, windows, mirrored, xOffset, yOffset):
+        self.windows = windows
+        self.mirrored = mirrored # The (x0, x1, y0, y1) pixel window that gets mirrored from the rest
+        self.xOffset = xOffset # K of the x axis (None if x isn't mirrored)
+        self.yOffset = yOffset # K of the y axis
+
+    # Fill in the mirrored pixels of a full image of the view ([x][y]) from the pixels they mirror
+    def mirror(self, divergenceTimes):
+        x0, x1, y0, y1 = self.mirrored
+        xs = np.arange(x0, x1)
+        ys = np.arange(y0, y1)
+
+        if self.xOffset != None:
+            xs = self.xOffset - xs
+
+        divergenceTimes[x0:x1, y0:y1] = divergenceTimes[np.ix_(xs, self.yOffset - ys)]
+
+        return divergenceTimes
+
+# Find the part of a view that is a mirror image of another part of it. julia = True uses the 180 degree symmetry of
+# julia sets, otherwise the mandlebrot set's symmetry about the real axis is used. None if there's nothing to mirror
+def findSymmetry(size, customCoords, julia = False):
+    width, height = size
+    yOffset = mirrorOffset(customCoords[1], customCoords[3], height)
+    rows = splitAxis(yOffset, height)
+
+    if rows == None:
+        return None
+
+    (mirrorFirst, mirrorLast), (computeFirst, computeLast) = rows
+    windows = [(0, width, computeFirst, computeLast)]
+
+    if not julia:
+        mirrored = (0, width, mirrorFirst, mirrorLast)
+        xOffset = None
+    else:
+        # Only the columns whose mirror image is in the view can be mirrored
+        xOffset = mirrorOffset(customCoords[0], customCoords[2], width)
+
+        if xOffset == None:
+            return None
+
+        columnFirst = max(0, xOffset - width + 1)
+        columnLast = min(width, xOffset + 1)
+
+        if columnFirst >= columnLast:
+            return None
+
+        mirrored = (columnFirst, columnLast, mirrorFirst, mirrorLast)
+
+        # The rest of the mirrored rows gets computed normally
+        if columnFirst > 0:
+            windows.append((0, columnFirst, mirrorFirst, mirrorLast))
+
+        if columnLast < width:
+            windows.append((columnLast, width, mirrorFirst, mirrorLast))
+
+    if (mirrored[1] - mirrored[0]) * (mirrored[3] - mirrored[2]) < minimumMirrored * width * height:
+        return None
+
+    return SymmetricView(windows, mirrored, xOffset, yOffset)
+
+# The state to resume a view that was computed window by window from (see escapeTime.ResumeState).
+# windowStates is a list of (window, resume state of the window)
+class SymmetricResumeState():
+    def __init__(self, view, size, windowStates):
+        self.view = view
+        self.size = size
+        self.windowStates = windowStates
+        self.maxIterations = windowStates[0][1].maxIterations
+
+    # The divergence times for a new iteration limit
+    def resume(self, maxIterations, progressCallback = None, shouldStop = None):
+        divergenceTimes = np.full(self.size, maxIterations, dtype = escapeTime.countType(maxIterations))
+
+        for (x0, x1, y0, y1), state in self.windowStates:
+            divergenceTimes[x0:x1, y0:y1] = state.resume(maxIterations, progressCallback, shouldStop)
+
+        self.maxIterations = maxIterations
+
+        return self.view.mirror(divergenceTimes)
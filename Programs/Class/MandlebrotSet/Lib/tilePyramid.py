@@ -0,0 +1,168 @@
+import math
+from concurrent.futures import as_completed
+import numpy as np
+import Lib.escapeTime as escapeTime
+import Lib.backends as backends
+
+# Computing views out of a quadtree of fixed size tiles (like the tiles of a map), so panning and zooming only compute
+# the part of the view that wasn't computed before.
+#
+# Level 0 is a grid of tiles that are rootSize wide, and every level splits each tile into 4 (so its pixels are half as
+# far apart). Tile (level, x, y) holds the escape counts of the tilePixels x tilePixels points at
+# ((x * tilePixels + i) * spacing, (y * tilePixels + j) * spacing), so every level is one endless grid of points through
+# 0, and tiles of the same level line up no matter which view they were computed for.
+#
+# A view is drawn from the coarsest level whose pixels are at least as close together as its own (so a tile pixel is
+# between half and all of a view pixel), taking every view pixel from the nearest tile pixel. That's never blurrier
+# than the view, but it's only exact when the view's pixels land right on a level's grid. Tiles are cached by
+# (level, x, y, iterations, julia c) in a least recently used cache, so only the tiles that aren't cached get computed,
+# and going back to a view is free. While they are being computed, the missing tiles are drawn from the closest parent
+# tile that is cached (blown up), and the view gets redrawn after every batch of tiles.
+
+tilePixels = 64 # The width and height of a tile in pixels
+rootSize = 4.0 # The width of a level 0 tile
+batchTiles = 16 # The number of missing tiles computed at once (the view is redrawn after every batch)
+parentLevels = 8 # How many levels up to look for a parent tile to draw a missing tile with
+
+# The pixel spacing of a level
+def levelSpacing(level):
+    return rootSize / (tilePixels * 2 ** level)
+
+# The coarsest level whose pixel spacing is at most a spacing
+def levelFor(spacing):
+    return max(0, int(math.ceil(math.log2(rootSize / (tilePixels * spacing)) - 1e-9)))
+
+# The key of a tile in the cache. Leave juliaC as None for the mandlebrot set
+def tileKey(level, x, y, maxIterations, juliaC):
+    if juliaC != None:
+        juliaC = (repr(complex(juliaC).real), repr(complex(juliaC).imag))
+
+    return ("tile", level, x, y, int(maxIterations), juliaC)
+
+# Compute the escape counts of a batch of tiles of a level ((x, y) each). Returns them as (tiles, tilePixels, tilePixels)
+# (runs in the worker processes when multi-process rendering is on). backend is a backend name (see backends).
+# useFloat32 overrides escapeTime.useFloat32 (the workers don't see it change)
+def computeTiles(level, tiles, maxIterations, juliaC = None, progressCallback = None, shouldStop = None, backend = None, useFloat32 = None):
+    spacing = levelSpacing(level)
+    pixels = np.arange(tilePixels)
+
+    xs = np.array([(x * tilePixels + pixels) * spacing for x, y in tiles])
+    ys = np.array([(y * tilePixels + pixels) * spacing for x, y in tiles])
+
+    # The same float type for the whole batch (picked by the spacing, like a view of the batch would)
+    batchSize = (int(round((xs.max() - xs.min()) / spacing)) + 1, int(round((ys.max() - ys.min()) / spacing)) + 1)
+    floatType = escapeTime.chooseFloatType(batchSize, [xs.min(), ys.min(), xs.max(), ys.max()])
+
+    if useFloat32 == False:
+        floatType = np.dtype(np.float64)
+
+    points = xs.astype(floatType)[:, :, np.newaxis] + ys.astype(floatType)[:, np.newaxis, :] * 1j
+
+    if juliaC == None:
+        divergenceTimes = backends.getBackend(backend).computePoints(0j, points, maxIterations, floatType, escapeTime.mandlebrotInteriorMask(points), progressCallback, shouldStop)
+    else:
+        divergenceTimes = backends.getBackend(backend).computePoints(points, complex(juliaC), maxIterations, floatType, None, progressCallback, shouldStop)
+
+    return divergenceTimes.reshape(len(tiles), tilePixels, tilePixels)
+
+class TilePyramid():
+    def __init__(self, cache):
+        self.cache = cache # A renderCache.RenderCache to keep the tiles in
+
+    # The points of a view on a level: the global pixel indices along x and y of every view pixel
+    def viewIndices(self, size, customCoords, level):
+        spacing = levelSpacing(level)
+
+        xs = np.rint(escapeTime.gridAxis(customCoords[0], customCoords[2], size[0]) / spacing).astype(np.int64)
+        ys = np.rint(escapeTime.gridAxis(customCoords[1], customCoords[3], size[1]) / spacing).astype(np.int64)
+
+        return xs, ys
+
+    # The tiles a set of global pixel indices falls in, and the view pixels of every tile
+    def splitAxis(self, indices):
+        tiles = indices // tilePixels
+        first = np.flatnonzero(np.diff(tiles, prepend = tiles[0] - 1))
+
+        return [(int(tiles[start]), slice(start, end)) for start, end in zip(first, list(first[1:]) + [len(tiles)])]
+
+    # Put a view together out of the cached tiles. Missing tiles are drawn from their closest cached parent (or as
+    # inside, if there is none). Returns the divergence times and the missing tiles
+    def compose(self, size, customCoords, maxIterations, juliaC, level):
+        xs, ys = self.viewIndices(size, customCoords, level)
+        divergenceTimes = np.full(size, maxIterations, dtype = escapeTime.countType(maxIterations))
+        missing = []
+
+        for tileX, columns in self.splitAxis(xs):
+            for tileY, rows in self.splitAxis(ys):
+                tile = self.cache.get(tileKey(level, tileX, tileY, maxIterations, juliaC))
+
+                if tile is not None:
+                    divergenceTimes[columns, rows] = tile[np.ix_(xs[columns] - tileX * tilePixels, ys[rows] - tileY * tilePixels)]
+                    continue
+
+                missing.append((tileX, tileY))
+
+                # Blow up the closest parent that is cached
+                for up in range(1, min(parentLevels, level) + 1):
+                    parent = self.cache.get(tileKey(level - up, tileX >> up, tileY >> up, maxIterations, juliaC))
+
+                    if parent is not None:
+                        divergenceTimes[columns, rows] = parent[np.ix_((xs[columns] >> up) - (tileX >> up) * tilePixels, (ys[rows] >> up) - (tileY >> up) * tilePixels)]
+                        break
+
+        return divergenceTimes, missing
+
+    # Compute a view out of tiles. This is a generator: it yields (divergence times, number of tiles left) every time the
+    # view changes, first with the missing tiles drawn from their parents and then after every batch. The last one has 0
+    # tiles left. With a pool (see tiledRender.createPool), the batches are computed on every core.
+    # progressCallback gets called with (tiles done, tiles missing). Leave juliaC as None for the mandlebrot set. backend
+    # is a backend name (see backends)
+    def renderView(self, size, customCoords, maxIterations, juliaC = None, pool = None, progressCallback = None, shouldStop = None, backend = None):
+        spacing = min(abs(customCoords[2] - customCoords[0]) / max(size[0] - 1, 1), abs(customCoords[3] - customCoords[1]) / max(size[1] - 1, 1))
+        level = levelFor(spacing)
+
+        divergenceTimes, missing = self.compose(size, customCoords, maxIterations, juliaC, level)
+
+        if len(missing) == 0:
+            yield divergenceTimes, 0
+            return
+
+        print("Computing " + str(len(missing)) + " missing tiles on level " + str(level))
+        yield divergenceTimes, len(missing)
+
+        batches = [missing[i:i + batchTiles] for i in range(0, len(missing), batchTiles)]
+        done = 0
+
+        def finished(batch, counts):
+            nonlocal done
+
+            for (tileX, tileY), tile in zip(batch, counts):
+                self.cache.put(tileKey(level, tileX, tileY, maxIterations, juliaC), tile.copy())
+
+            done += len(batch)
+
+            if progressCallback != None:
+                progressCallback(done, len(missing))
+
+        if pool == None:
+            for batch in batches:
+                finished(batch, computeTiles(level, batch, maxIterations, juliaC, shouldStop = shouldStop, backend = backend, useFloat32 = escapeTime.useFloat32))
+
+                if done < len(missing):
+                    yield self.compose(size, customCoords, maxIterations, juliaC, level)[0], len(missing) - done
+        else:
+            futures = {pool.submit(computeTiles, level, batch, maxIterations, juliaC, None, None, backend, escapeTime.useFloat32): batch for batch in batches}
+
+            for future in as_completed(futures):
+                if shouldStop != None and shouldStop():
+                    for other in futures:
+                        other.cancel()
+
+                    raise escapeTime.RenderCancelled()
+
+                finished(futures[future], future.result())
+
+                if done < len(missing):
+                    yield self.compose(size, customCoords, maxIterations, juliaC, level)[0], len(missing) - done
+
+        yield self.compose(size, customCoords, maxIterations, juliaC, level)[0], 0
@@ -0,0 +1,136 @@
+import os
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from multiprocessing import shared_memory
+import Lib.escapeTime as escapeTime
+import Lib.backends as backends
+
+# Multi-process rendering of the mandlebrot and julia sets.
+#
+# The image is split into tiles that are handed out to a pool of processes. Every worker writes its escape counts
+# straight into one shared memory array, so nothing but the tile coordinates has to be sent between processes.
+# Tiles are scheduled most expensive first (interior heavy tiles take the longest), so no core is left waiting on one
+# big tile at the end.
+#
+# The shared memory has one extra byte after the escape counts: the stop flag. Once the render is cancelled the flag is
+# set, and the workers (which check it like any other shouldStop) drop the tiles they are in the middle of.
+
+tileSize = 64 # The width and height of a tile in pixels
+probeSize = 4 # The number of points along each side of a tile used to guess how long it will take
+probeIterations = 256 # The most iterations the probe points are iterated (enough to tell the slow tiles apart)
+stopInterval = 0.05 # The number of seconds between checking shouldStop while waiting for tiles
+
+# Create a pool of render processes
+def createPool(workers = None):
+    return ProcessPoolExecutor(max_workers = workers or os.cpu_count(), mp_context = backends.poolContext())
+
+# Split an image into tiles. Every tile is (x0, x1, y0, y1) in pixels
+def splitTiles(size, tileSize = tileSize):
+    tiles = []
+
+    for x0 in range(0, size[0], tileSize):
+        for y0 in range(0, size[1], tileSize):
+            tiles.append((x0, min(x0 + tileSize, size[0]), y0, min(y0 + tileSize, size[1])))
+
+    return tiles
+
+# Guess the cost of every tile by iterating a few points inside of it (for at most probeIterations). Points that don't
+# escape cost the most
+def estimateTileCosts(tiles, size, customCoords, maxIterations, juliaC = None):
+    probes = []
+
+    for tile in tiles:
+        xs = np.linspace(tile[0], tile[1] - 1, probeSize).astype(int)
+        ys = np.linspace(tile[2], tile[3] - 1, probeSize).astype(int)
+        probes.append(np.add.outer(escapeTime.gridAxis(customCoords[0], customCoords[2], size[0])[xs], escapeTime.gridAxis(customCoords[1], customCoords[3], size[1])[ys] * 1j))
+
+    probes = np.array(probes)
+
+    if juliaC == None:
+        engine = escapeTime.EscapeTimeEngine(0j, probes)
+    else:
+        engine = escapeTime.EscapeTimeEngine(probes, complex(juliaC))
+
+    iterations = min(maxIterations, probeIterations)
+    engine.iterate(iterations)
+
+    return engine.getDivergenceTimes(iterations).reshape(len(tiles), -1).sum(axis = 1)
+
+# Compute one tile into the shared escape count array (runs in a worker process). backend is a backend name (see
+# backends)
+def renderTile(sharedName, size, dtype, customCoords, maxIterations, juliaC, floatType, tile, backend = None):
+    shared = shared_memory.SharedMemory(name = sharedName)
+    stopFlag = size[0] * size[1] * np.dtype(dtype).itemsize
+
+    def shouldStop():
+        return shared.buf[stopFlag] != 0
+
+    try:
+        divergenceTimes = np.ndarray(size, dtype = dtype, buffer = shared.buf)
+
+        if juliaC == None:
+            data = backends.computeMandlebrotSet(size, customCoords, maxIterations, window = tile, shouldStop = shouldStop, backend = backend, floatType = floatType)
+        else:
+            data = backends.computeJuliaSet(size, customCoords, maxIterations, juliaC, window = tile, shouldStop = shouldStop, backend = backend, floatType = floatType)
+
+        divergenceTimes[tile[0]:tile[1], tile[2]:tile[3]] = data
+
+        del divergenceTimes
+    finally:
+        shared.close()
+
+    return tile
+
+# Compute the iteration every point diverged at using a pool of processes. Leave juliaC as None for the mandlebrot set.
+# progressCallback gets called with (tiles done, total tiles) every time a tile finishes. shouldStop is checked every
+# stopInterval: once it returns True the tiles that haven't started are cancelled, the running ones are stopped and
+# escapeTime.RenderCancelled is raised.
+# backend is a backend name (see backends)
+def renderTiled(pool, size, customCoords, maxIterations, juliaC = None, progressCallback = None, shouldStop = None, backend = None):
+    dtype = escapeTime.countType(maxIterations)
+    floatType = escapeTime.chooseFloatType(size, customCoords) # Picked here so every tile uses the same one
+    stopFlag = size[0] * size[1] * dtype.itemsize
+    shared = shared_memory.SharedMemory(create = True, size = stopFlag + 1)
+    shared.buf[stopFlag] = 0
+    divergenceTimes = np.ndarray(size, dtype = dtype, buffer = shared.buf)
+    futures = []
+
+    try:
+        # Most expensive tiles first
+        tiles = splitTiles(size)
+        costs = estimateTileCosts(tiles, size, customCoords, maxIterations, juliaC)
+        tiles = [tiles[i] for i in np.argsort(-costs, kind = "stable")]
+
+        futures = [pool.submit(renderTile, shared.name, size, dtype, customCoords, maxIterations, juliaC, floatType, tile, backend) for tile in tiles]
+
+        running = set(futures)
+        done = 0
+
+        while len(running) > 0:
+            finished, running = wait(running, timeout = stopInterval, return_when = FIRST_COMPLETED)
+
+            if shouldStop != None and shouldStop():
+                raise escapeTime.RenderCancelled()
+
+            for future in finished:
+                future.result()
+                done += 1
+
+            if progressCallback != None and len(finished) > 0:
+                progressCallback(done, len(tiles))
+
+        result = divergenceTimes.copy()
+    finally:
+        # Drop the tiles that haven't started, stop the running ones and let them finish writing before the memory goes away
+        shared.buf[stopFlag] = 1
+
+        for future in futures:
+            future.cancel()
+
+        wait(futures)
+
+        del divergenceTimes
+        shared.close()
+        shared.unlink()
+
+    return result
@@ -0,0 +1,179 @@
+from decimal import Decimal, localcontext
+import math
+import numpy as np
+import Lib.colorize as colorize
+import Lib.deepZoom as deepZoom
+import Lib.offlineRender as offlineRender
+
+# Keyframed zoom animations.
+#
+# The views between two keyframes are interpolated exponentially: the width and height shrink (or grow) by the same
+# factor every frame, and every edge moves towards the one point that stays in place on screen (for a zoom into a part of
+# the first view, that's the point the animation is zooming into). That makes the zoom look like it goes at a constant
+# speed, which a linear interpolation doesn't (it rushes through the wide views and crawls through the deep ones).
+# Everything is done with decimals, so animations can go as deep as the explorer can.
+#
+# Neighbouring frames mostly show the same points, so the frames aren't computed one by one. A run of frames gets one
+# key image that covers all of them at the pixel spacing of the deepest one, and every frame of the run takes each of
+# its pixels from the nearest key pixel (which is less than half a key pixel from where the pixel really is). A key
+# covers keyZoom worth of zoom, so with keyZoom = 2 a key costs about 4 frames but makes every frame of a 2x zoom.
+
+keyZoom = 2.0 # The most a run of frames made from one key image can zoom in (the key is up to this much bigger than a frame)
+
+# The number of decimal digits needed for the views of an animation
+def precisionFor(views, size):
+    return max(deepZoom.precisionFor(view, size) for view in views) + 10
+
+# Interpolate one axis ((low, high) decimals) exponentially. t goes from 0 to 1
+def interpolateAxis(low0, high0, low1, high1, t):
+    ratio = (high1 - low1) / (high0 - low0)
+
+    if abs(ratio - 1) < Decimal("1e-12"):
+        # The same width, so it's just a pan
+        return low0 + (low1 - low0) * t, high0 + (high1 - high0) * t
+
+    # The point that stays in place, and how much the axis has been scaled around it
+    fixed = (low1 - ratio * low0) / (1 - ratio)
+    scale = ratio ** t
+
+    return fixed + (low0 - fixed) * scale, fixed + (high0 - fixed) * scale
+
+# The views (precise coordinates) of the frames from start to end (both included)
+def interpolateViews(start, end, frameCount, size):
+    views = []
+
+    with localcontext() as context:
+        context.prec = precisionFor([start, end], size)
+
+        x0, y0, x1, y1 = [Decimal(value) for value in start]
+        endX0, endY0, endX1, endY1 = [Decimal(value) for value in end]
+
+        for i in range(frameCount):
+            t = Decimal(i) / max(frameCount - 1, 1)
+
+            low, high = interpolateAxis(x0, x1, endX0, endX1, t)
+            bottom, top = interpolateAxis(y0, y1, endY0, endY1, t)
+
+            views.append([str(low), str(bottom), str(high), str(top)])
+
+    return views
+
+# How far apart two views are, in zoom levels (plus how many view widths it pans)
+def viewDistance(start, end):
+    startWidth = abs(float(Decimal(start[2]) - Decimal(start[0])))
+    endWidth = abs(float(Decimal(end[2]) - Decimal(end[0])))
+
+    startCenter = (Decimal(start[0]) + Decimal(start[2])) / 2, (Decimal(start[1]) + Decimal(start[3])) / 2
+    endCenter = (Decimal(end[0]) + Decimal(end[2])) / 2, (Decimal(end[1]) + Decimal(end[3])) / 2
+    pan = math.hypot(float(endCenter[0] - startCenter[0]), float(endCenter[1] - startCenter[1]))
+
+    return abs(math.log(endWidth / startWidth)) + pan / min(startWidth, endWidth)
+
+# The views of all the frames of an animation through a list of keyframes (precise coordinates). The frames are shared
+# out between the keyframes by how far apart they are, so the speed stays the same the whole way
+def pathViews(keyframes, frameCount, size):
+    if len(keyframes) < 2:
+        return [deepZoom.toPreciseCoords(keyframes[0])] * frameCount
+
+    keyframes = [deepZoom.toPreciseCoords(view) for view in keyframes]
+    distances = [max(viewDistance(keyframes[i], keyframes[i + 1]), 1e-9) for i in range(len(keyframes) - 1)]
+    total = sum(distances)
+
+    views = []
+    done = 0.0
+
+    for i, distance in enumerate(distances):
+        # The frame the segment ends at (the last segment ends at the last frame)
+        done += distance
+        end = round(done / total * (frameCount - 1))
+        start = len(views) - 1 if len(views) > 0 else 0
+
+        if end <= start:
+            continue
+
+        segment = interpolateViews(keyframes[i], keyframes[i + 1], end - start + 1, size)
+
+        # Segments share their first frame with the end of the one before
+        views += segment if len(views) == 0 else segment[1:]
+
+    if len(views) == 0:
+        views = [keyframes[0]]
+
+    return views
+
+# A run of frames that get made from the same key image
+class KeyImage():
+    def __init__(self, coords, size, frames):
+        self.coords = coords # The precise coordinates of the key image
+        self.size = size # The size of the key image in pixels
+        self.frames = frames # The views of the frames made from it
+
+# The key image that covers views at the spacing of the deepest of them (as decimals: low x, low y, spacing x, spacing y, size)
+def coveringKey(views, size):
+    lowX = min(Decimal(view[0]) for view in views)
+    lowY = min(Decimal(view[1]) for view in views)
+    highX = max(Decimal(view[2]) for view in views)
+    highY = max(Decimal(view[3]) for view in views)
+
+    spacingX = min((Decimal(view[2]) - Decimal(view[0])) / max(size[0] - 1, 1) for view in views)
+    spacingY = min((Decimal(view[3]) - Decimal(view[1])) / max(size[1] - 1, 1) for view in views)
+
+    keySize = (int(math.ceil((highX - lowX) / spacingX)) + 1, int(math.ceil((highY - lowY) / spacingY)) + 1)
+
+    return lowX, lowY, spacingX, spacingY, keySize
+
+# Split the frames of an animation into runs that share a key image. A run grows until its key would be more than
+# keyZoom times the size of a frame
+def groupFrames(views, size):
+    keys = []
+
+    with localcontext() as context:
+        context.prec = precisionFor(views, size)
+
+        first = 0
+
+        while first < len(views):
+            last = first + 1
+
+            while last < len(views):
+                keySize = coveringKey(views[first:last + 1], size)[4]
+
+                if keySize[0] > keyZoom * size[0] or keySize[1] > keyZoom * size[1]:
+                    break
+
+                last += 1
+
+            lowX, lowY, spacingX, spacingY, keySize = coveringKey(views[first:last], size)
+            coords = [str(lowX), str(lowY), str(lowX + spacingX * (keySize[0] - 1)), str(lowY + spacingY * (keySize[1] - 1))]
+
+            keys.append(KeyImage(coords, keySize, views[first:last]))
+            first = last
+
+    return keys
+
+# The key pixels (along one axis) that the pixels of a frame take their values from
+def sampleAxis(low, high, keyLow, keyHigh, num, keyNum):
+    keySpacing = (Decimal(keyHigh) - Decimal(keyLow)) / max(keyNum - 1, 1)
+    start = float((Decimal(low) - Decimal(keyLow)) / keySpacing)
+    step = float((Decimal(high) - Decimal(low)) / max(num - 1, 1) / keySpacing)
+
+    return np.clip(np.rint(start + np.arange(num) * step), 0, keyNum - 1).astype(np.intp)
+
+# Compute a key image and make its frames from it. Returns the frames as images ([y][x][rgb]).
+# Leave juliaC as None for the mandlebrot set
+def renderKey(key, size, maxIterations, juliaC, method, palette):
+    divergenceTimes = offlineRender.computeSet(key.size, key.coords, maxIterations, juliaC)
+
+    images = []
+
+    with localcontext() as context:
+        context.prec = precisionFor([key.coords], key.size)
+
+        for view in key.frames:
+            xs = sampleAxis(view[0], view[2], key.coords[0], key.coords[2], size[0], key.size[0])
+            ys = sampleAxis(view[1], view[3], key.coords[1], key.coords[3], size[1], key.size[1])
+
+            frame = divergenceTimes[np.ix_(xs, ys)]
+            images.append(colorize.colorize(frame, maxIterations, np.amax(frame), method, palette))
+
+    return images
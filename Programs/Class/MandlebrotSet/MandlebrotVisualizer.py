@@ -2,9 +2,26 @@ import array
 import os
 import random
 import struct
+import tempfile
 import time
+import traceback
 from Lib.NewDEGraphics import *
 import Lib.NewDEGraphics as ndg
+import Lib.escapeTime as escapeTime
+import Lib.tiledRender as tiledRender
+import Lib.colorize as colorize
+import Lib.deepZoom as deepZoom
+import Lib.progressiveRender as progressiveRender
+import Lib.renderCache as renderCache
+import Lib.renderScheduler as renderScheduler
+import Lib.juliaPreview as juliaPreview
+import Lib.distanceEstimation as distanceEstimation
+import Lib.symmetry as symmetry
+import Lib.orbitAnalysis as orbitAnalysis
+import Lib.progressChannel as progressChannel
+import Lib.tilePyramid as tilePyramid
+import Lib.autoIterations as autoIterations
+import Lib.backends as backends
 import threading
 import math
 import numpy as np
@@ -29,13 +46,27 @@ class MandlebrotSetExplorer():
     # renderSweeps = 4 # The number of sweeps to use when rendering
 
     mandlebrotIterations = 100 # The iterations of the mandlebrot set used when drawing
-    mandlebrotDrawMethod = 1 # The method to use to draw the mandlebrot set. 1 = Escape Colors, 2 = Two-Tone
+    mandlebrotAutoIterations = False # Stop iterating the mandlebrot set once its escapes die down (and use that as the iterations)
+    mandlebrotDrawMethod = 1 # The method to use to draw the mandlebrot set. 1 = Escape Colors, 2 = Two-Tone, 4 = Distance Estimation
     mandlebrotSounds = False
     SAMPLE_RATE = 44100 # The sample rate for mandlebrot sounds (don't touch)
     
     juliaIterations = 100 # The iterations of the julia set used when drawing
-    juliaDrawMethod = 1 # The method to use to draw the julia set. 1 = Escape Colors, 2 = Two-Tone Threshold, 3 = Two-Tone (inverse)
+    juliaDrawMethod = 1 # The method to use to draw the julia set. 1 = Escape Colors, 2 = Two-Tone Threshold, 3 = Two-Tone (inverse), 4 = Two-Tone (modified inverse), 6 = Distance Estimation
     autoComputeJuliaSet = False
+    juliaPreviewFps = 30 # The frame rate the julia set preview tries to keep up while dragging across the mandlebrot set
+    juliaPreviewSettleTime = 250 # Milliseconds the mouse has to stop for before the full julia set is drawn
+
+    multiProcessRendering = False # Split renders into tiles and compute them on every core
+    renderWorkers = os.cpu_count() # The number of processes used for multi-process rendering
+    progressiveRendering = True # Show coarse versions of the sets while they are being computed
+    renderCacheSize = 256 # The number of megabytes of rendered sets to keep around (for zooming out and bookmarks)
+    cacheRendersOnDisk = False # Write renders that don't fit in the render cache to disk instead of forgetting them
+    deepZooming = True # Switch to perturbation theory once floats can't tell the pixels of the mandlebrot set apart
+    useSymmetry = True # Only compute one side of views that contain the axis of symmetry of the set (and mirror the rest)
+    useTilePyramid = False # Compute the mandlebrot set out of cached tiles, so panning and zooming only compute the new tiles (approximate, and without resuming, progressive rendering or symmetry)
+    tileCacheSize = 128 # The number of megabytes of tiles to keep around
+    computeBackend = "auto" # The backend that computes the escape counts (see backends). "auto" picks the fastest one that is installed
 
     backgroundColor = (0, 0, 0)
     
@@ -311,15 +342,18 @@ class MandlebrotSetExplorer():
                (0.987387, 0.984288, 0.742002),
                (0.987053, 0.991438, 0.749504)]
     #endregion
+    
+    palette = colorize.buildPalette(colorMap) # The color map as a lookup table of uint8 colors
 
     mandlebrotCustomCoords = [-2.25, -1.5, 0.75, 1.5] # The region of the mandlebrot set to draw
+    mandlebrotPreciseCoords = deepZoom.toPreciseCoords(mandlebrotCustomCoords) # The same region as arbitrary-precision strings (used for deep zooms)
     juliaCustomCoords = [-2.25, -1.5, 2.25, 1.5] # The region of the julia set to draw
     
     mandlebrotZoomHistory = []
     juliaZoomHistory = []
     
-    orbitLinePool = [] # A pool of lines for drawing orbits
-    orbitEllipsePool = [] # A pool of ellipses for drawing orbits
+    orbitDrawTime = 0.5 # The number of seconds it takes to draw an orbit
+    orbitFps = 30 # The frame rate orbits are drawn at
     
     bookmarks = []
     
@@ -335,21 +369,34 @@ class MandlebrotSetExplorer():
         # Make the window blurred
         # self.mainWin.setFrostedGlass(True)
         
-        # Fill the pools
-        for i in range(0, 50):
-            self.orbitLinePool.append(Line(None, 0, 0, 0, 0, 'red'))
-            self.orbitEllipsePool.append(Ellipse(None, 0, 0, 0, 0, 'red'))
+        # The lines the orbit of the clicked point and the cycle it falls into are drawn with
+        self.orbitPath = PolyLine(None, (0, 0, 0, 0), 'red')
+        self.orbitCycle = PolyLine(None, (0, 0, 0, 0), 'green', 2)
         
         # Prevent an error
         self.dgImg = None
         self.clickedPointPixel = None
         self.clickedPoint = None
+        self.clickedPointPrecise = None
         self.orbitDrawThread = None
-        self.mandlebrotRenderThread = None
-        self.juliaRenderThread = None
+        self.mandlebrotScheduler = renderScheduler.RenderScheduler("mandlebrotRenderThread")
+        self.juliaScheduler = renderScheduler.RenderScheduler("juliaRenderThread")
+        self.mandlebrotChannel = progressChannel.ProgressChannel() # Progress and status posted by the mandlebrot render thread
+        self.juliaChannel = progressChannel.ProgressChannel()
+        self.progressTimer = None
+        self.juliaPreviewResolution = juliaPreview.AdaptiveResolution(self.juliaPreviewFps)
+        self.juliaPreviewTimer = None
+        self.renderPool = None
+        self.renderCache = self.createRenderCache()
+        self.tilePyramid = tilePyramid.TilePyramid(renderCache.RenderCache(self.tileCacheSize * 1024 * 1024))
+        self.mandlebrotResumeState = None
+        self.juliaResumeState = None
+        self.mandlebrotTelemetry = None # The escape telemetry of the last mandlebrot set computed with the escape time engine
+        self.suggestedIterations = None
         self.clickedMandlebrot = False
         
         self.cyclePeriod = 0
+        self.orbitInfo = None
     
         self.imageWidth = int(self.width * 0.4)
         rightSideWidth = int(self.width * 0.13)
@@ -408,6 +455,10 @@ class MandlebrotSetExplorer():
                         # Render times
                         self.mandlebrotRenderTimeLabel = Label("Render time: -s")
                         
+                        # Suggested iterations for the next zoom level
+                        self.suggestedIterationsLabel = Label("Suggested iterations: -")
+                        Tooltip(self.suggestedIterationsLabel, "A guess at how many iterations the next zoom level (2x deeper) needs, from the zoom depth and (with auto iterations on) the iteration the escapes of this view died down at.")
+                        
                         # Zoom factor
                         self.mandlebrotZoomFactorLabel = Label("Zoom factor: 1cm")
                         self.mandlebrotZoomFactorTooltip = Tooltip(self.mandlebrotZoomFactorLabel, "The zoom factor is a way to comprehend the scale of the width of the mandlebrot set. As you zoom in, the width of the unzoomed mandlebrot set grows.")
@@ -486,16 +537,153 @@ class MandlebrotSetExplorer():
             # Load the saved bookmarks from the json
             self.loadBookmarks()
         
+        # Start showing the progress the render threads post
+        self.pollProgress()
+        
         self.mainWin.update()
     
     #region Rendering and computation
     
+    # Show the progress and status the render threads posted to their channels, and run the widget updates they posted
+    # (runs on the tk main loop, every progressChannel.pollInterval milliseconds)
+    def pollProgress(self):
+        for channel, progressBar, statusText in ((self.mandlebrotChannel, self.mandlebrotProgress, self.mandlebrotStatusText), (self.juliaChannel, self.juliaProgress, self.juliaStatusText)):
+            # Draw what the render threads asked for
+            for function, args in channel.takeCalls():
+                try:
+                    function(*args)
+                except Exception:
+                    traceback.print_exc()
+            
+            update = channel.take()
+            
+            if update == None:
+                continue
+            
+            progress, status = update
+            progressBar.setValue(lerp(progress, 0, 100))
+            
+            if status != None:
+                statusText.text = status
+        
+        self.progressTimer = self.mainWin.after(progressChannel.pollInterval, self.pollProgress)
+    
+    # Get the pool of processes used for multi-process rendering (it's only created the first time it's needed)
+    def getRenderPool(self):
+        if self.renderPool == None:
+            self.renderPool = tiledRender.createPool(self.renderWorkers)
+        
+        return self.renderPool
+    
+    # Compute a set coarse to fine, drawing every pass (upscaled) as soon as it's done. Leave juliaC as None for the
+    # mandlebrot set. Returns the full resolution divergence times and the state to resume them from.
+    # If the view is only a window of the image, place(divergenceTimes) puts a pass into the full image and returns it
+    def computeProgressively(self, plot, channel, size, customCoords, maxIterations, juliaC, drawMethod, shouldStop = None, place = None):
+        for step, divergenceTimes, resumeState in progressiveRender.renderProgressive(size, customCoords, maxIterations, juliaC, shouldStop, self.computeBackend):
+            # Change the progress bar
+            channel.post(progressiveRender.passSteps.index(step) + 1, len(progressiveRender.passSteps))
+            
+            # The full resolution pass gets drawn like a normal render
+            if step != 1:
+                frame = divergenceTimes if place == None else place(divergenceTimes)
+                image = colorize.colorize(frame, maxIterations, np.amax(frame), drawMethod, self.palette)
+                channel.call(plot.plotBulk, 0, 0, colorize.encodePPM(image), shouldStop = shouldStop)
+        
+        return divergenceTimes, resumeState
+    
+    # Compute a view of a set (after the cache, resuming and deep zooming had no luck). Views that contain the set's axis
+    # of symmetry only get one side computed, in windows (see symmetry), and the other side is mirrored. Leave juliaC as
+    # None for the mandlebrot set. Returns the divergence times and the state to resume them from (or None)
+    def computeView(self, plot, channel, size, customCoords, maxIterations, juliaC, drawMethod, shouldStop = None):
+        view = symmetry.findSymmetry(size, customCoords, juliaC != None) if self.useSymmetry else None
+        windows = [(0, size[0], 0, size[1])] if view == None else view.windows
+        
+        if view != None:
+            x0, x1, y0, y1 = view.mirrored
+            print("Mirroring " + str(round((x1 - x0) * (y1 - y0) / (size[0] * size[1]) * 100, 1)) + "% of the pixels")
+        
+        divergenceTimes = np.full(size, maxIterations, dtype = escapeTime.countType(maxIterations))
+        windowStates = []
+        
+        # Change the progress bar
+        progress = channel.post
+        
+        for window in windows:
+            windowSize, windowCoords = symmetry.windowView(size, customCoords, window)
+            
+            # Put (a pass of) the window into the full image, with the mirrored side filled in
+            def place(windowTimes, window = window):
+                divergenceTimes[window[0]:window[1], window[2]:window[3]] = windowTimes
+                
+                return divergenceTimes if view == None else view.mirror(divergenceTimes)
+            
+            resumeState = None
+            
+            if self.multiProcessRendering:
+                # Split the set into tiles and compute them on every core
+                windowTimes = tiledRender.renderTiled(self.getRenderPool(), windowSize, windowCoords, maxIterations, juliaC, progress, shouldStop, self.computeBackend)
+            elif self.progressiveRendering:
+                # Show a coarse version right away, then refine it
+                windowTimes, resumeState = self.computeProgressively(plot, channel, windowSize, windowCoords, maxIterations, juliaC, drawMethod, shouldStop, place)
+            elif backends.getBackend(self.computeBackend).name != "numpy":
+                # Compute the window with a compiled backend (every point stops the moment it escapes, on every core)
+                windowTimes, resumeState = backends.computeResumable(windowSize, windowCoords, maxIterations, juliaC, progress, shouldStop, self.computeBackend)
+            else:
+                # Calculate the set into an array using numpy, using vEcToRiZaTiOn (only iterating the points that are still active)
+                if juliaC == None:
+                    engine = escapeTime.createMandlebrotEngine(windowSize, windowCoords)
+                else:
+                    engine = escapeTime.createJuliaEngine(windowSize, windowCoords, juliaC)
+                
+                engine.iterate(maxIterations, progress, shouldStop)
+                print("Escape telemetry: " + autoIterations.summarize(engine.telemetry))
+                
+                if juliaC == None:
+                    self.mandlebrotTelemetry = engine.telemetry
+                
+                windowTimes = engine.getDivergenceTimes(maxIterations)
+                resumeState = engine.getResumeState(maxIterations)
+            
+            place(windowTimes)
+            windowStates.append((window, resumeState))
+        
+        if any(state == None for window, state in windowStates):
+            return divergenceTimes, None
+        
+        if view == None:
+            return divergenceTimes, windowStates[0][1]
+        
+        return divergenceTimes, symmetry.SymmetricResumeState(view, size, windowStates)
+    
+    # Compute a view of a set out of the tile pyramid, drawing it every time more of its tiles are done (the missing tiles
+    # are drawn from their parent tiles until then). Leave juliaC as None for the mandlebrot set
+    def computeFromTiles(self, plot, channel, size, customCoords, maxIterations, juliaC, drawMethod, shouldStop = None):
+        pool = self.getRenderPool() if self.multiProcessRendering else None
+        
+        for divergenceTimes, tilesLeft in self.tilePyramid.renderView(size, customCoords, maxIterations, juliaC, pool, channel.post, shouldStop, self.computeBackend):
+            if tilesLeft > 0:
+                image = colorize.colorize(divergenceTimes, maxIterations, np.amax(divergenceTimes), drawMethod, self.palette)
+                channel.call(plot.plotBulk, 0, 0, colorize.encodePPM(image), shouldStop = shouldStop)
+        
+        return divergenceTimes
+    
+    # Compute a set with distance estimation (only supersampling the pixels near the boundary) and return its image.
+    # Leave juliaC as None for the mandlebrot set
+    def computeDistanceImage(self, channel, size, customCoords, maxIterations, juliaC, shouldStop = None):
+        coverage, supersampled = distanceEstimation.computeDistanceCoverage(size, customCoords, maxIterations, juliaC, channel.post, shouldStop)
+        print("Distance estimation supersampled " + str(round(supersampled / coverage.size * 100, 1)) + "% of the pixels")
+        
+        return colorize.colorizeCoverage(coverage)
+    
+    # Create the cache of rendered sets using the current settings
+    def createRenderCache(self):
+        directory = os.path.join(tempfile.gettempdir(), "MandlebrotExplorerCache") if self.cacheRendersOnDisk else None
+        
+        return renderCache.RenderCache(self.renderCacheSize * 1024 * 1024, directory)
+    
     #region Mandlebrot Set Functions
     # Draw the mandlebrot set (called by the draw button)
     def drawMandlebrotSet(self):
-        if self.mandlebrotBeingDrawn:
-            return
-            
         # Prevent zooming or recentering while drawing
         self.zoomInMandlebrotButton.disable()
         self.zoomInJuliaButton.disable()
@@ -507,71 +695,75 @@ class MandlebrotSetExplorer():
         self.clearMandlebrotButton.disable()
         
         # Set status text and progress bar
-        self.mandlebrotStatusText.text = "Computing..."
-        self.mandlebrotProgress.setValue(0)
+        self.mandlebrotChannel.setStatus("Computing...", 0)
         
         # Disable drawing the set again set while it is being drawn
         self.drawMandlebrotButton.disable()
         
-        if self.mandlebrotRenderThread != None:
-            self.mandlebrotRenderThread.stop()
-        
         if self.orbitDrawThread != None:
             self.orbitDrawThread.stop()
             self.orbitDrawThread = None
         
-        # Create and start the thread
-        self.mandlebrotRenderThread = StoppableThread(name = "mandlebrotRenderThread", target = self.renderMandlebrotSet)
-        self.mandlebrotRenderThread.start()
+        # Render on the render thread (replacing the render that is running now, if there is one)
+        self.mandlebrotScheduler.request(self.renderMandlebrotSet)
         
         self.mandlebrotBeingDrawn = True
     
-    # Computes the mandlebrot set and returns it's colors
-    def computeMandlebrotSet(self, size, customCoords, maxIterations):
+    # Computes the mandlebrot set. Returns its divergence times, the highest one and the iterations it was computed with
+    # (auto iterations picks its own)
+    def computeMandlebrotSet(self, size, customCoords, maxIterations, shouldStop = None):
         # Compute the mandlebrot set
         print("Computing the mandlebrot set")
         startTime = time.time()
 
-        # Calculate mandlebrot set into an array using numpy, using vEcToRiZaTiOn
-        rMin = customCoords[0]
-        rMax = customCoords[2]
-        iMin = customCoords[1]
-        iMax = customCoords[3]
-
-        # Create ALL the x and y values
-        x,y = np.ogrid[rMin:rMax:size[0] * 1j, iMin:iMax:size[1] * 1j]
-
-        # Create ALL the complex numbers
-        c = x + (y * 1j)
-
-        # Initialize z to ALL be zero
-        z = np.zeros(c.shape, dtype = np.complex128)
-
-        # Keep track of which points did not converge so far
-        m = np.full(c.shape, True, dtype = bool)
+        deepZooming = self.deepZooming and deepZoom.needsDeepZoom(size, customCoords)
+        autoIterating = self.mandlebrotAutoIterations and not deepZooming
+        fromTiles = self.useTilePyramid and not autoIterating and not deepZooming
+
+        # Tile renders are resampled from the nearest level of the pyramid, so they're cached separately from exact renders
+        setName = "mandlebrot (tiles)" if fromTiles else "mandlebrot"
+
+        # Views that were already rendered don't have to be computed again
+        cacheKey = renderCache.makeKey(setName, customCoords, maxIterations, None, size)
+        divergenceTimes = self.renderCache.get(cacheKey)
+        found = divergenceTimes is not None and not autoIterating
+
+        # The view without the iterations, to check if the last render can be continued
+        viewKey = renderCache.makeViewKey(setName, customCoords, None, size)
+
+        # Change the progress bar
+        progress = self.mandlebrotChannel.post
+
+        if autoIterating:
+            # Auto iterations picks the iterations itself, so the render can only be cached once it's done
+            divergenceTimes, resumeState = self.computeAutoIterations(size, [float(value) for value in customCoords], progress, shouldStop)
+            maxIterations = resumeState.maxIterations
+            cacheKey = renderCache.makeKey(setName, customCoords, maxIterations, None, size)
+            self.mandlebrotResumeState = (viewKey, resumeState)
+        elif divergenceTimes is not None:
+            print("Found the mandlebrot set in the render cache")
+        elif self.mandlebrotResumeState != None and self.mandlebrotResumeState[0] == viewKey:
+            # Only the iterations changed, so pick up where the last render stopped
+            print("Resuming the mandlebrot set from " + str(self.mandlebrotResumeState[1].maxIterations) + " iterations")
+            divergenceTimes = self.mandlebrotResumeState[1].resume(maxIterations, progress, shouldStop)
+        elif deepZooming:
+            # Too deep for floats, compute the pixels as offsets from a precise reference orbit
+            divergenceTimes = deepZoom.computeMandlebrotSet(size, deepZoom.toPreciseCoords(customCoords), maxIterations, progress, shouldStop)
+            self.mandlebrotResumeState = None
+        elif fromTiles:
+            # Only compute the tiles of the view that aren't cached yet
+            divergenceTimes = self.computeFromTiles(self.mandlebrotSet, self.mandlebrotChannel, size, [float(value) for value in customCoords], maxIterations, None, self.mandlebrotDrawMethod, shouldStop)
+            self.mandlebrotResumeState = None
+        else:
+            divergenceTimes, resumeState = self.computeView(self.mandlebrotSet, self.mandlebrotChannel, size, [float(value) for value in customCoords], maxIterations, None, self.mandlebrotDrawMethod, shouldStop)
+            self.mandlebrotResumeState = None if resumeState == None else (viewKey, resumeState)
 
-        # Keep track in which iteration the points diverged
-        divergenceTimes = maxIterations + np.zeros(z.shape, dtype = int)
+        # Only fresh renders are cached (cached ones can be read only memory maps of the disk cache)
+        if not found:
+            self.renderCache.put(cacheKey, divergenceTimes)
 
-        for i in range(maxIterations):
-            # Iterate
-            z[m] = z[m] ** 2 + c[m]
-            
-            # Find diverging
-            diverging = np.greater(np.abs(z), 2, out = np.full(c.shape, False), where = m)
-
-            # Find which diverged in this iteration
-            diverged = np.logical_and(diverging, m)
-            
-            # Remember which have diverged
-            m[diverged] = False
-            
-            # Remember when they diverged
-            divergenceTimes[diverged] = i
-            
-            # Change the progress bar
-            if (i % 10 == 0):
-                self.mandlebrotProgress.setValue(lerp(i / maxIterations, 0, 100))
+        if not self.mandlebrotAutoIterations:
+            self.suggestedIterations = autoIterations.suggestIterations(customCoords)
 
         # Find the highest iteration count
         highestIters = np.amax(divergenceTimes)
@@ -579,25 +771,39 @@ class MandlebrotSetExplorer():
         diff = time.time() - startTime
         print("Finished computing the mandlebrot set in: " + str(diff) + "sec (" + str(diff * 1000) + "ms)")
 
-        return divergenceTimes, highestIters
+        return divergenceTimes, highestIters, maxIterations
 
+    # Compute the mandlebrot set until its escapes die down (see autoIterations). Returns the divergence times and the state
+    # to resume them from (which has the iteration it stopped at)
+    def computeAutoIterations(self, size, customCoords, progressCallback = None, shouldStop = None):
+        engine = escapeTime.createMandlebrotEngine(size, customCoords)
+        maxIterations = autoIterations.iterateUntilSettled(engine, autoIterations.autoLimit, progressCallback, shouldStop)
+        
+        print("Auto iterations stopped at " + str(maxIterations) + " iterations: " + autoIterations.summarize(engine.telemetry))
+        
+        self.mandlebrotTelemetry = engine.telemetry
+        self.suggestedIterations = autoIterations.suggestIterations(customCoords, maxIterations)
+        
+        return engine.getDivergenceTimes(maxIterations), engine.getResumeState(maxIterations)
+    
     # Done on another thread to avoid freezing. Render mandlebrot data using a sweep algorithm
-    def renderMandlebrotSet(self):
+    # shouldStop tells if a newer render has been requested (the compute functions then raise RenderCancelled)
+    def renderMandlebrotSet(self, shouldStop = None):
         mainStartTime = time.time()
+        maxIterations = self.mandlebrotIterations
         
         # Compute the mandlebrot set
-        computedData, highestIters = self.computeMandlebrotSet(self.renderSize, self.mandlebrotCustomCoords, self.mandlebrotIterations)
+        if self.mandlebrotDrawMethod == 4:
+            # Distance estimation draws the boundary itself instead of the escape counts
+            image = self.computeDistanceImage(self.mandlebrotChannel, self.renderSize, [float(value) for value in self.mandlebrotPreciseCoords], maxIterations, None, shouldStop)
+        else:
+            computedData, highestIters, maxIterations = self.computeMandlebrotSet(self.renderSize, self.mandlebrotPreciseCoords, maxIterations, shouldStop)
         
         renderStartTime = time.time()
         
         print("Rendering the mandlebrot set")
         
-        self.mandlebrotStatusText.text = "Rendering..."
-        self.mandlebrotProgress.setValue(0)
-        
-        self.mandlebrotSet.clear()
-        
-        totalPixelTime = 0
+        self.mandlebrotChannel.setStatus("Rendering...", 0)
         
         # Sweep
         # for sweep in range(self.renderSweeps):
@@ -646,51 +852,37 @@ class MandlebrotSetExplorer():
         #         newProgress = lerp((sweep + (y / self.renderSize[1])) / self.renderSweeps, 0, 100)
         #         self.mandlebrotProgress.setValue(newProgress)
         
-        # Calculate pixel colors
-        pixels = ""
+        # Color ALL the pixels at once using the palette lookup table
+        if self.mandlebrotDrawMethod != 4:
+            image = colorize.colorize(computedData, maxIterations, highestIters, self.mandlebrotDrawMethod, self.palette)
         
-        for y in range(self.renderSize[1]):
-            # Track the color of every pixel on this row
-            rowColors = []
-                            
-            # Go through every x value
-            for x in range(self.renderSize[0]):
-                val = computedData[x][y]
-                
-                color = 'black'
-                                
-                pixelTime = time.time()
-                if self.mandlebrotDrawMethod == 1:
-                    if val != self.mandlebrotIterations:
-                        # Gradient coloring
-                        color = colorRGB(*getGradientColor(val / highestIters, self.colorMap))
-                elif self.mandlebrotDrawMethod == 2:
-                    if val == self.mandlebrotIterations:
-                        # Threshold coloring
-                        color = 'white'
-                
-                rowColors.append(color)
-                
-                totalPixelTime += time.time() - pixelTime
-            
-            # Append row pixel colors
-            pixels += "{" + str(rowColors)[1:-1].replace('\'', '').replace(',', '') + "} "
-                        
-            # Change progress bar using y value
-            if (y % 10 == 0):
-                self.mandlebrotProgress.setValue(lerp(y / self.renderSize[1], 0, 100))
+        colorTime = time.time() - renderStartTime
+        
+        # Cleared (or replaced) while it was being computed
+        if shouldStop != None and shouldStop():
+            raise escapeTime.RenderCancelled()
         
-        self.mandlebrotSet.plotBulk(0, 0, pixels)
+        ppm = colorize.encodePPM(image)
         
-        # Print average times
+        # Print times
         print("Finished rendering! Time stats:")
-        print("Average pixel time: " + str((totalPixelTime / (self.renderSize[0] * self.renderSize[1])) * 1000) + "ms")
-        print("Total pixel time: " + str(time.time() - renderStartTime) + "ms")
+        print("Color time: " + str(colorTime * 1000) + "ms")
+        print("Total render time: " + str((time.time() - renderStartTime) * 1000) + "ms")
         print("")
         
         self.mandlebrotRenderTime = time.time() - mainStartTime
         print("Finished computing and rendering the mandlebrot set in: " + str(self.mandlebrotRenderTime) + "sec (" + str(self.mandlebrotRenderTime * 1000) + "ms)")
         
+        # Draw it on the tk main loop (tk isn't thread safe)
+        self.mandlebrotChannel.call(self.showMandlebrotSet, ppm, maxIterations, shouldStop = shouldStop)
+    
+    # Draw a finished render of the mandlebrot set and update the controls (runs on the tk main loop). maxIterations is
+    # the iterations it was computed with
+    def showMandlebrotSet(self, ppm, maxIterations):
+        # Draw ALL the pixels (as one binary image)
+        self.mandlebrotSet.clear()
+        self.mandlebrotSet.plotBulk(0, 0, ppm)
+        
         self.mandlebrotRendered = True
         self.drawMandlebrotButton.enable()
         self.saveMandlebrotButton.enable()
@@ -710,18 +902,27 @@ class MandlebrotSetExplorer():
         self.refreshBookmarks()
         
         # Set status text
-        self.mandlebrotStatusText.text = ""
+        self.mandlebrotChannel.setStatus("", 0)
         self.mandlebrotBeingDrawn = False
-        self.mandlebrotProgress.setValue(0)
         self.mandlebrotRenderTimeLabel.text = ("Mandlebrot render time: " + str(round(self.mandlebrotRenderTime, 3)) + "s")
+        
+        if self.suggestedIterations != None:
+            self.suggestedIterationsLabel.text = "Suggested iterations: " + str(self.suggestedIterations)
+        
+        # Make the iterations auto iterations ended up with the iterations of the mandlebrot set
+        if self.mandlebrotAutoIterations:
+            self.mandlebrotIterations = maxIterations
+            self.mandlebrotItersEntry.textvariable.set(str(self.mandlebrotIterations))
    
     def clearMandlebrot(self):
+        # Stop the render that's running, so it doesn't draw over the cleared set
+        self.mandlebrotScheduler.cancel()
+        
         self.mandlebrotSet.clear()
         self.mandlebrotRendered = False
         self.mandlebrotBeingDrawn = False
-        self.mandlebrotProgress.setValue(0)
         self.mandlebrotRenderTimeLabel.text = "Mandlebrot render time: -s"
-        self.mandlebrotStatusText.text = "Click draw to render the mandlebrot set"
+        self.mandlebrotChannel.setStatus("Click draw to render the mandlebrot set", 0)
         self.drawMandlebrotButton.enable()
         self.saveMandlebrotButton.disable()
         self.zoomInMandlebrotButton.disable()
@@ -729,191 +930,76 @@ class MandlebrotSetExplorer():
         self.recenterMandlebrotButton.disable()
         self.clearMandlebrotButton.disable()
         
-        # Undraw all pooled lines and ellipses
-        for line in self.orbitLinePool:
-            line.setCanvas(self.mandlebrotSet)
-            line.undraw()
-        
-        for ellipse in self.orbitEllipsePool:
-            ellipse.setCanvas(self.mandlebrotSet)
-            ellipse.undraw()
+        # Undraw the orbit
+        self.orbitPath.undraw()
+        self.orbitCycle.undraw()
     #endregion
     
     ##### Orbit Functions #####
     
-    # Compute the info (orbit, iterations, diverged) of a point in the mandlebrot set
+    # Compute the info (orbit, iterations, diverged, cycle) of a point in the mandlebrot set (see orbitAnalysis).
+    # The info of the last point is kept around, so the clicked point labels and the orbit drawing share it
     def computePointInfo(self, point, maxIterations):
-        z = complex(0, 0)
-        
-        orbit = []
-        for i in range(maxIterations):
-            z = z ** 2 + point
-            
-            orbit.append(z)
-            
-            if abs(z) >= 2:
-                return (orbit, i, True)
+        if self.orbitInfo == None or self.orbitInfo[0] != (point, maxIterations):
+            self.orbitInfo = ((point, maxIterations), orbitAnalysis.analyzeOrbit(point, maxIterations))
         
-        return (orbit, maxIterations, False)
+        return self.orbitInfo[1]
 
-    # Constantly draws an orbit. Pools it's lines and ellipses for efficiency (yes)
-    # Basically just lines between all the points in the orbit.
-    # It also draws ellipses showing the points in the orbit.
+    # Draws the orbit of the clicked point, as lines between all the points in the orbit. The orbit is only computed once
+    # (see computePointInfo), then a bit more of it is shown every frame with a single update of the line, so drawing it
+    # takes orbitDrawTime seconds no matter how long it is. Once all of it is shown, the cycle it falls into is drawn too.
     # This needs to be run in another thread!
     def drawOrbitPath(self):
-        # Undraw all pooled lines and ellipses
-        for line in self.orbitLinePool:
-            line.setCanvas(self.mandlebrotSet)
-            line.undraw()
-        
-        for ellipse in self.orbitEllipsePool:
-            ellipse.setCanvas(self.mandlebrotSet)
-            ellipse.undraw()
+        point = None
+        shown = 0
         
-        def toneFromPoint(outdata: np.ndarray, frames: int, time, status) -> None:            
-            # Write the sound data to two channels
-            resultChannel1 = None
-            resultChannel2 = None
-            
-            # Both channels
-            t = (np.arange(frames)) / self.SAMPLE_RATE
-            t = t.reshape(-1, 1)
-
-            wave = np.sin(2 * np.pi * z.real * t)
-
-            if resultChannel1 is None:
-                resultChannel1 = wave
-            else:
-                resultChannel1 += wave
-
-            wave2 = np.sin(2 * np.pi * z.imag * t)
-
-            if resultChannel2 is None:
-                resultChannel2 = wave2
-            else:
-                resultChannel2 += wave2
-
-            # Normalize the result
-            resultChannel1 /= max(abs(resultChannel1))
-            resultChannel2 /= max(abs(resultChannel2))
-            
-            # Write the result to the output
-            outdata[:, 0] = resultChannel1.flatten()
-            outdata[:, 1] = resultChannel2.flatten()
-        
-        # Play a sound with the frequency of the point (left channel = real, right channel = imaginary)            
-        # stream = sounddevice.OutputStream(channels = 2, blocksize = self.SAMPLE_RATE, samplerate = self.SAMPLE_RATE, callback = toneFromPoint)
-        # stream.start()
-
-        # Iteration vars
-        point = self.clickedPoint # Cache the clicked point
-        lastPoint = (self.clickedPoint.real, self.clickedPoint.imag)
-        iter = 0
-        lineIndex = 0
-        z = complex(0, 0)
-        inCycle = False
-        cycleDrawn = False
-        diverged = False
-        
-        # Track the visited points
-        visitedPoints = []
-        
-        # Draw the lines and ellipses
+        # Draw the lines
         while not self.exiting:
             # Stop if were drawing a set, because for some reason it slows down the drawing
             if self.juliaBeingDrawn or self.mandlebrotBeingDrawn:
                 break
             
+            frameStartTime = time.time()
+            
             # Make sure we weren't zooming when we clicked
             if not self.isZooming:
-                # Check that the clicked point hasn't changed
+                # Start over once the clicked point changes
                 if point != self.clickedPoint:
-                    # Undraw all pooled lines and ellipses
-                    for line in self.orbitLinePool:
-                        line.setCanvas(self.mandlebrotSet)
-                        line.undraw()
+                    point = self.clickedPoint # Cache the clicked point
+                    info = self.computePointInfo(point, self.mandlebrotIterations)
                     
-                    for ellipse in self.orbitEllipsePool:
-                        ellipse.setCanvas(self.mandlebrotSet)
-                        ellipse.undraw()
+                    self.cyclePeriod = info.period
                     
-                # Iteration vars
-                    point = self.clickedPoint # Cache the clicked point
-                    lastPoint = (self.clickedPoint.real, self.clickedPoint.imag)
-                    iter = 0
-                    lineIndex = 0
-                    z = complex(0, 0)
-                    inCycle = False
-                    cycleDrawn = False
-                    diverged = False
-                    self.cyclePeriod = 0
-
-                    visitedPoints = []
-                
-                if cycleDrawn or diverged: # Cycle has already been drawn, do nothing
-                    pass
-                elif inCycle:
-                    # Draw only the cycle points
-                    pt = visitedPoints[iter]
+                    # The orbit in widget coordinates, starting at the clicked point
+                    toWidget = self.getMandlebrotWidgetPoint if self.clickedMandlebrot else self.getJuliaWidgetPoint
+                    orbit = np.concatenate(([point], info.orbit))
+                    x, y = toWidget((orbit.real, orbit.imag))
+                    path = np.stack((x, y), axis = 1).ravel().tolist()
                     
-                    if iter == len(visitedPoints) - 1:
-                        cycleDrawn = True
-                else: # Iterate mandlebrot fracal normally
-                    z = z ** 2 + point
+                    canvas = self.mandlebrotSet if self.clickedMandlebrot else self.juliaSet
+                    self.orbitPath.setCanvas(canvas)
+                    self.orbitCycle.setCanvas(canvas)
                     
-                    pt = (round(z.real, 3), round(z.imag, 3))
+                    shown = 1
+                    pointsPerFrame = math.ceil(len(orbit) / (self.orbitDrawTime * self.orbitFps))
+                
+                if shown < len(orbit):
+                    shown = min(shown + pointsPerFrame, len(orbit))
                     
-                    if (abs(z) >= 2):
-                        # print("DIVERGED")
-                        diverged = True
+                    self.orbitPath.setPoints(path[:shown * 2])
                     
-                    # Check if the point has been visited before
-                    if pt in visitedPoints:
-                        inCycle = True
-                        iter = visitedPoints.index(pt) - 1
-                        
-                        # Remember cycle period
-                        self.cyclePeriod = len(visitedPoints) - iter - 1
-                        self.clickedPointPeriodLabel.text = ("Period: " + str(self.cyclePeriod))
+                    if not self.orbitPath.isDrawn:
+                        self.orbitPath.draw()
                     
-                    visitedPoints.append(pt)
-                
-                if inCycle:
-                    self.orbitLinePool[lineIndex].setColor("green")
-                    self.orbitEllipsePool[lineIndex].setColor("green")
-                else:
-                    self.orbitLinePool[lineIndex].setColor("red")
-                    self.orbitEllipsePool[lineIndex].setColor("red")
-                
-                if not cycleDrawn or not diverged:
-                    if self.clickedMandlebrot:
-                        self.orbitLinePool[lineIndex].setPoints(*self.getMandlebrotWidgetPoint(lastPoint), *self.getMandlebrotWidgetPoint(pt))
-                        self.orbitLinePool[lineIndex].draw()
-                        
-                        self.orbitEllipsePool[lineIndex].setCenter(*self.getMandlebrotWidgetPoint(pt))
-                        self.orbitEllipsePool[lineIndex].setSize(5, 5)
-                        self.orbitEllipsePool[lineIndex].draw()
-                    else:
-                        self.orbitLinePool[lineIndex].setPoints(*self.getJuliaWidgetPoint(lastPoint), *self.getJuliaWidgetPoint(pt))
-                        self.orbitLinePool[lineIndex].draw()
+                    # The cycle (closed, so it goes all the way around), offset by one for the clicked point
+                    if shown == len(orbit) and info.period > 0:
+                        start = (info.preperiod + 1) * 2
+                        cycle = path[start:start + info.period * 2]
                         
-                        self.orbitEllipsePool[lineIndex].setCenter(*self.getJuliaWidgetPoint(pt))
-                        self.orbitEllipsePool[lineIndex].setSize(5, 5)
-                        self.orbitEllipsePool[lineIndex].draw()
-                
-                lastPoint = pt
+                        self.orbitCycle.setPoints(cycle + cycle[:2])
+                        self.orbitCycle.draw()
             
-                lineIndex += 1
-                
-                if lineIndex >= len(self.orbitLinePool):
-                    lineIndex = 0
-                
-                iter += 1
-                
-                # try:
-                #     time.sleep(0.05)
-                # except:
-                #     dummy = 0
+            time.sleep(max(0, 1 / self.orbitFps - (time.time() - frameStartTime)))
         
         self.orbitDrawThread = None
         # threading.Thread(target = self.playOrbitSound).start()
@@ -923,9 +1009,6 @@ class MandlebrotSetExplorer():
     
     # Draw the julia set (called by clicking the mandlebrot set)
     def drawJuliaSet(self):
-        if self.juliaBeingDrawn:
-            return
-            
         # Prevent zooming or recentering while drawing
         self.zoomInMandlebrotButton.disable()
         self.zoomInJuliaButton.disable()
@@ -937,71 +1020,94 @@ class MandlebrotSetExplorer():
         self.clearJuliaButton.disable()
         
         # Set status text
-        self.juliaStatusText.text = "Computing..."
-        self.juliaProgress.setValue(0)
+        self.juliaChannel.setStatus("Computing...", 0)
         
         # Disable drawing the set again set while it is being drawn
         self.drawJuliaButton.disable()
         
-        if self.juliaRenderThread != None:
-            self.juliaRenderThread.stop()
-        
         if self.orbitDrawThread != None:
             self.orbitDrawThread.stop()
             self.orbitDrawThread = None
                 
-        # Create and start the thread
-        self.juliaRenderThread = StoppableThread(name = "juliaRenderThread", target = self.renderJuliaSet)
-        self.juliaRenderThread.start()
+        # Render on the render thread (replacing the render that is running now, if there is one)
+        self.juliaScheduler.request(self.renderJuliaSet)
         
         self.juliaBeingDrawn = True
     
+    # Draw a quick, low resolution julia set for the point under the mouse (while dragging across the mandlebrot set).
+    # The full julia set gets drawn once the mouse stops
+    def previewJuliaSet(self):
+        # Replaces the preview frame (or render) that is running now
+        self.juliaScheduler.request(self.renderJuliaPreview, self.clickedPoint)
+        
+        # Restart the wait for the mouse to stop
+        if self.juliaPreviewTimer != None:
+            self.mainWin.after_cancel(self.juliaPreviewTimer)
+        
+        self.juliaPreviewTimer = self.mainWin.after(self.juliaPreviewSettleTime, self.finishJuliaPreview)
+    
+    # The mouse stopped, draw the full julia set
+    def finishJuliaPreview(self):
+        self.juliaPreviewTimer = None
+        self.drawJuliaSet()
+    
+    # Done on the julia render thread. Compute and draw one preview frame
+    def renderJuliaPreview(self, shouldStop, juliaC):
+        startTime = time.time()
+        
+        size = self.juliaPreviewResolution.getSize(self.renderSize)
+        divergenceTimes = backends.computeJuliaSet(size, self.juliaCustomCoords, self.juliaIterations, juliaC, shouldStop = shouldStop, backend = self.computeBackend)
+        
+        # The inverse method has no escape times, so preview it with the threshold coloring
+        method = colorize.TWO_TONE if self.juliaDrawMethod in (3, 4, 5, 6) else self.juliaDrawMethod
+        image = colorize.colorize(divergenceTimes, self.juliaIterations, np.amax(divergenceTimes), method, self.palette)
+        image = juliaPreview.upscaleImage(image, self.renderSize[0], self.renderSize[1])
+        
+        # Don't draw frames that are already out of date
+        if shouldStop():
+            return
+        
+        # Draw it on the tk main loop (tk isn't thread safe)
+        self.juliaChannel.call(self.juliaSet.plotBulk, 0, 0, colorize.encodePPM(image), shouldStop = shouldStop)
+        
+        # Adapt the resolution to how long the frame took, then wait out the rest of the frame
+        frameTime = time.time() - startTime
+        self.juliaPreviewResolution.update(frameTime)
+        
+        time.sleep(max(0, self.juliaPreviewResolution.targetFrameTime - frameTime))
+    
     # Compute the Julia set using brute-force
-    def computeJuliaSet(self, size, customCoords, maxIterations, juliaC):
+    def computeJuliaSet(self, size, customCoords, maxIterations, juliaC, shouldStop = None):
         # Compute the julia set
         print("Computing the julia set")
         startTime = time.time()
 
-        # Calculate julia set into an array using numpy, using vEcToRiZaTiOn
-        rMin = customCoords[0]
-        rMax = customCoords[2]
-        iMin = customCoords[1]
-        iMax = customCoords[3]
+        setName = "julia"
 
-        # Create ALL the x and y values
-        x,y = np.ogrid[rMin:rMax:size[0] * 1j, iMin:iMax:size[1] * 1j]
+        # Views that were already rendered don't have to be computed again
+        cacheKey = renderCache.makeKey(setName, customCoords, maxIterations, juliaC, size)
+        divergenceTimes = self.renderCache.get(cacheKey)
+        found = divergenceTimes is not None
 
-        # Create ALL the complex numbers
-        z = x + (y * 1j)
+        # The view without the iterations, to check if the last render can be continued
+        viewKey = renderCache.makeViewKey(setName, customCoords, juliaC, size)
 
-        # Initialize z to ALL be zero
-        c = np.full(z.shape, juliaC)
+        # Change the progress bar
+        progress = self.juliaChannel.post
 
-        # Keep track of which points did not converge so far
-        m = np.full(c.shape, True, dtype = bool)
-
-        # Keep track in which iteration the points diverged
-        divergenceTimes = maxIterations + np.zeros(z.shape, dtype = int)
-
-        for i in range(maxIterations):
-            # Iterate
-            z[m] = z[m] ** 2 + c[m]
-            
-            # Find diverging
-            diverging = np.greater(np.abs(z), 2, out = np.full(c.shape, False), where = m)
+        if divergenceTimes is not None:
+            print("Found the julia set in the render cache")
+        elif self.juliaResumeState != None and self.juliaResumeState[0] == viewKey:
+            # Only the iterations changed, so pick up where the last render stopped
+            print("Resuming the julia set from " + str(self.juliaResumeState[1].maxIterations) + " iterations")
+            divergenceTimes = self.juliaResumeState[1].resume(maxIterations, progress, shouldStop)
+        else:
+            divergenceTimes, resumeState = self.computeView(self.juliaSet, self.juliaChannel, size, customCoords, maxIterations, juliaC, self.juliaDrawMethod, shouldStop)
+            self.juliaResumeState = None if resumeState == None else (viewKey, resumeState)
 
-            # Find which diverged in this iteration
-            diverged = np.logical_and(diverging, m)
-            
-            # Remember which have diverged
-            m[diverged] = False
-            
-            # Remember when they diverged
-            divergenceTimes[diverged] = i
-            
-            # Change the progress bar
-            if (i % 10 == 0):
-                self.juliaProgress.setValue(lerp((i / maxIterations), 0, 100))
+        # Only fresh renders are cached (cached ones can be read only memory maps of the disk cache)
+        if not found:
+            self.renderCache.put(cacheKey, divergenceTimes)
         
         # Find the highest iteration count
         highestIters = np.amax(divergenceTimes)
@@ -1012,115 +1118,77 @@ class MandlebrotSetExplorer():
         return divergenceTimes, highestIters
 
     # Done on another thread to avoid freezing. Render the julia and display that image
-    def renderJuliaSet(self):
+    # shouldStop tells if a newer render has been requested (the compute functions then raise RenderCancelled)
+    def renderJuliaSet(self, shouldStop = None):
         mainStartTime = time.time()
         
         # Compute the julia set
-        if self.juliaDrawMethod != 3:
-            computedData, highestIters = self.computeJuliaSet(self.renderSize, self.juliaCustomCoords, self.juliaIterations, self.clickedPoint)
+        if self.juliaDrawMethod not in (3, 4):
+            if self.juliaDrawMethod == 6:
+                # Distance estimation draws the boundary itself instead of the escape counts
+                image = self.computeDistanceImage(self.juliaChannel, self.renderSize, self.juliaCustomCoords, self.juliaIterations, self.clickedPoint, shouldStop)
+            else:
+                computedData, highestIters = self.computeJuliaSet(self.renderSize, self.juliaCustomCoords, self.juliaIterations, self.clickedPoint, shouldStop)
         
             renderStartTime = time.time()
             
             print("Rendering the julia set")
             
-            self.juliaStatusText.text = "Rendering..."
-            self.juliaProgress.setValue(0)
+            self.juliaChannel.setStatus("Rendering...", 0)
             
-            self.juliaSet.clear()
+            # Color ALL the pixels at once using the palette lookup table
+            if self.juliaDrawMethod != 6:
+                image = colorize.colorize(computedData, self.juliaIterations, highestIters, self.juliaDrawMethod, self.palette)
             
-            totalPixelTime = 0
+            colorTime = time.time() - renderStartTime
             
-            # Calculate the pixel colors
-            pixels = ""
+            # Cleared (or replaced) while it was being computed
+            if shouldStop != None and shouldStop():
+                raise escapeTime.RenderCancelled()
             
-            # Go through every y value
-            for y in range(self.renderSize[1]):            
-                # Track the color of every pixel on this row
-                rowColors = []
-                
-                # Go through every x value
-                for x in range(self.renderSize[0]):
-                    val = computedData[x][y]
-                    
-                    color = 'black'
-                    
-                    pixelTime = time.time()
-                    if self.juliaDrawMethod == 1:
-                        if val != self.juliaIterations:
-                            # Gradient coloring
-                            color = colorRGB(*getGradientColor(val / highestIters, self.colorMap))
-                    elif self.juliaDrawMethod == 2:
-                        if val == self.juliaIterations:
-                            # Threshold coloring
-                            color = 'white'
-                    
-                    rowColors.append(color)
-                    
-                    totalPixelTime += time.time() - pixelTime
-                
-                # Append row pixel colors
-                pixels += ("{" + str(rowColors)[1:-1].replace('\'', '').replace(',', '') + "} ")
-                
-                # Change progress bar using y value
-                if (y % 10 == 0):
-                    self.juliaProgress.setValue(lerp(y / self.renderSize[1], 0, 100))
+            ppm = colorize.encodePPM(image)
             
-            # Draw ALL the pixels
-            self.juliaSet.plotBulk(0, 0, pixels)
+            # Print times
+            print("Finished rendering! Time stats:")
+            print("Color time: " + str(colorTime * 1000) + "ms")
         else:
             renderStartTime = time.time()
             
-            print("Rendering the julia set (INVERSE METHOD)")
+            print("Rendering the julia set (" + ("MODIFIED " if self.juliaDrawMethod == 4 else "") + "INVERSE METHOD)")
             
-            self.juliaStatusText.text = "Rendering..."
-            self.juliaProgress.setValue(0)
+            self.juliaChannel.setStatus("Rendering...", 0)
             
-            self.juliaSet.clear()
+            # Walk ALL the points backwards at once (the iterations are the number of walkers)
+            visits = backends.computeInverseJulia(self.renderSize, self.juliaCustomCoords, self.clickedPoint, int(self.juliaIterations), self.juliaDrawMethod == 4, self.juliaChannel.post, shouldStop, backend = self.computeBackend)
             
-            totalPixelTime = 0
+            computeTime = time.time() - renderStartTime
             
-            rMin = self.juliaCustomCoords[0]
-            rMax = self.juliaCustomCoords[2]
-            iMin = self.juliaCustomCoords[1]
-            iMax = self.juliaCustomCoords[3]
-                        
-            # Cache the clicked point to prevent conflicts with future clicks
-            clickPt = self.clickedPoint
+            # Cleared (or replaced) while it was being computed
+            if shouldStop != None and shouldStop():
+                raise escapeTime.RenderCancelled()
             
-            # Compute and draw
-            for i in range(self.juliaIterations):
-                pixelTime = time.time()
-                z = complex(lerp(random.random(), rMin, rMax), lerp(random.random(), iMin, iMax))
-                
-                for n in range(1000):
-                    z = (z - clickPt) ** 0.5
-                    
-                    if random.random() < 0.5:
-                        z *= -1
-
-                for n in range(1000):
-                    z = (z - clickPt) ** 0.5
-                    
-                    if random.random() < 0.5:
-                        z *= -1
-                
-                totalPixelTime += time.time() - pixelTime
-                
-                self.juliaSet.plot(x = int(remapClamped(z.real, rMin, rMax, 0, self.renderSize[0])), y = int(remapClamped(z.imag, iMin, iMax, 0, self.renderSize[1])), color = (0, 0, 0))
-                
-                # Change progress bar using the index
-                if (i % 10 == 0):
-                    self.juliaProgress.setValue(lerp(i / self.juliaIterations, 0, 100))                
-
-        # Print average times
-        print("Finished rendering! Times stats:")
-        print("Average pixel time: " + str((totalPixelTime / (self.renderSize[0] * self.renderSize[1])) * 1000) + "ms")
-        print("Total pixel time: " + str(time.time() - renderStartTime * 1000) + "ms")
+            # Color ALL the visited pixels
+            ppm = colorize.encodePPM(colorize.colorizeVisits(visits))
+            
+            # Print times
+            print("Finished rendering! Times stats:")
+            print("Inverse iteration time: " + str(computeTime * 1000) + "ms")
+        
+        print("Total render time: " + str((time.time() - renderStartTime) * 1000) + "ms")
         
         self.juliaRenderTime = time.time() - mainStartTime
         
         print("Finished computing and rendering the julia set in: " + str(self.juliaRenderTime) + "sec (" + str(self.juliaRenderTime * 1000) + "ms)")
         
+        # Draw it on the tk main loop (tk isn't thread safe)
+        self.juliaChannel.call(self.showJuliaSet, ppm, shouldStop = shouldStop)
+    
+    # Draw a finished render of the julia set and update the controls (runs on the tk main loop)
+    def showJuliaSet(self, ppm):
+        # Draw ALL the pixels (as one binary image)
+        self.juliaSet.clear()
+        self.juliaSet.plotBulk(0, 0, ppm)
+        
         self.juliaRendered = True
         self.drawJuliaButton.enable()
         self.saveJuliaButton.enable()
@@ -1140,18 +1208,19 @@ class MandlebrotSetExplorer():
         self.refreshBookmarks()
         
         # Set status text
-        self.juliaStatusText.text = ""
+        self.juliaChannel.setStatus("", 0)
         self.juliaBeingDrawn = False
-        self.juliaProgress.setValue(0)
         self.juliaRenderTimeLabel.text = ("Julia render time: " + str(round(self.juliaRenderTime, 3)) + "s")
     
     def clearJulia(self):
+        # Stop the render that's running, so it doesn't draw over the cleared set
+        self.juliaScheduler.cancel()
+        
         self.juliaSet.clear()
         self.juliaRendered = False
         self.juliaBeingDrawn = False
-        self.juliaProgress.setValue(0)
         self.juliaRenderTimeLabel.text = "Julia render time: -s"
-        self.juliaStatusText.text = "Click anywhere on the mandlebrot set to draw the julia set"
+        self.juliaChannel.setStatus("Click anywhere on the mandlebrot set to draw the julia set", 0)
         self.drawJuliaButton.enable()
         self.saveJuliaButton.disable()
         self.zoomInJuliaButton.disable()
@@ -1265,16 +1334,25 @@ class MandlebrotSetExplorer():
         
         self.addBookmarkButton.enable()
         
-        if not drag and self.autoComputeJuliaSet and self.drawJuliaButton.isEnabled():
-            self.drawJuliaSet()
+        # Clicking again while the julia set is being drawn replaces that render
+        if self.autoComputeJuliaSet:
+            if drag:
+                self.previewJuliaSet()
+            else:
+                self.drawJuliaSet()
+    
+    # Set the region of the mandlebrot set to draw. Keeps both the float and the precise coordinates
+    def setMandlebrotCoords(self, coords):
+        self.mandlebrotPreciseCoords = deepZoom.toPreciseCoords(coords)
+        self.mandlebrotCustomCoords = [float(value) for value in self.mandlebrotPreciseCoords]
     
     # Reset zoom and center the mandlebrot set
     def recenterMandlebrotSet(self):
-        self.mandlebrotCustomCoords = [-2.25, -1.5, 0.75, 1.5]
+        self.setMandlebrotCoords([-2.25, -1.5, 0.75, 1.5])
         self.drawMandlebrotSet()
         
         # Add to mandlebrot zoom history
-        self.mandlebrotZoomHistory.append(self.mandlebrotCustomCoords)
+        self.mandlebrotZoomHistory.append(self.mandlebrotPreciseCoords)
         
         # Set zoom factor label
         self.mandlebrotZoomFactorLabel.text = "Zoom factor: 1cm"
@@ -1309,14 +1387,8 @@ class MandlebrotSetExplorer():
         
         print("Zoom: " + str(zoomX1) + ", " + str(zoomY1) + ", " + str(zoomX2) + ", " + str(zoomY2))
         
-        # Convert the zoom coordinates to custom coords
-        x1 = self.mandlebrotCustomCoords[0] + (self.mandlebrotCustomCoords[2] - self.mandlebrotCustomCoords[0]) * (zoomX1 / w)
-        y1 = self.mandlebrotCustomCoords[1] + (self.mandlebrotCustomCoords[3] - self.mandlebrotCustomCoords[1]) * (zoomY1 / h)
-        x2 = self.mandlebrotCustomCoords[0] + (self.mandlebrotCustomCoords[2] - self.mandlebrotCustomCoords[0]) * (zoomX2 / w)
-        y2 = self.mandlebrotCustomCoords[1] + (self.mandlebrotCustomCoords[3] - self.mandlebrotCustomCoords[1]) * (zoomY2 / h)
-                
-        # Set the new coordinates
-        self.mandlebrotCustomCoords = [x1, y1, x2, y2]
+        # Convert the zoom coordinates to custom coords (precisely, so zooming can go deeper than floats)
+        self.setMandlebrotCoords(deepZoom.subRegion(self.mandlebrotPreciseCoords, zoomX1 / w, zoomY1 / h, zoomX2 / w, zoomY2 / h, self.renderSize))
         
         # print(self.mandlebrotCustomCoords)
         
@@ -1324,11 +1396,11 @@ class MandlebrotSetExplorer():
         self.drawMandlebrotSet()
         
         # Add to mandlebrot zoom history
-        self.mandlebrotZoomHistory.append(self.mandlebrotCustomCoords)
+        self.mandlebrotZoomHistory.append(self.mandlebrotPreciseCoords)
         
-        # Calculate the zoom factor from the original coords to the new zoomed coords
-        xMult = abs(-2.25 - 0.75) / abs(x1 - x2)
-        yMult = abs(-1.5 - 1.5) / abs(y1 - y2)
+        # Calculate the zoom factor from the original coords to the new zoomed coords (precisely, the float coords of deep
+        # zooms have no width left)
+        xMult, yMult = deepZoom.zoomFactor(self.mandlebrotPreciseCoords)
         
         # Update zoom factor label
         factor = self.caculateZoomFactor(xMult, yMult)
@@ -1339,13 +1411,12 @@ class MandlebrotSetExplorer():
             self.zoomOutMandlebrotButton.disable()
             self.zoomOutJuliaButton.disable()
             
-            self.mandlebrotCustomCoords = self.mandlebrotZoomHistory.pop()
+            self.setMandlebrotCoords(self.mandlebrotZoomHistory.pop())
             
             self.drawMandlebrotSet()
             
             # Calculate the zoom factor from the original coords to the new zoomed coords
-            xMult = abs(-2.25 - 0.75) / abs(self.mandlebrotCustomCoords[0] - self.mandlebrotCustomCoords[2])
-            yMult = abs(-1.5 - 1.5) / abs(self.mandlebrotCustomCoords[1] - self.mandlebrotCustomCoords[3])
+            xMult, yMult = deepZoom.zoomFactor(self.mandlebrotPreciseCoords)
             
             # Update zoom factor label
             factor = self.caculateZoomFactor(xMult, yMult)
@@ -1548,17 +1619,19 @@ class MandlebrotSetExplorer():
         if set == 0:
             self.clickedPointPixel = (x, y)
             self.clickedPoint = complex(xCoord, yCoord)
+            self.clickedPointPrecise = deepZoom.pointInRegion(self.mandlebrotPreciseCoords, x / w, y / h, self.renderSize)
             
-        orbitStr = ""
-        for i in range(len(info[0])):
-            orbitStr += str(round(info[0][i].real, 3)) + " + " + str(round(info[0][i].imag, 3)) + "i"
-            if i < len(info[0]) - 1:
-                orbitStr += ", "
+        orbitStr = ", ".join(str(round(z.real, 3)) + " + " + str(round(z.imag, 3)) + "i" for z in info.orbit)
         self.clickedPointOrbitLabel.text = ("Orbit: " + str(orbitStr))
         self.orbitTooltip.text = ("Orbit: " + str(orbitStr))
-        self.clickedPointPeriodLabel.text = ("Period: 0")
-        self.clickedPointItersLabel.text = ("Iterations: " + str(info[1]))
-        self.clickedPointDivergedLabel.text = ("Diverged: " + str(info[2]))
+        
+        if info.period > 0:
+            self.clickedPointPeriodLabel.text = ("Period: " + str(info.period) + " (after " + str(info.preperiod) + ", multiplier " + str(round(abs(info.multiplier), 3)) + ")")
+        else:
+            self.clickedPointPeriodLabel.text = ("Period: 0")
+        
+        self.clickedPointItersLabel.text = ("Iterations: " + str(info.iterations))
+        self.clickedPointDivergedLabel.text = ("Diverged: " + str(info.diverged))
 
     #region Bookmarks
     def refreshBookmarks(self):
@@ -1572,14 +1645,18 @@ class MandlebrotSetExplorer():
             coords = bookmark[3]
             setNum = bookmark[4]
             
-            # Calculate a new pixel position for the bookmark using the current custom coordinates
+            # Calculate a new pixel position for the bookmark using the current coordinates (precisely, so it still works
+            # in deep zooms)
             if setNum == 0:
-                curCoords = self.mandlebrotCustomCoords
+                curCoords = list(self.mandlebrotPreciseCoords)
+                precisePoint = bookmark[8] if bookmark[8] != None else pt
             elif setNum == 1:
-                curCoords = self.juliaCustomCoords
+                curCoords = deepZoom.toPreciseCoords(self.juliaCustomCoords)
+                precisePoint = pt
             
-            newXPx = remap(pt[0], curCoords[0], curCoords[2], 0, self.renderSize[0])
-            newYPx = remap(pt[1], curCoords[1], curCoords[3], 0, self.renderSize[1])
+            xFraction, yFraction = deepZoom.regionFraction(curCoords, precisePoint)
+            newXPx = xFraction * self.renderSize[0]
+            newYPx = yFraction * self.renderSize[1]
             
             # Update the bookmark info
             bookmark[1] = (newXPx, newYPx)
@@ -1602,9 +1679,9 @@ class MandlebrotSetExplorer():
         
         # Add the new bookmark to the lis
         if self.selectedSet == self.mandlebrotSet:
-            self.bookmarks.append([(pt.real, pt.imag), pixel, bookmarkOverlay, self.mandlebrotCustomCoords, 0, self.clickedPointPixel, str(pt), color])
+            self.bookmarks.append([(pt.real, pt.imag), pixel, bookmarkOverlay, list(self.mandlebrotPreciseCoords), 0, self.clickedPointPixel, str(pt), color, self.clickedPointPrecise])
         elif self.selectedSet == self.juliaSet:
-            self.bookmarks.append([(pt.real, pt.imag), pixel, bookmarkOverlay, self.juliaCustomCoords, 1, self.clickedPointPixel, str(pt), color])
+            self.bookmarks.append([(pt.real, pt.imag), pixel, bookmarkOverlay, deepZoom.toPreciseCoords(self.juliaCustomCoords), 1, self.clickedPointPixel, str(pt), color, tuple(deepZoom.toPreciseCoords((pt.real, pt.imag)))])
     
     def deleteBookmark(self, bookmark):
         bookmark[2].undraw()
@@ -1631,23 +1708,27 @@ class MandlebrotSetExplorer():
                 bookmark = data[key]
                 point = bookmark['point']
                 pixel = bookmark['pixel']
-                coords = bookmark['coords']
+                coords = deepZoom.toPreciseCoords(bookmark['coords'])
                 set = bookmark['set']
                 color = bookmark['color']
                 
+                # Older bookmark files only have the float point (or save it as null)
+                precisePoint = bookmark.get('precisePoint')
+                precisePoint = tuple(deepZoom.toPreciseCoords(point if precisePoint == None else precisePoint))
+                
                 # Add the new bookmark to the lis
                 if set == 0:
                     # Create a bookmark overlay on the mandlebrot set (random color)
                     bookmarkOverlay = Ellipse(self.mandlebrotSet, pixel[0] - 5, pixel[1] - 5, 10, 10, color = color)
                     bookmarkOverlay.draw()
                     
-                    self.bookmarks.append([(point[0], point[1]), pixel, bookmarkOverlay, coords, set, pixel, str(point), color])
+                    self.bookmarks.append([(point[0], point[1]), pixel, bookmarkOverlay, coords, set, pixel, str(point), color, precisePoint])
                 elif set == 1:
                     # Create a bookmark overlay on the julia set (random color)
                     bookmarkOverlay = Ellipse(self.juliaSet, pixel[0] - 5, pixel[1] - 5, 10, 10, color = color)
                     bookmarkOverlay.draw()
                     
-                    self.bookmarks.append([(point[0], point[1]), pixel, bookmarkOverlay, coords, set, pixel, str(point), color])
+                    self.bookmarks.append([(point[0], point[1]), pixel, bookmarkOverlay, coords, set, pixel, str(point), color, precisePoint])
 
             # Closing file
             f.close()
@@ -1667,8 +1748,9 @@ class MandlebrotSetExplorer():
             coords = bookmark[3]
             set = bookmark[4]
             color = bookmark[7]
+            precisePoint = bookmark[8]
             
-            toSave[str(point)] = {"point": point, "pixel": pixel, "coords": coords, "set": set, "color": color}
+            toSave[str(point)] = {"point": point, "precisePoint": precisePoint, "pixel": pixel, "coords": coords, "set": set, "color": color}
         
         # Serializing json
         jsonObject = json.dumps(toSave, indent=4)
@@ -1746,8 +1828,9 @@ class MandlebrotSetExplorer():
         
         self.updateClickedPointInfo(self.clickedPointPixel[0], self.clickedPointPixel[1], w, h, bookmark[4])
         
-        # Center the mandlebrot set on the point
-        self.mandlebrotCustomCoords = [bookmark[0][0] - 2, bookmark[0][1] - 2, bookmark[0][0] + 2, bookmark[0][1] + 2]
+        # Center the mandlebrot set on the point (bookmarks without a precise point use the float one)
+        precisePoint = bookmark[8] if bookmark[8] != None else deepZoom.toPreciseCoords(bookmark[0])
+        self.setMandlebrotCoords(deepZoom.regionAround(precisePoint, 2, 2))
         self.drawMandlebrotSet()
         
         if self.autoComputeJuliaSet and self.drawJuliaButton.isEnabled():
@@ -1770,6 +1853,8 @@ class MandlebrotSetExplorer():
                 self.mandlebrotDrawMethod = 1
             elif value == "Two-Tone":
                 self.mandlebrotDrawMethod = 2
+            elif value == "Distance Estimation":
+                self.mandlebrotDrawMethod = 4
         
         def mandlebrotSound():
             self.mandlebrotSounds = self.mandlebrotSoundCheckBox.checked
@@ -1782,26 +1867,77 @@ class MandlebrotSetExplorer():
         
         def juliaMethod(value):
             if value == "Escape Colors":
-                if self.juliaDrawMethod == 3:
+                if self.juliaDrawMethod in (3, 4):
                     self.juliaIterations /= 10
                     self.juliaItersEntry.text = str(self.juliaIterations)
                 
                 self.juliaDrawMethod = 1
             elif value == "Two-Tone (threshold)":
-                if self.juliaDrawMethod == 3:
+                if self.juliaDrawMethod in (3, 4):
                     self.juliaIterations /= 10
                     self.juliaItersEntry.text = str(self.juliaIterations)
                 
                 self.juliaDrawMethod = 2
-            elif value == "Two-Tone (inverse algorithm)":
-                if self.juliaDrawMethod == 1:
+            elif value in ("Two-Tone (inverse algorithm)", "Two-Tone (modified inverse)"):
+                if self.juliaDrawMethod not in (3, 4):
                     self.juliaIterations *= 10
                     self.juliaItersEntry.text = str(self.juliaIterations)
                 
-                self.juliaDrawMethod = 3
+                self.juliaDrawMethod = 3 if value == "Two-Tone (inverse algorithm)" else 4
+            elif value == "Distance Estimation":
+                if self.juliaDrawMethod in (3, 4):
+                    self.juliaIterations /= 10
+                    self.juliaItersEntry.text = str(self.juliaIterations)
+                
+                self.juliaDrawMethod = 6
         
         def juliaAutoCompute():
             self.autoComputeJuliaSet = self.autoComputeJuliaCheckBox.checked
+        
+        def multiProcess():
+            self.multiProcessRendering = self.multiProcessCheckBox.checked
+        
+        def progressive():
+            self.progressiveRendering = self.progressiveCheckBox.checked
+        
+        def diskCache():
+            self.cacheRendersOnDisk = self.diskCacheCheckBox.checked
+            
+            # Start over with a cache that uses the new setting
+            self.renderCache.clear()
+            self.renderCache = self.createRenderCache()
+        
+        def float32Toggle():
+            escapeTime.useFloat32 = self.float32CheckBox.checked
+            
+            # The cached renders, tiles and resume states were computed with the old setting
+            self.renderCache.clear()
+            self.tilePyramid.cache.clear()
+            self.mandlebrotResumeState = None
+            self.juliaResumeState = None
+        
+        def deepZoomToggle():
+            self.deepZooming = self.deepZoomCheckBox.checked
+        
+        def mandlebrotAutoIterationsToggle():
+            self.mandlebrotAutoIterations = self.mandlebrotAutoItersCheckBox.checked
+        
+        def symmetryToggle():
+            self.useSymmetry = self.symmetryCheckBox.checked
+        
+        def tilePyramidToggle():
+            self.useTilePyramid = self.tilePyramidCheckBox.checked
+        
+        def computeBackend(value):
+            self.computeBackend = "auto" if value == "Automatic" else value
+        
+        def renderWorkers(value):
+            self.renderWorkers = max(1, int(value))
+            
+            # Recreate the pool with the new number of workers the next time it's needed
+            if self.renderPool != None:
+                self.renderPool.shutdown(wait = False)
+                self.renderPool = None
         #endregion
         
         #region Mandlebrot set controls
@@ -1817,11 +1953,15 @@ class MandlebrotSetExplorer():
                 self.mandlebrotItersEntry.setHoverEffect(("grow/darken", (4, 4, (50, 50, 50))))
                 Tooltip(self.mandlebrotItersEntry, "The number of iterations to use when computing the set. Higher values will take longer to compute, but will produce a more detailed image.")
             
+            self.mandlebrotAutoItersCheckBox = CheckBox(text = "Auto iterations", command = mandlebrotAutoIterationsToggle)
+            self.mandlebrotAutoItersCheckBox.checked = self.mandlebrotAutoIterations
+            Tooltip(self.mandlebrotAutoItersCheckBox, "Keep iterating until almost no points escape anymore, then use that as the iterations. Deep zooms get more iterations and views with a lot of the inside of the set don't waste time on it. (Not used for deep zooms.)")
+            
             with Flow():
                 Label("Draw method: ")
-                self.mandlebrotMethodOptions = OptionsMenu("Escape Colors", "Two-Tone", command = mandlebrotMethod)
+                self.mandlebrotMethodOptions = OptionsMenu("Escape Colors", "Two-Tone", "Distance Estimation", command = mandlebrotMethod)
                 self.mandlebrotMethodOptions.option = "Escape Colors"
-                Tooltip(self.mandlebrotMethodOptions, "Escape Colors: Draw the set using a smooth, gradiented coloring method. Two-Tone: Draw the set using a single color.")
+                Tooltip(self.mandlebrotMethodOptions, "Escape Colors: Draw the set using a smooth, gradiented coloring method. Two-Tone: Draw the set using a single color. Distance Estimation: Draw the boundary of the set using how far every pixel is from it, so even filaments thinner than a pixel show up (pixels near the boundary are supersampled).")
 
             # self.mandlebrotSoundCheckBox = CheckBox(text = "Hear the Mandlebrot Set!", command = mandlebrotSound)
             # self.mandlebrotSoundCheckBox.checked = False
@@ -1830,15 +1970,19 @@ class MandlebrotSetExplorer():
             #region Coordinates
             def startXMB(value):
                 self.mandlebrotCustomCoords[0] = float(value)
+                self.mandlebrotPreciseCoords[0] = deepZoom.toPreciseCoords([value])[0]
             
             def startYMB(value):
                 self.mandlebrotCustomCoords[1] = float(value)
+                self.mandlebrotPreciseCoords[1] = deepZoom.toPreciseCoords([value])[0]
             
             def endXMB(value):
                 self.mandlebrotCustomCoords[2] = float(value)
+                self.mandlebrotPreciseCoords[2] = deepZoom.toPreciseCoords([value])[0]
             
             def endYMB(value):
                 self.mandlebrotCustomCoords[3] = float(value)
+                self.mandlebrotPreciseCoords[3] = deepZoom.toPreciseCoords([value])[0]
             
             with Stack(relief = 'groove', borderwidth = 2):
                 Label("Coordinates:")
@@ -1868,7 +2012,7 @@ class MandlebrotSetExplorer():
             
             self.autoComputeJuliaCheckBox = CheckBox(text = "Auto compute", command = juliaAutoCompute)
             self.autoComputeJuliaCheckBox.checked = False
-            Tooltip(self.autoComputeJuliaCheckBox, "Automatically compute the Julia set when the mouse is clicked on the Mandlebrot set.")
+            Tooltip(self.autoComputeJuliaCheckBox, "Automatically compute the Julia set when the mouse is clicked on the Mandlebrot set. While dragging across the Mandlebrot set a quick, blocky preview is shown, and the full Julia set is drawn once the mouse stops.")
             
             with Flow():
                 Label("Iterations: ")
@@ -1878,9 +2022,9 @@ class MandlebrotSetExplorer():
                 
             with Flow():
                 Label("Draw method: ")
-                self.juliaMethodOptions = OptionsMenu("Escape Colors", "Two-Tone (threshold)", "Two-Tone (inverse algorithm)", command = juliaMethod)
+                self.juliaMethodOptions = OptionsMenu("Escape Colors", "Two-Tone (threshold)", "Two-Tone (inverse algorithm)", "Two-Tone (modified inverse)", "Distance Estimation", command = juliaMethod)
                 self.juliaMethodOptions.option = "Escape Colors"
-                Tooltip(self.juliaMethodOptions, "Escape Colors: Draw the set using a nice-looking gradient (brute-force algorithm). Two-Tone (threshold): Draw the set using a single color (brute-force algorithm) Two-Tone (inverse algorithm): Draw the set using a single color.")
+                Tooltip(self.juliaMethodOptions, "Escape Colors: Draw the set using a nice-looking gradient (brute-force algorithm). Two-Tone (threshold): Draw the set using a single color (brute-force algorithm) Two-Tone (inverse algorithm): Draw the set using a single color, by walking the iterations (the number of walkers) backwards. Two-Tone (modified inverse): The inverse algorithm, but walkers move away from parts of the set that are already drawn, so the thin parts show up too. Distance Estimation: Draw the boundary of the set using how far every pixel is from it, so even filaments thinner than a pixel show up (pixels near the boundary are supersampled).")
 
             #region Coordinates
             def startXJ(value):
@@ -1913,6 +2057,51 @@ class MandlebrotSetExplorer():
             #endregion
         #endregion
         
+        #region Rendering controls
+        self.renderingSection = HideableFrame(titleText = "Rendering", titleFont = "Arial 10 bold", relief = 'groove', borderwidth = 2)
+        self.renderingSection.hide()
+        with self.renderingSection:
+            self.multiProcessCheckBox = CheckBox(text = "Multi-process rendering", command = multiProcess)
+            self.multiProcessCheckBox.checked = self.multiProcessRendering
+            Tooltip(self.multiProcessCheckBox, "Split the sets into tiles and compute them on every core of your computer at once. Much faster for big iteration counts.")
+            
+            with Flow():
+                Label("Workers: ")
+                self.renderWorkersEntry = TextBox(width = int(panelWidth * 0.8), height = 20, text = str(self.renderWorkers), inputType = "int", command = renderWorkers)
+                self.renderWorkersEntry.setHoverEffect(("grow/darken", (4, 4, (50, 50, 50))))
+                Tooltip(self.renderWorkersEntry, "The number of processes to use for multi-process rendering. Defaults to the number of cores in your computer.")
+            
+            self.progressiveCheckBox = CheckBox(text = "Progressive rendering", command = progressive)
+            self.progressiveCheckBox.checked = self.progressiveRendering
+            Tooltip(self.progressiveCheckBox, "Show a blocky version of the sets right away and sharpen it while they are being computed. Not used with multi-process rendering.")
+            
+            self.diskCacheCheckBox = CheckBox(text = "Cache renders on disk", command = diskCache)
+            self.diskCacheCheckBox.checked = self.cacheRendersOnDisk
+            Tooltip(self.diskCacheCheckBox, "Rendered sets are kept around so zooming out or going back to a bookmark is instant. With this on, renders that don't fit in memory anymore get written to a temporary folder instead of being forgotten.")
+            
+            self.float32CheckBox = CheckBox(text = "Low precision when zoomed out", command = float32Toggle)
+            self.float32CheckBox.checked = escapeTime.useFloat32
+            Tooltip(self.float32CheckBox, "Compute zoomed out views with 32-bit numbers, which is a lot faster. Switches to 64-bit numbers automatically once you zoom in far enough to need them.")
+            
+            self.deepZoomCheckBox = CheckBox(text = "Deep zoom (perturbation)", command = deepZoomToggle)
+            self.deepZoomCheckBox.checked = self.deepZooming
+            Tooltip(self.deepZoomCheckBox, "Keep zooming into the mandlebrot set past where regular numbers run out of precision (around a 1e13 zoom). Only the center of the view is computed precisely, every other pixel is computed as a small offset from it.")
+            
+            self.symmetryCheckBox = CheckBox(text = "Use symmetry", command = symmetryToggle)
+            self.symmetryCheckBox.checked = self.useSymmetry
+            Tooltip(self.symmetryCheckBox, "The mandlebrot set is mirrored across the real axis and julia sets are the same when turned upside down. When a view contains the middle of that symmetry, only one side of it is computed and the other side is mirrored.")
+            
+            self.tilePyramidCheckBox = CheckBox(text = "Use tile pyramid", command = tilePyramidToggle)
+            self.tilePyramidCheckBox.checked = self.useTilePyramid
+            Tooltip(self.tilePyramidCheckBox, "Compute the mandlebrot set in fixed tiles (like a map) that are kept around, so panning and zooming only compute the tiles that weren't on screen before. Until they are done, new tiles are drawn blown up from the tiles of a wider view. Every pixel is taken from the nearest point of the tiles, so it isn't an exact render, and resuming, progressive rendering and symmetry aren't used.")
+            
+            with Flow():
+                Label("Backend: ")
+                self.backendOptions = OptionsMenu("Automatic", *backends.backends.keys(), command = computeBackend)
+                self.backendOptions.option = "Automatic" if self.computeBackend == "auto" else self.computeBackend
+                Tooltip(self.backendOptions, "What computes the escape counts. numpy: every point at once, one iteration at a time (always there). numba: compiled, every point on its own so it stops the moment it escapes, spread over every core (only there if numba is installed, and much faster). Both give exactly the same counts. Automatic picks the fastest one that is installed. Progressive rendering, resuming and multi-process rendering work with every backend.")
+        #endregion
+        
         #region Bookmarks controls
         self.bookmarksSection = HideableFrame(titleText = "Bookmarks", titleFont = "Arial 10 bold", relief = 'groove', borderwidth = 2)
         self.bookmarksSection.hide()
@@ -1968,6 +2157,7 @@ class MandlebrotSetExplorer():
                      ("This is the control panel. Here you can tweak all the different options and variables of this program. Click the arrow button to open/close this section.  Hover over any option to learn about what it does.", self.rightSideFrame, (-325, self.rightSideFrame.winfo_screenheight() / 4)),
                      ("This is the Mandlebrot set section. It contains all the controls for the drawing the Mandlebrot set.", self.mandlebrotSection, (-325, -20)),
                      ("This is the Julia set section. It contains all the controls for the drawing the Julia set.", self.juliaSection, (-325, -20)),
+                     ("This is the rendering section. It contains options that change how the sets are computed, like using every core of your computer or zooming deeper than regular numbers allow.", self.renderingSection, (-325, -20)),
                      ("This is the bookmarks section. You can manage your bookmarks here. Bookmarks are a way to save interesting points you find when exploring the Mandlebrot set.", self.bookmarksSection, (-325, -20)),
                      ("This is the info section. It displays various pieces of information about the selected point.", self.pointInfoSection, (-325, -20))
                      ]
@@ -2048,11 +2238,20 @@ class MandlebrotSetExplorer():
         if self.orbitDrawThread != None:
             self.orbitDrawThread.stop()
         
-        if self.mandlebrotRenderThread != None:
-            self.mandlebrotRenderThread.stop()
+        self.mandlebrotScheduler.stop()
+        self.juliaScheduler.stop()
+        
+        if self.juliaPreviewTimer != None:
+            self.mainWin.after_cancel(self.juliaPreviewTimer)
+        
+        if self.progressTimer != None:
+            self.mainWin.after_cancel(self.progressTimer)
+        
+        if self.renderPool != None:
+            self.renderPool.shutdown(wait = False, cancel_futures = True)
         
-        if self.juliaRenderThread != None:
-            self.juliaRenderThread.stop()
+        # Delete the renders cached on disk
+        self.renderCache.clear()
 
         self.mainWin.destroy()
 
@@ -0,0 +1,103 @@
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import Lib.colorize as colorize
+import Lib.offlineRender as offlineRender
+
+# Render mandlebrot and julia sets to PNG files from the command line, without opening a window.
+#
+# Views come from a bookmarks file (the one the explorer saves) and/or coordinates given on the command line:
+#   python batchRender.py --bookmarks bookmarks.json --size 1920 1080 --iterations 1000 --output renders
+#   python batchRender.py --view -2.25 -1.5 0.75 1.5 --view -0.8 0.05 -0.7 0.15 --workers 4
+#   python batchRender.py --view -1.5 -1 1.5 1 --c -0.8 0.156
+# Every view is one frame, and the frames are spread over --workers processes. The sets are computed and colored with
+# the same code (and the same color map) the explorer uses.
+
+defaultJuliaCoords = [-2.25, -1.5, 2.25, 1.5] # The region julia sets of mandlebrot bookmarks are rendered in
+
+# The frames of a bookmarks file as (name, coords, juliaC). Mandlebrot bookmarks get a frame of their region, and with
+# julia on also a frame of the julia set of their point. Julia bookmarks get a frame of their julia set
+def bookmarkFrames(path, julia = False):
+    with open(path) as file:
+        data = json.load(file)
+
+    frames = []
+
+    for i, key in enumerate(data):
+        bookmark = data[key]
+        point = complex(*bookmark['point'])
+
+        if bookmark['set'] == 0:
+            frames.append(("bookmark" + str(i) + "-mandlebrot", bookmark['coords'], None))
+
+            if julia:
+                frames.append(("bookmark" + str(i) + "-julia", defaultJuliaCoords, point))
+        else:
+            frames.append(("bookmark" + str(i) + "-julia", bookmark['coords'], point))
+
+    return frames
+
+# Render a single frame (run in the worker processes). Returns the path and how long it took
+def renderFrame(path, size, customCoords, maxIterations, juliaC, method, palette):
+    startTime = time.time()
+    offlineRender.renderPNG(path, size, customCoords, maxIterations, juliaC, method, palette)
+
+    return path, time.time() - startTime
+
+def main():
+    parser = argparse.ArgumentParser(description = "Render mandlebrot and julia sets to PNG files without a window.")
+    parser.add_argument("--bookmarks", help = "a bookmarks.json file saved by the explorer to render")
+    parser.add_argument("--julia", action = "store_true", help = "also render the julia set of every mandlebrot bookmark")
+    parser.add_argument("--view", nargs = 4, action = "append", default = [], metavar = ("X0", "Y0", "X1", "Y1"), help = "a region to render (can be given more than once)")
+    parser.add_argument("--c", nargs = 2, type = float, metavar = ("REAL", "IMAG"), help = "render the --view regions as the julia set of this point")
+    parser.add_argument("--size", nargs = 2, type = int, default = [500, 500], metavar = ("WIDTH", "HEIGHT"), help = "the size of the images in pixels")
+    parser.add_argument("--iterations", type = int, default = 100, help = "the maximum number of iterations")
+    parser.add_argument("--method", choices = ("escape", "two-tone"), default = "escape", help = "escape colors or two-tone")
+    parser.add_argument("--output", default = "renders", help = "the folder to write the images to")
+    parser.add_argument("--workers", type = int, default = 1, help = "the number of processes to render frames on")
+    args = parser.parse_args()
+
+    # The explorer's color map (imported here so the worker processes don't have to load the whole explorer)
+    from MandlebrotVisualizer import MandlebrotSetExplorer
+    palette = MandlebrotSetExplorer.palette
+
+    frames = []
+
+    if args.bookmarks != None:
+        frames += bookmarkFrames(args.bookmarks, args.julia)
+
+    juliaC = complex(*args.c) if args.c != None else None
+
+    for i, view in enumerate(args.view):
+        frames.append(("view" + str(i) + ("-julia" if juliaC != None else "-mandlebrot"), view, juliaC))
+
+    if len(frames) == 0:
+        parser.error("nothing to render, give --bookmarks or --view")
+
+    os.makedirs(args.output, exist_ok = True)
+
+    size = tuple(args.size)
+    method = colorize.ESCAPE_COLORS if args.method == "escape" else colorize.TWO_TONE
+    jobs = [(os.path.join(args.output, name + ".png"), size, coords, args.iterations, c, method, palette) for name, coords, c in frames]
+
+    print("Rendering " + str(len(jobs)) + " frames at " + str(size[0]) + "x" + str(size[1]) + " on " + str(args.workers) + " processes")
+    startTime = time.time()
+
+    if args.workers <= 1:
+        for job in jobs:
+            path, renderTime = renderFrame(*job)
+            print("Rendered " + path + " in " + str(round(renderTime, 3)) + "s")
+    else:
+        with ProcessPoolExecutor(max_workers = args.workers) as pool:
+            futures = [pool.submit(renderFrame, *job) for job in jobs]
+
+            for future in as_completed(futures):
+                path, renderTime = future.result()
+                print("Rendered " + path + " in " + str(round(renderTime, 3)) + "s")
+
+    print("Finished rendering in " + str(round(time.time() - startTime, 3)) + "s")
+
+if __name__ == "__main__":
+    main()
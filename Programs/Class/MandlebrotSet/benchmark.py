@@ -0,0 +1,232 @@
+import argparse
+import json
+import os
+import platform
+import time
+import tracemalloc
+import numpy as np
+import Lib.backends as backends
+import Lib.colorize as colorize
+import Lib.offlineRender as offlineRender
+
+# Benchmarks of the rendering pipeline, so changes to the kernels can be measured instead of eyeballed from the prints.
+#
+# Every case is a fixed scene at a size and iteration limit, and is timed in three stages the same way the explorer runs
+# them: computing the escape counts, coloring them, and uploading the image (encoding it as a PPM and putting it into a
+# tk PhotoImage, or only the encoding when there's no display). Every stage is run once untimed (compiled backends
+# compile or load their kernels on the first call), then --repeat times and the fastest run is kept. Then the case is
+# run once more with tracemalloc to find the peak memory (numpy allocations included).
+#
+#   python benchmark.py --output results.json
+#   python benchmark.py --baseline results.json --output new.json     (prints how every case changed)
+#   python benchmark.py --backend numpy                               (time a backend other than the automatic one)
+#   python benchmark.py --check-backends                              (check every backend gives the same escape counts)
+
+# The scenes: (name, coords, julia c or None)
+scenes = [
+    ("home", [-2.25, -1.5, 0.75, 1.5], None),
+    ("seahorse valley", [-0.77, 0.07, -0.73, 0.11], None),
+    ("deep interior", [-0.16, 0.7, -0.08, 0.78], None), # Inside of the period 3 bulb, where nearly every point runs to the limit
+    ("dendrite julia", [-2.25, -1.5, 2.25, 1.5], 1j),
+    ("dust julia", [-2.25, -1.5, 2.25, 1.5], 0.4 + 0.4j),
+]
+
+defaultSizes = [250, 500, 1000]
+defaultIterations = [100, 1000]
+changeThreshold = 0.1 # Changes from the baseline smaller than this fraction are counted as noise
+
+# A hidden tk window to upload images in (None if there's no display)
+def createRoot():
+    try:
+        import tkinter as tk
+
+        root = tk.Tk()
+        root.withdraw()
+
+        return root
+    except Exception:
+        return None
+
+# The fastest time (in seconds) of running function repeat times (after one untimed warm up run), and what it returned
+def timeBest(function, repeat):
+    best = None
+    function()
+
+    for i in range(repeat):
+        startTime = time.perf_counter()
+        result = function()
+        elapsed = time.perf_counter() - startTime
+
+        best = elapsed if best == None else min(best, elapsed)
+
+    return best, result
+
+# Run one case
+def runCase(root, coords, juliaC, size, maxIterations, palette, repeat, useSymmetry, backend = None):
+    target = None
+
+    if root != None:
+        import tkinter as tk
+        target = tk.PhotoImage(master = root, width = size[0], height = size[1])
+
+    def compute():
+        return offlineRender.computeSet(size, coords, maxIterations, juliaC, useSymmetry, backend = backend)
+
+    def color():
+        return colorize.colorize(divergenceTimes, maxIterations, np.amax(divergenceTimes), colorize.ESCAPE_COLORS, palette)
+
+    def upload():
+        data = colorize.encodePPM(image)
+
+        if target != None:
+            target.put(data, (0, 0))
+
+    computeTime, divergenceTimes = timeBest(compute, repeat)
+    colorizeTime, image = timeBest(color, repeat)
+    uploadTime = timeBest(upload, repeat)[0]
+
+    # The peak memory of the whole pipeline
+    tracemalloc.start()
+    divergenceTimes = compute()
+    image = color()
+    upload()
+    peakMemory = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    return {
+        "compute": computeTime,
+        "colorize": colorizeTime,
+        "upload": uploadTime,
+        "peakMemory": peakMemory,
+    }
+
+# The key a case is matched by between runs
+def caseKey(result):
+    return (result["scene"], tuple(result["size"]), result["iterations"])
+
+# Print how every case changed from a baseline
+def compareResults(results, baseline):
+    baselineCases = {caseKey(result): result for result in baseline["results"]}
+
+    print()
+
+    # Cases are only matched by their scene, size and iterations, so a different setup shows up as a speedup too
+    for setting in ("backend", "symmetry"):
+        if baseline.get(setting) != results[setting]:
+            print("Warning: the baseline was run with " + setting + " " + str(baseline.get(setting)) + ", these results with " + str(results[setting]))
+
+    print("Compared to the baseline (new / old, below 1 is faster):")
+
+    for result in results["results"]:
+        old = baselineCases.get(caseKey(result))
+
+        if old == None:
+            print("  " + describeCase(result) + ": not in the baseline")
+            continue
+
+        changes = []
+
+        for stage in ("compute", "colorize", "upload", "peakMemory"):
+            if old[stage] <= 0:
+                continue
+
+            ratio = result[stage] / old[stage]
+
+            if abs(ratio - 1) < changeThreshold:
+                mark = ""
+            elif stage == "peakMemory":
+                mark = " (less)" if ratio < 1 else " (more)"
+            else:
+                mark = " (faster)" if ratio < 1 else " (slower)"
+
+            changes.append(stage + " " + str(round(ratio, 3)) + "x" + mark)
+
+        print("  " + describeCase(result) + ": " + ", ".join(changes))
+
+# Check that every backend gives the same escape counts as the numpy backend on every case. Returns whether they all did
+def checkBackends(sceneNames, sizes, iterations):
+    matching = True
+
+    for name, coords, juliaC in scenes:
+        if sceneNames != None and name not in sceneNames:
+            continue
+
+        for width in sizes:
+            for maxIterations in iterations:
+                differences = backends.compareBackends((width, width), coords, maxIterations, juliaC)
+                matching = matching and all(count == 0 for count in differences.values())
+
+                print(name + " " + str(width) + "x" + str(width) + " @ " + str(maxIterations) + ": "
+                      + ", ".join(backend + " " + ("matches" if count == 0 else str(count) + " points differ") for backend, count in differences.items()))
+
+    return matching
+
+def describeCase(result):
+    return result["scene"] + " " + str(result["size"][0]) + "x" + str(result["size"][1]) + " @ " + str(result["iterations"])
+
+def main():
+    parser = argparse.ArgumentParser(description = "Benchmark computing, coloring and uploading fixed scenes.")
+    parser.add_argument("--sizes", nargs = "+", type = int, default = defaultSizes, help = "the widths (and heights) to render at")
+    parser.add_argument("--iterations", nargs = "+", type = int, default = defaultIterations, help = "the iteration limits to render with")
+    parser.add_argument("--scenes", nargs = "+", choices = [scene[0] for scene in scenes], help = "only run these scenes")
+    parser.add_argument("--repeat", type = int, default = 3, help = "how many times every stage is run (the fastest counts)")
+    parser.add_argument("--no-symmetry", action = "store_true", help = "compute both sides of symmetric views")
+    parser.add_argument("--output", help = "a JSON file to write the results to")
+    parser.add_argument("--baseline", help = "a JSON file of earlier results to compare to")
+    parser.add_argument("--backend", choices = ["auto"] + list(backends.backends.keys()), default = "auto", help = "the backend to compute with")
+    parser.add_argument("--check-backends", action = "store_true", help = "only check that every backend gives the same escape counts")
+    args = parser.parse_args()
+
+    if args.check_backends:
+        if not checkBackends(args.scenes, args.sizes, args.iterations):
+            raise SystemExit("The backends gave different escape counts")
+
+        print("Every backend gave the same escape counts")
+        return
+
+    # The explorer's color map
+    from MandlebrotVisualizer import MandlebrotSetExplorer
+    palette = MandlebrotSetExplorer.palette
+    root = createRoot()
+
+    results = {
+        "machine": {
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "processor": platform.processor(),
+            "cpus": os.cpu_count(),
+        },
+        "symmetry": not args.no_symmetry,
+        "backend": backends.getBackend(args.backend).name,
+        "display": root != None,
+        "results": [],
+    }
+
+    for name, coords, juliaC in scenes:
+        if args.scenes != None and name not in args.scenes:
+            continue
+
+        for width in args.sizes:
+            for maxIterations in args.iterations:
+                size = (width, width)
+
+                result = {"scene": name, "size": list(size), "iterations": maxIterations}
+                result.update(runCase(root, coords, juliaC, size, maxIterations, palette, args.repeat, not args.no_symmetry, args.backend))
+                results["results"].append(result)
+
+                print(describeCase(result) + ": compute " + str(round(result["compute"], 4)) + "s, colorize " + str(round(result["colorize"], 4))
+                      + "s, upload " + str(round(result["upload"], 4)) + "s, peak memory " + str(round(result["peakMemory"] / 1048576, 1)) + " MB")
+
+    if args.output != None:
+        with open(args.output, "w") as file:
+            json.dump(results, file, indent = 4)
+
+        print("Saved the results to " + args.output)
+
+    if args.baseline != None:
+        with open(args.baseline) as file:
+            compareResults(results, json.load(file))
+
+if __name__ == "__main__":
+    main()
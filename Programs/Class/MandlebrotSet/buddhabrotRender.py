@@ -0,0 +1,55 @@
+import argparse
+import time
+import numpy as np
+import Lib.buddhabrot as buddhabrot
+import Lib.colorize as colorize
+
+# Render the buddhabrot and anti-buddhabrot (where the orbits of random points go) from the command line, without
+# opening a window.
+#
+#   python buddhabrotRender.py --samples 100000000 --iterations 1000 --workers 8 --output buddhabrot.png
+#   python buddhabrotRender.py --anti --iterations 200 --gray --output anti.png
+# The orbit densities are computed in batches on --workers processes and added together (see buddhabrot), then colored
+# with the explorer's color map (or in gray) and saved like the other renders.
+
+def main():
+    parser = argparse.ArgumentParser(description = "Render the buddhabrot or anti-buddhabrot without a window.")
+    parser.add_argument("--view", nargs = 4, type = float, default = [-2.25, -1.5, 0.75, 1.5], metavar = ("X0", "Y0", "X1", "Y1"), help = "the region to render")
+    parser.add_argument("--size", nargs = 2, type = int, default = [500, 500], metavar = ("WIDTH", "HEIGHT"), help = "the size of the image in pixels")
+    parser.add_argument("--iterations", type = int, default = 1000, help = "the maximum number of iterations")
+    parser.add_argument("--min-iterations", type = int, default = 20, help = "leave out the orbits that escape sooner than this")
+    parser.add_argument("--samples", type = int, default = 10000000, help = "the number of random points to sample")
+    parser.add_argument("--anti", action = "store_true", help = "draw the orbits that never escape (the anti-buddhabrot)")
+    parser.add_argument("--even", action = "store_true", help = "sample evenly instead of mostly near the boundary of the set")
+    parser.add_argument("--seed", type = int, help = "the random seed (the same seed gives the same image)")
+    parser.add_argument("--gamma", type = float, default = 0.5, help = "below 1 brings out the faint orbits")
+    parser.add_argument("--gray", action = "store_true", help = "color in gray instead of with the explorer's color map")
+    parser.add_argument("--output", default = "buddhabrot.png", help = "the image to write (.png or .ppm)")
+    parser.add_argument("--workers", type = int, default = 1, help = "the number of processes to compute on")
+    args = parser.parse_args()
+
+    if args.gray:
+        palette = colorize.buildPalette([(i / 255, i / 255, i / 255) for i in range(256)])
+    else:
+        # The explorer's color map
+        from MandlebrotVisualizer import MandlebrotSetExplorer
+        palette = MandlebrotSetExplorer.palette
+
+    size = tuple(args.size)
+
+    print("Sampling " + str(args.samples) + " points for a " + str(size[0]) + "x" + str(size[1]) + (" anti-buddhabrot" if args.anti else " buddhabrot") + " on " + str(args.workers) + " processes")
+    startTime = time.time()
+
+    def progress(done, total):
+        print("Sampled " + str(done) + "/" + str(total) + " points (" + str(round(time.time() - startTime, 3)) + "s)")
+
+    density = buddhabrot.renderDensity(size, args.view, args.iterations, args.samples, args.anti, args.min_iterations, not args.even, args.workers, args.seed, progressCallback = progress)
+    image = colorize.colorizeDensity(density, palette, args.gamma)
+
+    with open(args.output, "wb") as file:
+        file.write(colorize.encodePPM(image) if args.output.lower().endswith(".ppm") else colorize.encodePNG(image))
+
+    print("Finished rendering " + args.output + " in " + str(round(time.time() - startTime, 3)) + "s (" + str(np.count_nonzero(density)) + " pixels were visited)")
+
+if __name__ == "__main__":
+    main()
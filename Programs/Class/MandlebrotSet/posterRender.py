@@ -0,0 +1,48 @@
+import argparse
+import time
+import Lib.colorize as colorize
+import Lib.posterRender as posterRender
+
+# Render posters (images far bigger than memory) from the command line, without opening a window.
+#
+#   python posterRender.py --size 30000 20000 --iterations 1000 --output poster.png
+#   python posterRender.py --view -0.77 0.07 -0.73 0.11 --size 12000 12000 --output seahorses.ppm --band-pixels 4000000
+# The image is computed in bands of rows into a memory mapped file and then written as a stream (see posterRender), so
+# the memory use stays the same at any size. Running the same command again after a crash resumes from the last band
+# that was finished.
+
+def main():
+    parser = argparse.ArgumentParser(description = "Render a poster sized image band by band without a window.")
+    parser.add_argument("--view", nargs = 4, default = ["-2.25", "-1.5", "0.75", "1.5"], metavar = ("X0", "Y0", "X1", "Y1"), help = "the region to render")
+    parser.add_argument("--c", nargs = 2, type = float, metavar = ("REAL", "IMAG"), help = "render the julia set of this point instead")
+    parser.add_argument("--size", nargs = 2, type = int, required = True, metavar = ("WIDTH", "HEIGHT"), help = "the size of the image in pixels")
+    parser.add_argument("--iterations", type = int, default = 100, help = "the maximum number of iterations")
+    parser.add_argument("--method", choices = ("escape", "two-tone"), default = "escape", help = "escape colors or two-tone")
+    parser.add_argument("--output", default = "poster.png", help = "the image to write (.png or .ppm)")
+    parser.add_argument("--band-pixels", type = int, default = posterRender.bandPixels, help = "the most pixels to compute at once")
+    parser.add_argument("--restart", action = "store_true", help = "start over instead of resuming an earlier render")
+    parser.add_argument("--keep-counts", action = "store_true", help = "keep the escape counts on disk (to recolor without computing again)")
+    args = parser.parse_args()
+
+    # The explorer's color map
+    from MandlebrotVisualizer import MandlebrotSetExplorer
+    palette = MandlebrotSetExplorer.palette
+
+    posterRender.bandPixels = args.band_pixels
+
+    size = tuple(args.size)
+    juliaC = complex(*args.c) if args.c != None else None
+    method = colorize.ESCAPE_COLORS if args.method == "escape" else colorize.TWO_TONE
+
+    print("Rendering a " + str(size[0]) + "x" + str(size[1]) + " poster in " + str(len(posterRender.splitBands(size))) + " bands")
+    startTime = time.time()
+
+    def progress(done, total):
+        print("Computed band " + str(done) + "/" + str(total) + " (" + str(round(time.time() - startTime, 3)) + "s)")
+
+    posterRender.renderPoster(args.output, size, args.view, args.iterations, juliaC, method, palette, args.restart, args.keep_counts, progress)
+
+    print("Finished rendering " + args.output + " in " + str(round(time.time() - startTime, 3)) + "s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,22 @@
+import pytest
+import Lib.backends as backends
+
+# Checks that the numba backend gives exactly the same escape counts as the numpy backend (see backends.compareBackends).
+#
+#   python -m pytest test_backends.py
+
+pytest.importorskip("numba")
+
+# The scenes: (name, coords, julia c or None), the same ones benchmark.py uses
+scenes = [
+    ("home", [-2.25, -1.5, 0.75, 1.5], None),
+    ("seahorse valley", [-0.77, 0.07, -0.73, 0.11], None),
+    ("dendrite julia", [-2.25, -1.5, 2.25, 1.5], 1j),
+]
+
+@pytest.mark.parametrize("name, coords, juliaC", scenes, ids = [scene[0] for scene in scenes])
+def test_backendsMatch(name, coords, juliaC):
+    differences = backends.compareBackends((160, 120), coords, 500, juliaC)
+
+    assert "numba" in differences
+    assert all(count == 0 for count in differences.values()), differences
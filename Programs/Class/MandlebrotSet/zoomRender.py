@@ -0,0 +1,113 @@
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import Lib.colorize as colorize
+import Lib.zoomAnimation as zoomAnimation
+
+# Render zoom animations from the command line, without opening a window.
+#
+# The animation goes through a list of keyframe views, given with --view and/or taken from the mandlebrot bookmarks of a
+# bookmarks file (in the order they were saved, starting from the home view if no --view comes first):
+#   python zoomRender.py --view -2.25 -1.5 0.75 1.5 --view -0.7454 0.1130 -0.7452 0.1132 --frames 900 --output zoom
+#   python zoomRender.py --bookmarks bookmarks.json --frames 900 --workers 4 --raw | ffmpeg -f rawvideo -pix_fmt rgb24 -s 500x500 -r 30 -i - zoom.mp4
+# The frames are written as a numbered PNG sequence, or with --raw as a stream of rgb24 frames on stdout (for ffmpeg).
+# Runs of frames share a key image (see zoomAnimation), and the key images are spread over --workers processes.
+
+homeCoords = [-2.25, -1.5, 0.75, 1.5] # The view zooms start from when only bookmarks are given
+
+# The mandlebrot bookmarks of a bookmarks file as views
+def bookmarkViews(path):
+    with open(path) as file:
+        data = json.load(file)
+
+    return [bookmark['coords'] for bookmark in data.values() if bookmark['set'] == 0]
+
+# Compute a key image and encode its frames (run in the worker processes)
+def renderKey(key, size, maxIterations, juliaC, method, palette, raw):
+    images = zoomAnimation.renderKey(key, size, maxIterations, juliaC, method, palette)
+
+    if raw:
+        return [np.ascontiguousarray(image, dtype = np.uint8).tobytes() for image in images]
+
+    return [colorize.encodePNG(image) for image in images]
+
+def main():
+    parser = argparse.ArgumentParser(description = "Render a zoom animation through keyframe views without a window.")
+    parser.add_argument("--view", nargs = 4, action = "append", default = [], metavar = ("X0", "Y0", "X1", "Y1"), help = "a keyframe view (in order, give at least two or add --bookmarks)")
+    parser.add_argument("--bookmarks", help = "a bookmarks.json file whose mandlebrot bookmarks are keyframes (after the --view ones)")
+    parser.add_argument("--c", nargs = 2, type = float, metavar = ("REAL", "IMAG"), help = "zoom into the julia set of this point instead")
+    parser.add_argument("--frames", type = int, default = 300, help = "the number of frames")
+    parser.add_argument("--size", nargs = 2, type = int, default = [500, 500], metavar = ("WIDTH", "HEIGHT"), help = "the size of the frames in pixels")
+    parser.add_argument("--iterations", type = int, default = 100, help = "the maximum number of iterations")
+    parser.add_argument("--method", choices = ("escape", "two-tone"), default = "escape", help = "escape colors or two-tone")
+    parser.add_argument("--output", default = "zoom", help = "the folder to write the numbered frames to")
+    parser.add_argument("--raw", action = "store_true", help = "write rgb24 frames to stdout instead of PNG files")
+    parser.add_argument("--workers", type = int, default = 1, help = "the number of processes to render key images on")
+    args = parser.parse_args()
+
+    # The progress goes to stderr when stdout is the video stream
+    log = sys.stderr if args.raw else sys.stdout
+
+    # The explorer's color map (imported here so the worker processes don't have to load the whole explorer)
+    from MandlebrotVisualizer import MandlebrotSetExplorer
+    palette = MandlebrotSetExplorer.palette
+
+    keyframes = list(args.view)
+
+    if args.bookmarks != None:
+        keyframes += bookmarkViews(args.bookmarks)
+
+        if len(args.view) == 0:
+            keyframes.insert(0, homeCoords)
+
+    if len(keyframes) < 2:
+        parser.error("an animation needs at least two keyframes, give --view twice or --bookmarks")
+
+    size = tuple(args.size)
+    juliaC = complex(*args.c) if args.c != None else None
+    method = colorize.ESCAPE_COLORS if args.method == "escape" else colorize.TWO_TONE
+
+    startTime = time.time()
+    keys = zoomAnimation.groupFrames(zoomAnimation.pathViews(keyframes, args.frames, size), size)
+    frameCount = sum(len(key.frames) for key in keys)
+
+    print("Rendering " + str(frameCount) + " frames from " + str(len(keys)) + " key images on " + str(args.workers) + " processes", file = log)
+
+    if not args.raw:
+        os.makedirs(args.output, exist_ok = True)
+
+    jobs = [(key, size, args.iterations, juliaC, method, palette, args.raw) for key in keys]
+    frame = 0
+
+    # The frames of every key image, in order
+    def renderedKeys():
+        if args.workers <= 1:
+            for job in jobs:
+                yield renderKey(*job)
+        else:
+            with ProcessPoolExecutor(max_workers = args.workers) as pool:
+                yield from pool.map(renderKey, *zip(*jobs))
+
+    for frames in renderedKeys():
+        for data in frames:
+            if args.raw:
+                sys.stdout.buffer.write(data)
+            else:
+                with open(os.path.join(args.output, "frame" + str(frame).zfill(5) + ".png"), "wb") as file:
+                    file.write(data)
+
+            frame += 1
+
+        if args.raw:
+            sys.stdout.buffer.flush()
+
+        print("Rendered " + str(frame) + "/" + str(frameCount) + " frames (" + str(round(time.time() - startTime, 3)) + "s)", file = log)
+
+    print("Finished rendering in " + str(round(time.time() - startTime, 3)) + "s", file = log)
+
+if __name__ == "__main__":
+    main()